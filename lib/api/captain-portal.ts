@@ -81,14 +81,92 @@ export interface UploadResponse {
   counts_estimated?: Record<string, number>;
   extraction_contract?: any;
   file_size_kb?: number;
+  reused_extraction_from?: string | null;
   message?: string;
 }
 
+export interface UploadJobStatus {
+  upload_id: string;
+  status: 'queued' | 'parsing' | 'extracting' | 'saving' | 'completed' | 'failed' | string;
+  stages: Record<string, string>;
+  attempts: number | null;
+  error: string | null;
+  error_status: number | null;
+  result: UploadResponse | null;
+}
+
+// Give up following an upload after this long (it keeps processing server-side).
+const UPLOAD_WAIT_MAX_MS = 30 * 60 * 1000;
+// Pause between status polls that brought no change, doubling up to the max.
+const UPLOAD_POLL_MIN_DELAY_MS = 1000;
+const UPLOAD_POLL_MAX_DELAY_MS = 10000;
+
+// Long-poll the upload job until the background worker finishes it.
+async function waitForUpload(
+  uploadId: string,
+  onStatus?: (status: UploadJobStatus) => void
+): Promise<UploadResponse> {
+  let since: string | undefined;
+  let delayMs = UPLOAD_POLL_MIN_DELAY_MS;
+  const deadline = Date.now() + UPLOAD_WAIT_MAX_MS;
+  for (;;) {
+    if (Date.now() > deadline) {
+      throw new Error('Timed out waiting for the upload to finish processing; check the upload history later.');
+    }
+    const query = `wait=25${since ? `&since=${encodeURIComponent(since)}` : ''}`;
+    const job = await apiRequest<UploadJobStatus>(
+      `/api/captain/upload/id/${uploadId}/status?${query}`,
+      { method: 'GET' }
+    );
+    onStatus?.(job);
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Processing failed');
+    }
+    if (job.status === 'completed') {
+      if (job.result) return job.result;
+      // Finished before this backend instance knew about it: rebuild from the upload record
+      const { upload } = await apiRequest<{ upload: any }>(`/api/captain/upload/id/${uploadId}`, { method: 'GET' });
+      const meta = upload?.metadata || {};
+      return {
+        success: true,
+        upload_id: uploadId,
+        filename: upload?.filename,
+        status: 'completed',
+        confidence_score: upload?.confidence_score,
+        pois_extracted: upload?.pois_extracted || 0,
+        intelligence_extracted: {
+          pois: upload?.pois_extracted || 0,
+          experiences: upload?.experiences_extracted || 0,
+          trends: upload?.trends_extracted || 0,
+          insights: 0,
+          prices: 0,
+          competitors: 0,
+          learnings: 0,
+        },
+        extracted_data: meta.extracted_data,
+        extraction_contract: meta.extraction_contract,
+      };
+    }
+    if (job.status === since) {
+      // Long-poll ran out without a change: back off before asking again
+      await new Promise((resolve) => setTimeout(resolve, delayMs));
+      delayMs = Math.min(delayMs * 2, UPLOAD_POLL_MAX_DELAY_MS);
+    } else {
+      delayMs = UPLOAD_POLL_MIN_DELAY_MS;
+    }
+    since = job.status;
+  }
+}
+
 export const uploadAPI = {
   /**
    * Upload a file
    */
-  uploadFile: async (file: File): Promise<UploadResponse> => {
+  uploadFile: async (
+    file: File,
+    onStatus?: (status: UploadJobStatus) => void,
+    forceExtract = false
+  ): Promise<UploadResponse> => {
     const formData = new FormData();
     formData.append('file', file);
 
@@ -96,7 +174,7 @@ export const uploadAPI = {
     const { data } = await supabase.auth.getSession();
     const accessToken = data.session?.access_token;
 
-    const response = await fetch(`${API_BASE_URL}/api/captain/upload/`, {
+    const response = await fetch(`${API_BASE_URL}/api/captain/upload/${forceExtract ? '?force_extract=true' : ''}`, {
       method: 'POST',
       body: formData,
       headers: {
@@ -109,17 +187,31 @@ export const uploadAPI = {
       throw new Error(error.detail);
     }
 
-    return response.json();
+    // 202: queued for background processing
+    const queued = await response.json();
+    return waitForUpload(queued.upload_id, onStatus);
   },
 
   /**
    * Upload text/paste
    */
-  uploadText: async (title: string, content: string): Promise<UploadResponse> => {
-    return apiRequest('/api/captain/upload/text', {
+  uploadText: async (
+    title: string,
+    content: string,
+    onStatus?: (status: UploadJobStatus) => void,
+    forceExtract = false
+  ): Promise<UploadResponse> => {
+    const endpoint = `/api/captain/upload/text${forceExtract ? '?force_extract=true' : ''}`;
+    const queued = await apiRequest<{ upload_id: string }>(endpoint, {
       method: 'POST',
       body: JSON.stringify({ title, text: content }),
     });
+    return waitForUpload(queued.upload_id, onStatus);
+  },
+
+  getUploadStatus: async (uploadId: string, wait = 0, since?: string) => {
+    const query = `wait=${wait}${since ? `&since=${encodeURIComponent(since)}` : ''}`;
+    return apiRequest<UploadJobStatus>(`/api/captain/upload/id/${uploadId}/status?${query}`, { method: 'GET' });
   },
 
   /**
@@ -155,10 +247,16 @@ export const scrapingAPI = {
   /**
    * Scrape a single URL
    */
-  scrapeURL: async (url: string, extractIntelligence = true, force = false) => {
+  scrapeURL: async (url: string, extractIntelligence = true, force = false, forceExtract = false) => {
     return apiRequest('/api/captain/scrape/url', {
       method: 'POST',
-      body: JSON.stringify({ url, extract_subpages: true, extract_intelligence: extractIntelligence, force }),
+      body: JSON.stringify({
+        url,
+        extract_subpages: true,
+        extract_intelligence: extractIntelligence,
+        force,
+        force_extract: forceExtract,
+      }),
     });
   },
 
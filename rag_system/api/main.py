@@ -19,6 +19,7 @@ from core.aibert.desire_anticipator import initialize_desire_anticipator
 from core.ailessia.personality_mirror import initialize_personality_mirror
 from core.ailessia.emotion_interpreter import initialize_emotion_interpreter
 from core.ailessia.context_extractor import initialize_context_extractor
+from core.llm.router import aclose_clients
 from api.routes import chat, health
 
 # Configure structured logging
@@ -107,6 +108,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down RAG System API")
     await neo4j_client.close()
     logger.info("Databases closed")
+    await aclose_clients()
+    logger.info("LLM provider clients closed")
 
 
 # Create FastAPI app
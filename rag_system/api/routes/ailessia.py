@@ -6,9 +6,13 @@ User-facing naming and aliases should be LEXA.
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import Awaitable, Callable, List, Optional, Dict
 from datetime import datetime
+import asyncio
+import json
 import structlog
 from config.settings import settings
 
@@ -319,6 +323,67 @@ async def converse_with_ailessia(request: ConverseRequest):
     - Adapts personality
     - Generates empathetic responses
     """
+    return await _converse_turn(request)
+
+
+# Strong references to streaming turns still running after a client disconnect
+_background_turns: set = set()
+
+
+@router.post("/converse/stream")
+async def converse_with_ailessia_stream(request: ConverseRequest):
+    """
+    Streaming variant of /converse (Server-Sent Events).
+
+    Events:
+    - token: {"text": "..."} for each piece of LEXA's reply as it is generated
+    - done:  the full ConverseResponse payload (same shape as /converse)
+    - error: {"status_code": ..., "detail": "..."}
+
+    The turn keeps running if the client disconnects, so the session is still persisted.
+    """
+    queue: "asyncio.Queue" = asyncio.Queue()
+
+    async def on_token(text: str) -> None:
+        await queue.put(("token", {"text": text}))
+
+    async def run_turn() -> None:
+        try:
+            response = await _converse_turn(request, on_token=on_token)
+            await queue.put(("done", jsonable_encoder(response)))
+        except HTTPException as e:
+            await queue.put(("error", {"status_code": e.status_code, "detail": e.detail}))
+        except Exception as e:
+            await queue.put(("error", {"status_code": 500, "detail": f"Conversation failed: {str(e)}"}))
+
+    turn = asyncio.create_task(run_turn())
+    _background_turns.add(turn)
+    turn.add_done_callback(_background_turns.discard)
+
+    async def events():
+        # Flush headers right away so proxies/browsers start the stream.
+        yield ": stream open\n\n"
+        while True:
+            kind, data = await queue.get()
+            yield f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            if kind in ("done", "error"):
+                break
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _converse_turn(
+    request: ConverseRequest,
+    on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> ConverseResponse:
+    """
+    One conversation turn. When `on_token` is given, LEXA's reply is streamed
+    through it while it is generated.
+    """
     try:
         # Get account and session
         account = await get_account_manager().get_account(request.account_id)
@@ -463,7 +528,8 @@ async def converse_with_ailessia(request: ConverseRequest):
                     "vulnerability": emotional_reading.vulnerability_shown,
                     "hidden_desires": emotional_reading.hidden_desires
                 },
-                conversation_stage="discovery"
+                conversation_stage="discovery",
+                on_token=on_token
             )
 
             # Persist intake state into key_moments
@@ -673,7 +739,8 @@ async def converse_with_ailessia(request: ConverseRequest):
                 "vulnerability": emotional_reading.vulnerability_shown,
                 "hidden_desires": emotional_reading.hidden_desires
             },
-            conversation_stage=current_stage
+            conversation_stage=current_stage,
+            on_token=on_token
         )
         
         # 9. Calculate progress
@@ -3,9 +3,13 @@ Health check endpoints.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from database.neo4j_client import neo4j_client
 from database.supabase_vector_client import vector_db_client
 from config.settings import settings
+from core.llm.router import get_cache_stats, get_inflight_stats, get_pool_stats, get_provider_health
+from core.llm.scheduler import get_scheduler_stats
+from core.llm.telemetry import PROMETHEUS_CONTENT_TYPE, get_llm_call_totals, render_prometheus
 import structlog
 
 logger = structlog.get_logger()
@@ -31,6 +35,11 @@ async def health_check():
             "neo4j": "connected" if neo4j_ok else "disconnected",
             "supabase": "connected" if supabase_ok else "disconnected",
             "embeddings_enabled": bool(getattr(settings, "enable_embeddings", False)),
+            "llm_pools": get_pool_stats(),
+            "llm_cache": get_cache_stats(),
+            "llm_inflight": get_inflight_stats(),
+            "llm_providers": get_provider_health(),
+            "llm_calls": get_llm_call_totals(),
         }
         
         if not neo4j_ok or not supabase_ok:
@@ -69,6 +78,24 @@ async def readiness_check():
         raise HTTPException(status_code=503, detail={"status": "not_ready", "error": str(e)})
 
 
+@router.get("/llm/scheduler")
+async def llm_scheduler_status():
+    """
+    LLM scheduler introspection: queued and in-flight provider calls per
+    priority class (interactive > extraction > batch) and budget limits.
+    """
+    return {"providers": get_scheduler_stats()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus scrape endpoint: LLM call counters and latency/queue-wait
+    histograms per caller (pipeline stage) and provider.
+    """
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @router.get("/health/live")
 async def liveness_check():
     """
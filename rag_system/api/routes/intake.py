@@ -20,7 +20,7 @@ from urllib.parse import urlparse, urljoin
 from config.settings import settings
 from database.neo4j_client import neo4j_client
 import database.account_manager as account_manager_module
-from core.llm.router import extract_json as llm_extract_json, ocr_and_extract_json as llm_ocr_json
+from core.llm.router import extract_json_chunked as llm_extract_json, ocr_and_extract_json as llm_ocr_json
 
 logger = structlog.get_logger()
 router = APIRouter()
@@ -294,7 +294,16 @@ async def _claude_extract_from_text(text: str) -> Dict[str, Any]:
         "Be conservative with confidence. Keep names as written.\n"
     )
 
-    return await llm_extract_json(system=system, user_text=text, max_tokens=2500, prefer=settings.default_llm)
+    # Intake drafts are admin bulk work: let live conversations go first.
+    # Long sources are extracted chunk by chunk and merged instead of truncated.
+    return await llm_extract_json(
+        system=system,
+        user_text=text,
+        max_tokens=2500,
+        prefer=settings.default_llm,
+        priority="batch",
+        caller="intake:extract",
+    )
 
 
 async def _claude_ocr_image(image_bytes: bytes, media_type: str = "image/png") -> Dict[str, Any]:
@@ -309,7 +318,15 @@ async def _claude_ocr_image(image_bytes: bytes, media_type: str = "image/png") -
         "- entities, relations, knowledge, chunks (same schema as text extraction)\n"
         "Prefer correct place names; if uncertain, lower confidence.\n"
     )
-    return await llm_ocr_json(system=system, image_bytes=image_bytes, max_tokens=2500, prefer=settings.default_llm, media_type=media_type)
+    return await llm_ocr_json(
+        system=system,
+        image_bytes=image_bytes,
+        max_tokens=2500,
+        prefer=settings.default_llm,
+        media_type=media_type,
+        priority="batch",
+        caller="intake:ocr",
+    )
 
 
 @router.post("/intake/extract-draft")
@@ -9,9 +9,10 @@ import uuid
 from datetime import datetime
 
 from app.services.web_scraper import web_scraper
+from app.services.content_fingerprint import clone_contract, find_previous_extraction, text_fingerprint
 from app.services.multipass_extractor import run_fast_extraction
 from app.services.pii_redactor import redact_pii
-from app.services.intelligence_storage import save_intelligence_to_db
+from app.services.intelligence_storage import save_intelligence_to_db, sync_extracted_pois
 from app.services.supabase_auth import get_current_user
 from app.services.supabase_client import get_supabase
 
@@ -24,6 +25,8 @@ class ScrapeURLRequest(BaseModel):
     extract_subpages: bool = True
     extract_intelligence: bool = True
     force: bool = False
+    # Re-run the LLM even when identical page content was extracted before
+    force_extract: bool = False
 
 
 class ScrapeURLResponse(BaseModel):
@@ -41,6 +44,7 @@ class ScrapeURLResponse(BaseModel):
     counts_real: Optional[dict] = None
     counts_estimated: Optional[dict] = None
     already_scraped: bool = False
+    reused_extraction_from: Optional[str] = None
     previous_scraped_at: Optional[str] = None
     message: str
     debug: Optional[dict] = None
@@ -58,7 +62,8 @@ async def scrape_url(
     **What it does:**
     1. Scrapes the URL content
     2. Discovers subpages (if requested)
-    3. Extracts intelligence with Claude AI (if requested)
+    3. Extracts intelligence with Claude AI (if requested); page text identical to an
+       earlier scrape reuses that extraction unless `force_extract` is set
     4. Saves to database
     
     **Returns:**
@@ -130,6 +135,17 @@ async def scrape_url(
             scrape_result = await web_scraper.scrape_url(str(request.url), extract_subpages=False)
         
         scrape_id = (existing.data[0].get("id") if existing.data else None) or str(uuid.uuid4())
+
+        # Content dedupe: identical page text (any URL) that was already extracted is reused.
+        # Looked up before the upsert below, which resets this row's cached metadata.
+        content_text = (scrape_result.get("content") or "").strip()
+        content_sha256 = text_fingerprint(content_text) if content_text else None
+        previous = None
+        if request.extract_intelligence and not request.force_extract:
+            previous = await find_previous_extraction(
+                supabase, "scraped_urls", content_sha256,
+                status_column="scraping_status", status_value="success",
+            )
         
         # Save scraped URL to database (shared view across captains)
         try:
@@ -142,6 +158,7 @@ async def scrape_url(
                 "scraped_at": datetime.utcnow().isoformat(),
                 "last_scraped": datetime.utcnow().isoformat(),
                 "scraping_status": "processing",
+                "content_sha256": content_sha256,
                 "content_length": len(scrape_result.get("content", "")),
                 "subpages_discovered": int(scrape_result.get("subpage_count") or 0),
                 "subpages": scrape_result.get("subpages", []),
@@ -160,8 +177,8 @@ async def scrape_url(
         contract = None
         real_counts = {}
         est_counts = {}
+        reused_from = None
 
-        content_text = (scrape_result.get("content") or "").strip()
         if request.extract_intelligence and len(content_text) >= 80:
             content_redacted, pii_stats = redact_pii(scrape_result["content"])
             # Store a safe snapshot of the source text (redacted) for Brain v2 Step 1
@@ -169,12 +186,17 @@ async def scrape_url(
             source_text_truncated = len(content_redacted or "") > source_text_limit
             source_text_redacted = (content_redacted or "")[:source_text_limit]
 
-            contract = await run_fast_extraction(content_redacted, {
+            source_meta = {
                 "upload_id": scrape_id,
                 "filename": str(request.url),
                 "file_type": "url",
                 "text_length": len(content_redacted),
-            })
+            }
+            if previous is not None:
+                reused_from, previous_meta = previous
+                contract = clone_contract(previous_meta["extraction_contract"], source=source_meta, reused_from=reused_from)
+            else:
+                contract = await run_fast_extraction(content_redacted, source_meta)
             final_package = contract.get("final_package", {}) or {}
 
             # Local legacy mapping (minimal; aligned with Captain upload editor)
@@ -261,6 +283,7 @@ async def scrape_url(
                         "report_markdown": (final_package.get("metadata", {}) or {}).get("report_markdown"),
                         "extraction_contract": contract,
                         "extracted_data": extracted,
+                        "reused_extraction_from": reused_from,
                     },
                 }).eq("id", scrape_id).execute()
             except Exception:
@@ -325,7 +348,8 @@ async def scrape_url(
             extraction_contract=contract,
             counts_real=real_counts,
             counts_estimated=est_counts,
-            message="URL scraped successfully",
+            reused_extraction_from=reused_from,
+            message="URL scraped successfully" + (" (identical content was already extracted — reused that extraction)" if reused_from else ""),
             debug=(scrape_result.get("metadata", {}) or {}).get("content_debug") if isinstance(scrape_result.get("metadata", {}), dict) else None,
         )
         
@@ -457,18 +481,32 @@ async def update_scrape(
     if should_refresh and isinstance(next_meta, dict):
         extracted = next_meta.get("extracted_data")
     if should_refresh and isinstance(extracted, dict) and extracted.get("pois") is not None:
+        owner_id = existing.data[0].get("entered_by") or user_id
+        # Delta save: only the POIs the captain added / changed / removed are written
+        previous_extracted = current_meta.get("extracted_data") if isinstance(current_meta.get("extracted_data"), dict) else {}
         try:
-            owner_id = existing.data[0].get("entered_by") or user_id
-            await save_intelligence_to_db(
+            await sync_extracted_pois(
                 supabase=supabase,
-                intelligence={"pois": extracted.get("pois") or []},
+                previous_pois=previous_extracted.get("pois") or [],
+                pois=extracted.get("pois") or [],
                 source_type="url_scrape",
                 source_id=str(scrape_id),
                 source_metadata={"url": existing.data[0].get("url"), "filename": existing.data[0].get("url")},
                 uploaded_by=owner_id,
             )
-        except Exception:
-            pass
+        except Exception as e:
+            print(f"POI delta save failed, rewriting all POIs: {str(e)}")
+            try:
+                await save_intelligence_to_db(
+                    supabase=supabase,
+                    intelligence={"pois": extracted.get("pois") or []},
+                    source_type="url_scrape",
+                    source_id=str(scrape_id),
+                    source_metadata={"url": existing.data[0].get("url"), "filename": existing.data[0].get("url")},
+                    uploaded_by=owner_id,
+                )
+            except Exception:
+                pass
 
         # Update counts for history display
         try:
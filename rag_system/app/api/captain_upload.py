@@ -3,8 +3,11 @@ Captain Portal - File Upload & Intelligence Extraction API
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Union
+import asyncio
+import time
 import uuid
 from datetime import datetime
 import os
@@ -13,10 +16,19 @@ from urllib.parse import quote
 
 from app.services.file_processor import process_file_auto
 from app.services.multipass_extractor import run_multipass_extraction, run_fast_extraction
-from app.services.intelligence_storage import save_intelligence_to_db
+from app.services.multipass_checkpoints import PassCheckpoints
+from app.services.intelligence_storage import save_intelligence_to_db, sync_extracted_pois
 from app.services.pii_redactor import redact_pii
 from app.services.supabase_client import get_supabase
 from app.services.supabase_auth import get_current_user
+from app.services.content_fingerprint import clone_contract, find_previous_extraction, text_fingerprint
+from app.services.upload_ingest import UNSUPPORTED_EXTENSIONS, UploadRejected, spool_upload
+from app.services.upload_jobs import (
+    PermanentJobError,
+    UploadJob,
+    get_upload_job_manager,
+    get_upload_spool_dir,
+)
 
 router = APIRouter(prefix="/api/captain/upload", tags=["Upload"])
 
@@ -24,6 +36,8 @@ router = APIRouter(prefix="/api/captain/upload", tags=["Upload"])
 # - Strict file type allowlist
 # - Max size 25MB (prevents timeouts + keeps costs predictable)
 MAX_FILE_SIZE = 25 * 1024 * 1024
+# Uploads are streamed to the spool (and SHA-256 fingerprinted) in chunks of this size
+READ_CHUNK_SIZE = 1024 * 1024
 
 # Text paste hardening:
 # Pasted content can be extremely large (e.g. whole web pages). We cap the amount
@@ -31,6 +45,16 @@ MAX_FILE_SIZE = 25 * 1024 * 1024
 # NOTE: We still store only a redacted snapshot up to `source_text_limit` below.
 MAX_PASTE_CHARS = 60_000
 
+# Multipass extraction (outline -> expand -> validate -> report) is opt-in via
+# LEXA_MULTIPASS=1, production included: completed passes are checkpointed per
+# upload. A failed extraction fails the upload job attempt; the job queue retries
+# it with backoff (UPLOAD_JOB_MAX_ATTEMPTS) and the retry resumes from the last
+# good pass - that is the only retry layer, so attempts don't multiply.
+# validate/report run locally unless LEXA_MULTIPASS_DEEP=1 (two more LLM calls).
+
+# Status long-poll for jobs this process doesn't run (other instance / restart): re-read the upload row this often
+STATUS_POLL_INTERVAL_S = 1.0
+
 # Supabase Storage (keep original uploads)
 CAPTAIN_UPLOADS_BUCKET = os.getenv("CAPTAIN_UPLOADS_BUCKET", "public").strip() or "public"
 CAPTAIN_UPLOADS_FOLDER = os.getenv("CAPTAIN_UPLOADS_FOLDER", "captain-uploads").strip() or "captain-uploads"
@@ -42,10 +66,11 @@ ALLOWED_MIME_TYPES = {
     "application/json",
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # docx
     "application/msword",  # doc
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",  # xlsx
     "image/png",
     "image/jpeg",
 }
-ALLOWED_EXTENSIONS = {"pdf", "txt", "json", "docx", "doc", "png", "jpg", "jpeg"}
+ALLOWED_EXTENSIONS = {"pdf", "txt", "json", "docx", "doc", "xlsx", "png", "jpg", "jpeg"}
 
 
 def _is_allowed_upload(file: UploadFile) -> bool:
@@ -59,6 +84,8 @@ def _is_allowed_upload(file: UploadFile) -> bool:
         filename = ""
     ext = filename.split(".")[-1].lower() if "." in filename else ""
     ctype = (file.content_type or "").lower()
+    if ext in UNSUPPORTED_EXTENSIONS:
+        return False  # e.g. legacy .xls: no reader, whatever content-type the client sends
     return (ctype in ALLOWED_MIME_TYPES) or (ext in ALLOWED_EXTENSIONS)
 
 
@@ -89,6 +116,19 @@ def _safe_storage_filename(name: str) -> str:
     return base[:120]
 
 
+async def _run_extraction(supabase, upload_id: str, text: str, source_meta: dict) -> dict:
+    """
+    Fast single-pass extraction by default; checkpointed multipass when
+    LEXA_MULTIPASS is enabled (a retried job resumes from the last good pass).
+    """
+    if (os.getenv("LEXA_MULTIPASS") or "").strip().lower() not in {"1", "true", "yes"}:
+        return await run_fast_extraction(text, source_meta)
+
+    checkpoints = PassCheckpoints(supabase, upload_id, text)
+    deep = (os.getenv("LEXA_MULTIPASS_DEEP") or "").strip().lower() in {"1", "true", "yes"}
+    return await run_multipass_extraction(text, source_meta, checkpoints=checkpoints, deep=deep)
+
+
 def _build_public_url(bucket: str, path: str) -> Optional[str]:
     """
     Build a public URL for a storage path (public buckets only).
@@ -105,20 +145,27 @@ def _try_upload_original_file(
     user_id: str,
     upload_id: str,
     filename: str,
-    content: bytes,
+    content: Union[bytes, str],
     content_type: Optional[str],
+    overwrite: bool = False,
 ) -> Dict[str, Optional[str]]:
     """
     Best-effort upload to Supabase Storage. Returns dict with path/url/error.
+    `content` is the file bytes, or the path of a local file to stream from disk.
+    The path is derived from the upload_id, so a retried job passes `overwrite`
+    to replace the object its earlier attempt stored instead of failing on it.
     """
     safe_name = _safe_storage_filename(filename)
     storage_path = f"{CAPTAIN_UPLOADS_FOLDER}/{user_id}/{upload_id}/{safe_name}"
+    # storage3 sends file options as request headers: x-upsert must be a string
+    options = {"content-type": content_type or "application/octet-stream", "x-upsert": "true" if overwrite else "false"}
     try:
-        supabase.storage.from_(CAPTAIN_UPLOADS_BUCKET).upload(  # type: ignore
-            storage_path,
-            content,
-            {"content-type": content_type or "application/octet-stream", "upsert": False},
-        )
+        bucket = supabase.storage.from_(CAPTAIN_UPLOADS_BUCKET)  # type: ignore
+        if isinstance(content, str):
+            with open(content, "rb") as f:
+                bucket.upload(storage_path, f, options)
+        else:
+            bucket.upload(storage_path, content, options)
         return {
             "bucket": CAPTAIN_UPLOADS_BUCKET,
             "path": storage_path,
@@ -327,14 +374,459 @@ def _package_to_legacy(intel_package: dict) -> dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# Background processing
+# Endpoints validate + enqueue; workers run parsing -> extraction -> saving
+# (app/services/upload_jobs.py). Progress is mirrored into captain_uploads.
+# ---------------------------------------------------------------------------
+
+_upload_jobs = get_upload_job_manager()
+
+# Extension -> captain_uploads.file_type (DB constraint); refined after parsing
+_FILE_TYPES = {
+    "pdf": "pdf",
+    "docx": "word",
+    "doc": "word",
+    "xlsx": "excel",
+    "txt": "text",
+    "json": "text",
+    "png": "image",
+    "jpg": "image",
+    "jpeg": "image",
+}
+
+
+def _file_type_for(filename: str) -> str:
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return _FILE_TYPES.get(ext, "text")
+
+
+def _storage_content_type(sniffed: str, declared: Optional[str]) -> str:
+    """Declared type when it is an allowed one (more specific, e.g. docx), else the sniffed type."""
+    declared = (declared or "").lower()
+    return declared if declared in ALLOWED_MIME_TYPES else sniffed
+
+
+def _status_url(upload_id: str) -> str:
+    return f"{router.prefix}/id/{upload_id}/status"
+
+
+async def _persist_job_stage(job: UploadJob) -> None:
+    """Mirror job progress into captain_uploads (processing_status + per-stage timestamps)."""
+    update = {"processing_status": job.stage, "processing_stages": job.stages}
+    if job.stage == "failed":
+        update["error_message"] = job.error
+    supabase = get_supabase()
+    await asyncio.to_thread(
+        lambda: supabase.table("captain_uploads").update(update).eq("id", job.upload_id).execute()
+    )
+    # Spooled upload is no longer needed once the job is done (it stays for retries)
+    if job.finished and job.payload.get("path"):
+        try:
+            os.remove(job.payload["path"])
+        except OSError:
+            pass
+
+
+def _intelligence_counts(intelligence: dict, final_package: dict) -> dict:
+    """Per-type counts for the upload response + captain_uploads columns."""
+    counts_meta = (final_package.get("counts", {}) if isinstance(final_package, dict) else {}) or {}
+    return {
+        "intelligence_extracted": {
+            "pois": len(intelligence.get("pois", [])),
+            "experiences": len(intelligence.get("experiences", [])),
+            "trends": len(intelligence.get("trends", [])),
+            "insights": len(intelligence.get("client_insights", [])),
+            "prices": len(intelligence.get("price_intelligence", {}).keys()) if isinstance(intelligence.get("price_intelligence"), dict) else 0,
+            "competitors": len(intelligence.get("competitor_analysis", [])),
+            "learnings": len(intelligence.get("operational_learnings", [])),
+            "service_providers": len(intelligence.get("service_providers", [])),
+        },
+        "counts_real": counts_meta.get("real_extracted", {}) if isinstance(counts_meta, dict) else {},
+        "counts_estimated": counts_meta.get("estimated_potential", {}) if isinstance(counts_meta, dict) else {},
+    }
+
+
+async def _extract_or_reuse(supabase, job: UploadJob, text: str, source_meta: dict) -> dict:
+    """
+    Clone the extraction contract of a completed upload with the same content
+    fingerprint (unless force_extract), else run the extraction.
+    """
+    upload_id = job.upload_id
+    if not job.payload.get("force_extract"):
+        previous = await find_previous_extraction(
+            supabase, "captain_uploads", job.payload.get("content_sha256"), exclude_id=upload_id
+        )
+        if previous is not None:
+            previous_id, previous_meta = previous
+            print(f"[dedupe] upload {upload_id} matches {previous_id}; reusing its extraction")
+            return clone_contract(previous_meta["extraction_contract"], source=source_meta, reused_from=previous_id)
+    try:
+        return await _run_extraction(supabase, upload_id, text, source_meta)
+    except Exception as e:
+        print(f"❌ ERROR: Multipass extraction failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise RuntimeError(f"Intelligence extraction failed: {e.__class__.__name__}: {_safe_err_msg(e)}") from e
+
+
+async def _save_or_fail(**kwargs) -> None:
+    try:
+        await save_intelligence_to_db(**kwargs)
+    except Exception as e:
+        print(f"Database save failed: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        # Not retried: rows saved before the failure would be inserted twice.
+        raise PermanentJobError(f"Database save failed: {str(e)}", status_code=500) from e
+
+
+async def _process_file_job(job: UploadJob, progress) -> dict:
+    """
+    Worker: parse the spooled file, redact, extract and save intelligence.
+    Returns the upload response (same shape as the former synchronous endpoint).
+    """
+    payload = job.payload
+    upload_id = job.upload_id
+    filename = payload["filename"]
+    file_size = payload["file_size"]
+    user_id = payload["user_id"]
+    supabase = get_supabase()
+
+    await progress("parsing")
+
+    # Best-effort: keep the original upload in Supabase Storage
+    file_storage_meta = {
+        "bucket": CAPTAIN_UPLOADS_BUCKET,
+        "path": None,
+        "stored": False,
+    }
+    storage_result = await asyncio.to_thread(
+        _try_upload_original_file,
+        supabase,
+        user_id=str(user_id),
+        upload_id=upload_id,
+        filename=filename or "upload",
+        content=payload["path"],  # streamed from the spool file
+        content_type=payload.get("content_type"),
+        overwrite=job.attempts > 1,
+    )
+    file_storage_meta["path"] = storage_result.get("path")
+    file_storage_meta["stored"] = storage_result.get("error") is None
+    if storage_result.get("error"):
+        file_storage_meta["error"] = storage_result.get("error")
+    file_url = storage_result.get("url")
+
+    # Process file
+    print(f"=== PROCESSING FILE ===")
+    # Parse straight from the spool file (engines stream it or read only what they need)
+    extracted_text, metadata = await process_file_auto(
+        payload["path"], filename=filename, content_hash=payload.get("content_sha256")
+    )
+
+    # Friendly guard: if this is an image and OCR didn't extract any meaningful text.
+    # Without this, the pipeline may try to "extract" from the placeholder string and create junk items.
+    if (metadata or {}).get("file_type") == "image":
+        ocr_performed = (metadata or {}).get("ocr_performed", False)
+        # Check if we got meaningful text (not just the placeholder)
+        if not ocr_performed or not extracted_text or len(extracted_text.strip()) < 20:
+            raise PermanentJobError(
+                f"This looks like an image upload, but {'OCR found no readable text' if ocr_performed else 'OCR is not available'}.\n"
+                "Please upload a PDF with selectable text, or paste the text directly.\n"
+                "Tip: Screenshots of text often don't OCR well — copy-paste the actual text instead."
+            )
+
+    # Redact common personal data BEFORE sending to LLM
+    extracted_text, pii_stats = redact_pii(extracted_text)
+    # Store a safe snapshot of the source text (redacted) for Brain v2 Step 1
+    source_text_limit = 60000
+    source_text_redacted = (extracted_text or "")
+    source_text_truncated = len(source_text_redacted) > source_text_limit
+    source_text_redacted = source_text_redacted[:source_text_limit]
+
+    # Log extracted text for debugging
+    print(f"=== TEXT EXTRACTION COMPLETE ===")
+    print(f"Extracted text length: {len(extracted_text) if extracted_text else 0}")
+    print(f"Metadata: {metadata}")
+    if extracted_text:
+        print(f"Extracted text preview (first 1000 chars):\n{extracted_text[:1000]}")
+    else:
+        print("ERROR: No text extracted from file!")
+
+    if not extracted_text or len(extracted_text) < 50:
+        raise PermanentJobError(
+            f"Could not extract meaningful text from file. Extracted length: {len(extracted_text) if extracted_text else 0}"
+        )
+
+    upload_meta = {
+        "filename": filename,
+        "file_size": file_size,
+        "file_type": metadata.get("file_type"),
+        "pii_redaction": pii_stats,
+        "source_text_redacted": source_text_redacted,
+        "source_text_length": len(extracted_text or ""),
+        "source_text_truncated": source_text_truncated,
+        "file_storage": file_storage_meta,
+        **metadata
+    }
+    try:
+        await asyncio.to_thread(supabase.table("captain_uploads").update({
+            "file_type": metadata.get("file_type") or _file_type_for(filename),
+            "file_url": file_url,
+            "extracted_text_length": len(extracted_text),
+            "metadata": upload_meta,
+        }).eq("id", upload_id).execute)
+    except Exception as e:
+        print(f"Failed to update upload record: {str(e)}")
+
+    # Extract intelligence with multipass pipeline
+    await progress("extracting")
+    print(f"=== STARTING MULTIPASS INTELLIGENCE EXTRACTION ===")
+    print(f"Text length to analyze: {len(extracted_text)}")
+    print(f"First 500 chars of text:\n{extracted_text[:500]}")
+
+    fallback_used = False
+    source_meta = {
+        "upload_id": upload_id,
+        "filename": filename,
+        "file_type": metadata.get("file_type"),
+        "file_size": file_size,
+    }
+    extraction_contract = await _extract_or_reuse(supabase, job, extracted_text, source_meta)
+    reused_from = (extraction_contract.get("report") or {}).get("reused_from")
+    final_package = extraction_contract.get("final_package", {}) or {}
+    intelligence = _package_to_legacy(final_package)
+    pkg_meta = (final_package.get("metadata", {}) if isinstance(final_package, dict) else {}) or {}
+
+    print(f"=== MULTIPASS EXTRACTION RETURNED ===")
+    print(f"Passes: {len(extraction_contract.get('passes', []))}")
+    print(f"Legacy POIs: {len(intelligence.get('pois', []))}")
+    print(f"Legacy Experiences: {len(intelligence.get('experiences', []))}")
+
+    total_items = (
+        len(intelligence.get('pois', [])) +
+        len(intelligence.get('experiences', [])) +
+        len(intelligence.get('trends', [])) +
+        len(intelligence.get('competitor_analysis', []))
+    )
+
+    if total_items == 0:
+        # Backup plan: create draft POIs from list-like lines so the Captain can verify/clean.
+        fallback_pois = _fallback_pois_from_text(extracted_text, limit=40)
+        if fallback_pois:
+            fallback_used = True
+            intelligence["pois"] = fallback_pois
+            total_items = len(fallback_pois)
+            print(f"⚠️ WARNING: AI returned 0 items — using fallback POI extractor ({total_items} draft POIs).")
+        else:
+            print("⚠️ WARNING: Extraction returned ZERO items (AI + fallback).")
+            raise PermanentJobError(
+                "No data extracted from this file. This usually means the document has little/no readable text (e.g., mostly images), or the AI response couldn't be parsed. Try exporting as PDF with selectable text, or paste text, or use Manual Entry.",
+                status_code=502,
+            )
+
+    # Save extracted intelligence to database
+    await progress("saving")
+    await _save_or_fail(
+        supabase=supabase,
+        intelligence=intelligence,
+        source_type="file_upload",
+        source_id=upload_id,
+        source_metadata={
+            "filename": filename,
+            "file_size": file_size,
+            "file_type": metadata.get("file_type"),
+            **metadata
+        },
+        uploaded_by=user_id
+    )
+
+    # Update upload record with extraction results
+    counts = _intelligence_counts(intelligence, final_package)
+    extracted = counts["intelligence_extracted"]
+    try:
+        await asyncio.to_thread(supabase.table("captain_uploads").update({
+            "pois_extracted": extracted["pois"],
+            "experiences_extracted": extracted["experiences"],
+            "trends_extracted": extracted["trends"],
+            "metadata": {
+                **upload_meta,
+                # Persist for history + open-from-history
+                "extraction_contract": extraction_contract,
+                "extracted_data": intelligence,
+                "captain_summary": pkg_meta.get("captain_summary"),
+                "report_markdown": pkg_meta.get("report_markdown"),
+                "fallback_extraction_used": fallback_used,
+                "reused_extraction_from": reused_from,
+            },
+        }).eq("id", upload_id).execute)
+    except Exception as e:
+        print(f"Failed to update upload record: {str(e)}")
+
+    # Return response WITH extracted data for frontend editing
+    return {
+        "success": True,
+        "upload_id": upload_id,
+        "filename": filename,
+        "status": "completed",
+        "confidence_score": 80,
+        "pois_extracted": extracted["pois"],
+        **counts,
+        "extracted_data": intelligence,  # Return full intelligence for editing
+        "extraction_contract": extraction_contract,
+        "file_size_kb": file_size / 1024,
+        "reused_extraction_from": reused_from,
+        "message": (
+            "File processed successfully"
+            + (" (identical file was already extracted — reused that extraction)" if reused_from else "")
+            + (" (fallback draft POIs created — please verify/clean)" if fallback_used else "")
+        )
+    }
+
+
+async def _process_text_job(job: UploadJob, progress) -> dict:
+    """
+    Worker: extract and save intelligence from pasted (already redacted) text.
+    """
+    payload = job.payload
+    upload_id = job.upload_id
+    text_redacted = payload["text"]
+    title = payload["title"]
+    original_len = payload["original_text_length"]
+    truncated_for_llm = payload["truncated_for_llm"]
+    upload_meta = payload["metadata"]
+    supabase = get_supabase()
+
+    # Extract intelligence via multipass
+    await progress("extracting")
+    source_meta = {
+        "upload_id": upload_id,
+        "filename": title,
+        "file_type": "text",
+        "text_length": len(text_redacted),
+        "original_text_length": original_len,
+        "truncated_for_llm": truncated_for_llm,
+    }
+    extraction_contract = await _extract_or_reuse(supabase, job, text_redacted, source_meta)
+    reused_from = (extraction_contract.get("report") or {}).get("reused_from")
+    final_package = extraction_contract.get("final_package", {}) or {}
+    intelligence = _package_to_legacy(final_package)
+    pkg_meta = (final_package.get("metadata", {}) if isinstance(final_package, dict) else {}) or {}
+
+    total_items = (
+        len(intelligence.get('pois', [])) +
+        len(intelligence.get('experiences', [])) +
+        len(intelligence.get('trends', [])) +
+        len(intelligence.get('competitor_analysis', []))
+    )
+    fallback_used = False
+    if total_items == 0:
+        fallback_pois = _fallback_pois_from_text(text_redacted, limit=40)
+        if fallback_pois:
+            fallback_used = True
+            intelligence["pois"] = fallback_pois
+            total_items = len(fallback_pois)
+        else:
+            raise PermanentJobError(
+                "No data extracted from this text. Please paste more detailed content (50+ characters) and try again.",
+                status_code=502,
+            )
+
+    # Save to database
+    await progress("saving")
+    await _save_or_fail(
+        supabase=supabase,
+        intelligence=intelligence,
+        source_type="text_paste",
+        source_id=upload_id,
+        source_metadata={
+            "title": title,
+            "description": payload.get("description"),
+            "text_length": len(text_redacted),
+            "original_text_length": original_len,
+            "truncated_for_llm": truncated_for_llm,
+        },
+        uploaded_by=payload["user_id"]
+    )
+
+    counts = _intelligence_counts(intelligence, final_package)
+    extracted = counts["intelligence_extracted"]
+
+    # Update upload record with cached extraction for history
+    try:
+        await asyncio.to_thread(supabase.table("captain_uploads").update({
+            "pois_extracted": extracted["pois"],
+            "experiences_extracted": extracted["experiences"],
+            "trends_extracted": extracted["trends"],
+            "metadata": {
+                **upload_meta,
+                "extraction_contract": extraction_contract,
+                "extracted_data": intelligence,
+                "captain_summary": pkg_meta.get("captain_summary"),
+                "report_markdown": pkg_meta.get("report_markdown"),
+                "fallback_extraction_used": fallback_used,
+                "reused_extraction_from": reused_from,
+            },
+        }).eq("id", upload_id).execute)
+    except Exception:
+        pass
+
+    return {
+        "success": True,
+        "upload_id": upload_id,
+        "filename": f"{title}.txt",
+        "status": "completed",
+        "message": (
+            "Text processed successfully"
+            + (f" (only first {MAX_PASTE_CHARS:,} characters analyzed — please split into parts for full coverage)" if truncated_for_llm else "")
+            + (" (identical text was already extracted — reused that extraction)" if reused_from else "")
+            + (" (fallback draft POIs created — please verify/clean)" if fallback_used else "")
+        ),
+        "reused_extraction_from": reused_from,
+        "pois_extracted": extracted["pois"],
+        **counts,
+        "extracted_data": intelligence,
+        "extraction_contract": extraction_contract,
+        "file_size_kb": len(text_redacted.encode('utf-8')) / 1024,
+    }
+
+
+_upload_jobs.register("file", _process_file_job)
+_upload_jobs.register("text", _process_text_job)
+_upload_jobs.on_stage = _persist_job_stage
+
+
+async def _job_response(upload_id: str, filename: str, wait: bool):
+    """
+    202 + status URL right away, or (wait=true) the finished job's result.
+    """
+    if not wait:
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "upload_id": upload_id,
+            "filename": filename,
+            "status": "queued",
+            "status_url": _status_url(upload_id),
+            "message": "Upload queued for processing",
+        })
+    job = await _upload_jobs.wait_until_finished(upload_id)
+    if job is None:
+        raise HTTPException(status_code=500, detail="Upload job disappeared")
+    if job.stage == "failed":
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error or "Processing failed")
+    return job.result
+
+
 @router.post("/")
 async def upload_file(
     file: UploadFile = File(...),
     request: Request = None,
+    wait: bool = False,
+    force_extract: bool = False,
     supabase = Depends(get_supabase)
 ):
     """
-    Upload and process a file
+    Upload a file for processing
     
     **Supported formats:**
     - PDF documents
@@ -345,14 +837,15 @@ async def upload_file(
     
     **What it does:**
     1. Validates file type and size
-    2. Extracts text and metadata
-    3. Uses Claude AI to extract 7 types of intelligence
-    4. Saves everything to Supabase
+    2. Queues the file; a background worker extracts text and metadata,
+       uses Claude AI to extract 7 types of intelligence and saves everything to Supabase
     
+    Identical files (same SHA-256) reuse the previous extraction; pass
+    `?force_extract=true` to run the LLM extraction again.
+
     **Returns:**
-    - Upload ID for tracking
-    - Number of POIs and experiences extracted
-    - Processing status
+    - 202 with the upload ID and `status_url` (poll `GET /id/{upload_id}/status?wait=25`)
+    - With `?wait=true`: the finished result (POI / experience counts, extracted data)
     """
     print(f"=== UPLOAD REQUEST RECEIVED ===")
     print(f"Filename: {file.filename}")
@@ -364,313 +857,63 @@ async def upload_file(
         if not _is_allowed_upload(file):
             raise HTTPException(
                 status_code=400,
-                detail="Unsupported file type. Allowed: pdf, docx, doc, txt, json, png, jpg/jpeg."
+                detail="Unsupported file type. Allowed: pdf, docx, doc, xlsx, txt, json, png, jpg/jpeg."
             )
 
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-        
-        # Check file size
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large ({file_size / 1024 / 1024:.1f}MB). Max 25MB."
-            )
-        
-        # Save to temp file
-        upload_id = str(uuid.uuid4())
-        temp_path = f"/tmp/{upload_id}_{file.filename}"
-        
-        with open(temp_path, 'wb') as f:
-            f.write(content)
-        
         # Resolve user (required - personal uploads/history)
         user = await get_current_user(request)
         user_id = user.get("id")
         user_email = (user.get("email") or "").lower()
 
-        # Best-effort: keep the original upload in Supabase Storage
-        file_url = None
-        file_storage_meta = {
-            "bucket": CAPTAIN_UPLOADS_BUCKET,
-            "path": None,
-            "stored": False,
-        }
-        storage_result = _try_upload_original_file(
-            supabase,
-            user_id=str(user_id),
-            upload_id=upload_id,
-            filename=file.filename or "upload",
-            content=content,
-            content_type=file.content_type,
-        )
-        file_storage_meta["path"] = storage_result.get("path")
-        file_storage_meta["stored"] = storage_result.get("error") is None
-        if storage_result.get("error"):
-            file_storage_meta["error"] = storage_result.get("error")
-        file_url = storage_result.get("url")
-
-        # Process file
-        print(f"=== PROCESSING FILE ===")
-        print(f"Temp path: {temp_path}")
-        extracted_text, metadata = await process_file_auto(temp_path)
-
-        # Friendly guard: if this is an image and OCR didn't extract any meaningful text.
-        # Without this, the pipeline may try to "extract" from the placeholder string and create junk items.
-        if (metadata or {}).get("file_type") == "image":
-            ocr_performed = (metadata or {}).get("ocr_performed", False)
-            ocr_engine = (metadata or {}).get("ocr_engine", "none")
-            # Check if we got meaningful text (not just the placeholder)
-            if not ocr_performed or not extracted_text or len(extracted_text.strip()) < 20:
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        f"This looks like an image upload, but {'OCR found no readable text' if ocr_performed else 'OCR is not available'}.\n"
-                        "Please upload a PDF with selectable text, or paste the text directly.\n"
-                        "Tip: Screenshots of text often don't OCR well — copy-paste the actual text instead."
-                    ),
-                )
-
-        # Redact common personal data BEFORE sending to LLM
-        extracted_text, pii_stats = redact_pii(extracted_text)
-        # Store a safe snapshot of the source text (redacted) for Brain v2 Step 1
-        source_text_limit = 60000
-        source_text_redacted = (extracted_text or "")
-        source_text_truncated = len(source_text_redacted) > source_text_limit
-        source_text_redacted = source_text_redacted[:source_text_limit]
-        
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-        
-        # Log extracted text for debugging
-        print(f"=== TEXT EXTRACTION COMPLETE ===")
-        print(f"Extracted text length: {len(extracted_text) if extracted_text else 0}")
-        print(f"Metadata: {metadata}")
-        if extracted_text:
-            print(f"Extracted text preview (first 1000 chars):\n{extracted_text[:1000]}")
-        else:
-            print("ERROR: No text extracted from file!")
-        
-        if not extracted_text or len(extracted_text) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Could not extract meaningful text from file. Extracted length: {len(extracted_text) if extracted_text else 0}"
+        # Stream the file into the worker's spool (size limit, type sniffing, SHA-256 on the fly)
+        upload_id = str(uuid.uuid4())
+        filename = file.filename or "upload"
+        spool_path = os.path.join(get_upload_spool_dir(), f"{upload_id}_{_safe_storage_filename(filename)}")
+        try:
+            spooled = await spool_upload(
+                file, spool_path, max_bytes=MAX_FILE_SIZE, chunk_size=READ_CHUNK_SIZE, filename=filename
             )
-        
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        file_size = spooled.size
+        content_sha256 = spooled.sha256
+
         # Create upload record FIRST with default confidence_score=80
         try:
-            upload_record = {
+            supabase.table("captain_uploads").insert({
                 "id": upload_id,
                 "uploaded_by": user_id,
                 "uploaded_by_email": user_email,
-                "filename": file.filename,
-                "file_type": metadata.get("file_type", "unknown"),
+                "filename": filename,
+                "file_type": _file_type_for(filename),
                 "file_size": file_size,
-                "file_url": file_url,
                 "keep_file": True,
-                "processing_status": "processing",
+                "processing_status": "queued",
+                "content_sha256": content_sha256,
                 "confidence_score": 80,  # Default 80% for uploads
                 "metadata": {
-                    "filename": file.filename,
-                    "file_size": file_size,
-                    "file_type": metadata.get("file_type"),
-                    "pii_redaction": pii_stats,
-                    "source_text_redacted": source_text_redacted,
-                    "source_text_length": len(extracted_text or ""),
-                    "source_text_truncated": source_text_truncated,
-                    "file_storage": file_storage_meta,
-                    **metadata
-                }
-            }
-            supabase.table("captain_uploads").insert(upload_record).execute()
-        except Exception as e:
-            print(f"Failed to create upload record: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # Continue anyway - we'll update the record later
-        
-        # Extract intelligence with multipass pipeline
-        print(f"=== STARTING MULTIPASS INTELLIGENCE EXTRACTION ===")
-        print(f"Text length to analyze: {len(extracted_text)}")
-        print(f"First 500 chars of text:\n{extracted_text[:500]}")
-        
-        fallback_used = False
-        try:
-            source_meta = {
-                "upload_id": upload_id,
-                "filename": file.filename,
-                "file_type": metadata.get("file_type"),
-                "file_size": file_size,
-            }
-            # Production reliability: default to fast (single-pass) to avoid HTTP timeouts.
-            # Enable multi-pass explicitly in non-production via LEXA_MULTIPASS=1.
-            env = (os.getenv("ENVIRONMENT") or "").lower()
-            multipass_enabled = (os.getenv("LEXA_MULTIPASS") or "").strip().lower() in {"1", "true", "yes"}
-            if env == "production" or not multipass_enabled:
-                extraction_contract = await run_fast_extraction(extracted_text, source_meta)
-            else:
-                extraction_contract = await run_multipass_extraction(extracted_text, source_meta)
-            final_package = extraction_contract.get("final_package", {}) or {}
-            intelligence = _package_to_legacy(final_package)
-            pkg_meta = (final_package.get("metadata", {}) if isinstance(final_package, dict) else {}) or {}
-
-            print(f"=== MULTIPASS EXTRACTION RETURNED ===")
-            print(f"Passes: {len(extraction_contract.get('passes', []))}")
-            print(f"Legacy POIs: {len(intelligence.get('pois', []))}")
-            print(f"Legacy Experiences: {len(intelligence.get('experiences', []))}")
-            
-            total_items = (
-                len(intelligence.get('pois', [])) +
-                len(intelligence.get('experiences', [])) +
-                len(intelligence.get('trends', [])) +
-                len(intelligence.get('competitor_analysis', []))
-            )
-            
-            if total_items == 0:
-                # Backup plan: create draft POIs from list-like lines so the Captain can verify/clean.
-                fallback_pois = _fallback_pois_from_text(extracted_text, limit=40)
-                if fallback_pois:
-                    fallback_used = True
-                    intelligence["pois"] = fallback_pois
-                    total_items = len(fallback_pois)
-                    print(f"⚠️ WARNING: AI returned 0 items — using fallback POI extractor ({total_items} draft POIs).")
-                else:
-                    error_msg = "Extraction returned ZERO items (AI + fallback)."
-                    print(f"⚠️ WARNING: {error_msg}")
-                    try:
-                        supabase.table("captain_uploads").update({
-                            "processing_status": "failed",
-                            "error_message": error_msg
-                        }).eq("id", upload_id).execute()
-                    except Exception:
-                        pass
-                    raise HTTPException(
-                        status_code=502,
-                        detail="No data extracted from this file. This usually means the document has little/no readable text (e.g., mostly images), or the AI response couldn't be parsed. Try exporting as PDF with selectable text, or paste text, or use Manual Entry."
-                    )
-        except HTTPException as e:
-            # Preserve the original detail/status (don't wrap into a generic 500).
-            try:
-                supabase.table("captain_uploads").update({
-                    "processing_status": "failed",
-                    "error_message": getattr(e, "detail", "HTTPException"),
-                }).eq("id", upload_id).execute()
-            except Exception:
-                pass
-            raise
-        except Exception as e:
-            print(f"❌ ERROR: Multipass extraction failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # Update upload record to failed status
-            try:
-                supabase.table("captain_uploads").update({
-                    "processing_status": "failed",
-                    "error_message": f"{e.__class__.__name__}: {_safe_err_msg(e)}"
-                }).eq("id", upload_id).execute()
-            except:
-                pass
-            raise HTTPException(
-                status_code=500,
-                detail=f"Intelligence extraction failed: {e.__class__.__name__}: {_safe_err_msg(e)}"
-            )
-        
-        # Save extracted intelligence to database
-        try:
-            await save_intelligence_to_db(
-                supabase=supabase,
-                intelligence=intelligence,
-                source_type="file_upload",
-                source_id=upload_id,
-                source_metadata={
-                    "filename": file.filename,
+                    "filename": filename,
                     "file_size": file_size,
-                    "file_type": metadata.get("file_type"),
-                    **metadata
                 },
-                uploaded_by=user_id
-            )
+            }).execute()
         except Exception as e:
-            print(f"Database save failed: {str(e)}")
+            print(f"Failed to create upload record: {str(e)}")
             import traceback
             traceback.print_exc()
-            # Update upload record to failed status
-            try:
-                supabase.table("captain_uploads").update({
-                    "processing_status": "failed",
-                    "error_message": f"Database save failed: {str(e)}"
-                }).eq("id", upload_id).execute()
-            except:
-                pass
-            raise HTTPException(
-                status_code=500,
-                detail=f"Database save failed: {str(e)}"
-            )
-        
-        # Update upload record with extraction results
-        pois_count = len(intelligence.get("pois", []))
-        experiences_count = len(intelligence.get("experiences", []))
-        trends_count = len(intelligence.get("trends", []))
-        insights_count = len(intelligence.get("client_insights", []))
-        prices_count = len(intelligence.get("price_intelligence", {}).keys()) if isinstance(intelligence.get("price_intelligence"), dict) else 0
-        competitors_count = len(intelligence.get("competitor_analysis", []))
-        learnings_count = len(intelligence.get("operational_learnings", []))
-        providers_count = len(intelligence.get("service_providers", []))
-        counts_meta = (final_package.get("counts", {}) if isinstance(final_package, dict) else {}) or {}
-        real_counts = counts_meta.get("real_extracted", {}) if isinstance(counts_meta, dict) else {}
-        estimated_counts = counts_meta.get("estimated_potential", {}) if isinstance(counts_meta, dict) else {}
-        
-        try:
-            supabase.table("captain_uploads").update({
-                "processing_status": "completed",
-                "pois_extracted": pois_count,
-                "experiences_extracted": experiences_count,
-                "trends_extracted": trends_count,
-                "metadata": {
-                    **(upload_record.get("metadata", {}) if isinstance(upload_record, dict) else {}),
-                    "pii_redaction": pii_stats,
-                    "source_text_redacted": source_text_redacted,
-                    "source_text_length": len(extracted_text or ""),
-                    "source_text_truncated": source_text_truncated,
-                    # Persist for history + open-from-history
-                    "extraction_contract": extraction_contract,
-                    "extracted_data": intelligence,
-                    "captain_summary": pkg_meta.get("captain_summary"),
-                    "report_markdown": pkg_meta.get("report_markdown"),
-                    "fallback_extraction_used": fallback_used,
-                },
-            }).eq("id", upload_id).execute()
-        except Exception as e:
-            print(f"Failed to update upload record: {str(e)}")
-        
-        # Return response WITH extracted data for frontend editing
-        return {
-            "success": True,
-            "upload_id": upload_id,
-            "filename": file.filename,
-            "status": "completed",
-            "confidence_score": 80,
-            "pois_extracted": pois_count,
-            "intelligence_extracted": {
-                "pois": pois_count,
-                "experiences": experiences_count,
-                "trends": trends_count,
-                "insights": insights_count,
-                "prices": prices_count,
-                "competitors": competitors_count,
-                "learnings": learnings_count,
-                "service_providers": providers_count,
-            },
-            "counts_real": real_counts,
-            "counts_estimated": estimated_counts,
-            "extracted_data": intelligence,  # Return full intelligence for editing
-            "extraction_contract": extraction_contract,
-            "file_size_kb": file_size / 1024,
-            "message": "File processed successfully" + (" (fallback draft POIs created — please verify/clean)" if fallback_used else "")
-        }
-        
+            # Continue anyway - the worker updates the record later
+
+        await _upload_jobs.enqueue(upload_id, "file", {
+            "path": spool_path,
+            "filename": filename,
+            "content_type": _storage_content_type(spooled.mime_type, file.content_type),
+            "file_size": file_size,
+            "content_sha256": content_sha256,
+            "force_extract": force_extract,
+            "user_id": user_id,
+            "user_email": user_email,
+        })
+        return await _job_response(upload_id, filename, wait)
+
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -681,15 +924,19 @@ async def upload_file(
 async def upload_text(
     request: UploadTextRequest,
     http_request: Request,
+    wait: bool = False,
+    force_extract: bool = False,
     supabase = Depends(get_supabase)
 ):
     """
-    Process pasted text directly
+    Process pasted text
     
     **What it does:**
-    1. Validates text length
-    2. Extracts intelligence with Claude AI
-    3. Saves to database
+    1. Validates text length and redacts personal data
+    2. Queues extraction with Claude AI + saving to the database (background worker)
+
+    **Returns:** like `POST /` (202 + `status_url`, or the result with `?wait=true`);
+    identical text reuses the previous extraction unless `?force_extract=true`
     
     **Use cases:**
     - Paste travel guides
@@ -716,10 +963,24 @@ async def upload_text(
         user_email = (user.get("email") or "").lower()
 
         upload_id = str(uuid.uuid4())
+        # Redact before queueing so only redacted text is ever persisted
         text_redacted, pii_stats = redact_pii(raw_text)
+        content_sha256 = text_fingerprint(text_redacted)
         source_text_limit = 60000
         source_text_truncated = len(text_redacted or "") > source_text_limit
         source_text_redacted = (text_redacted or "")[:source_text_limit]
+        upload_meta = {
+            "title": request.title,
+            "description": request.source_description,
+            "text_length": len(text_redacted),
+            "original_text_length": original_len,
+            "truncated_for_llm": truncated_for_llm,
+            "max_paste_chars": MAX_PASTE_CHARS,
+            "pii_redaction": pii_stats,
+            "source_text_redacted": source_text_redacted,
+            "source_text_length": len(text_redacted or ""),
+            "source_text_truncated": source_text_truncated,
+        }
 
         # Create upload record (paste)
         try:
@@ -730,176 +991,28 @@ async def upload_text(
                 "filename": f"{request.title}.txt",
                 "file_type": "paste",
                 "file_size": len(text_redacted.encode("utf-8")),
-                "processing_status": "processing",
+                "processing_status": "queued",
+                "content_sha256": content_sha256,
                 "confidence_score": 80,
                 "extracted_text_length": len(text_redacted),
-                "metadata": {
-                    "title": request.title,
-                    "description": request.source_description,
-                    "text_length": len(text_redacted),
-                    "original_text_length": original_len,
-                    "truncated_for_llm": truncated_for_llm,
-                    "max_paste_chars": MAX_PASTE_CHARS,
-                    "pii_redaction": pii_stats,
-                    "source_text_redacted": source_text_redacted,
-                    "source_text_length": len(text_redacted or ""),
-                    "source_text_truncated": source_text_truncated,
-                },
+                "metadata": upload_meta,
             }).execute()
         except Exception:
             pass
-        
-        # Extract intelligence via multipass
-        source_meta = {
-            "upload_id": upload_id,
-            "filename": request.title,
-            "file_type": "text",
-            "text_length": len(text_redacted),
+
+        await _upload_jobs.enqueue(upload_id, "text", {
+            "text": text_redacted,
+            "title": request.title,
+            "description": request.source_description,
             "original_text_length": original_len,
             "truncated_for_llm": truncated_for_llm,
-        }
-        env = (os.getenv("ENVIRONMENT") or "").lower()
-        multipass_enabled = (os.getenv("LEXA_MULTIPASS") or "").strip().lower() in {"1", "true", "yes"}
-        try:
-            if env == "production" or not multipass_enabled:
-                extraction_contract = await run_fast_extraction(text_redacted, source_meta)
-            else:
-                extraction_contract = await run_multipass_extraction(text_redacted, source_meta)
-        except HTTPException as e:
-            # Preserve original detail/status
-            try:
-                supabase.table("captain_uploads").update({
-                    "processing_status": "failed",
-                    "error_message": getattr(e, "detail", "HTTPException"),
-                }).eq("id", upload_id).execute()
-            except Exception:
-                pass
-            raise
-        except Exception as e:
-            try:
-                supabase.table("captain_uploads").update({
-                    "processing_status": "failed",
-                    "error_message": f"{e.__class__.__name__}: {_safe_err_msg(e)}",
-                }).eq("id", upload_id).execute()
-            except Exception:
-                pass
-            raise HTTPException(
-                status_code=500,
-                detail=f"Intelligence extraction failed: {e.__class__.__name__}: {_safe_err_msg(e)}"
-            )
-        final_package = extraction_contract.get("final_package", {}) or {}
-        intelligence = _package_to_legacy(final_package)
-        pkg_meta = (final_package.get("metadata", {}) if isinstance(final_package, dict) else {}) or {}
-
-        total_items = (
-            len(intelligence.get('pois', [])) +
-            len(intelligence.get('experiences', [])) +
-            len(intelligence.get('trends', [])) +
-            len(intelligence.get('competitor_analysis', []))
-        )
-        fallback_used = False
-        if total_items == 0:
-            fallback_pois = _fallback_pois_from_text(text_redacted, limit=40)
-            if fallback_pois:
-                fallback_used = True
-                intelligence["pois"] = fallback_pois
-                total_items = len(fallback_pois)
-            else:
-                try:
-                    supabase.table("captain_uploads").update({
-                        "processing_status": "failed",
-                        "error_message": "Extraction returned zero items."
-                    }).eq("id", upload_id).execute()
-                except Exception:
-                    pass
-                raise HTTPException(
-                    status_code=502,
-                    detail="No data extracted from this text. Please paste more detailed content (50+ characters) and try again."
-                )
-        
-        # Save to database
-        await save_intelligence_to_db(
-            supabase=supabase,
-            intelligence=intelligence,
-            source_type="text_paste",
-            source_id=upload_id,
-            source_metadata={
-                "title": request.title,
-                "description": request.source_description,
-                "text_length": len(text_redacted),
-                "original_text_length": original_len,
-                "truncated_for_llm": truncated_for_llm,
-            },
-            uploaded_by=user_id
-        )
-        
-        # Map to frontend-expected format
-        pois_count = len(intelligence.get("pois", []))
-        experiences_count = len(intelligence.get("experiences", []))
-        trends_count = len(intelligence.get("trends", []))
-        insights_count = len(intelligence.get("client_insights", []))
-        prices_count = len(intelligence.get("price_intelligence", {}).keys()) if isinstance(intelligence.get("price_intelligence"), dict) else 0
-        competitors_count = len(intelligence.get("competitor_analysis", []))
-        learnings_count = len(intelligence.get("operational_learnings", []))
-        providers_count = len(intelligence.get("service_providers", []))
-        counts_meta = (final_package.get("counts", {}) if isinstance(final_package, dict) else {}) or {}
-        real_counts = counts_meta.get("real_extracted", {}) if isinstance(counts_meta, dict) else {}
-        estimated_counts = counts_meta.get("estimated_potential", {}) if isinstance(counts_meta, dict) else {}
-        
-        # Update upload record with final status + cached extraction for history
-        try:
-            supabase.table("captain_uploads").update({
-                "processing_status": "completed",
-                "pois_extracted": pois_count,
-                "experiences_extracted": experiences_count,
-                "trends_extracted": trends_count,
-                "metadata": {
-                    "title": request.title,
-                    "description": request.source_description,
-                    "text_length": len(text_redacted),
-                    "original_text_length": original_len,
-                    "truncated_for_llm": truncated_for_llm,
-                    "max_paste_chars": MAX_PASTE_CHARS,
-                    "pii_redaction": pii_stats,
-                    "source_text_redacted": source_text_redacted,
-                    "source_text_length": len(text_redacted or ""),
-                    "source_text_truncated": source_text_truncated,
-                    "extraction_contract": extraction_contract,
-                    "extracted_data": intelligence,
-                    "captain_summary": pkg_meta.get("captain_summary"),
-                    "report_markdown": pkg_meta.get("report_markdown"),
-                    "fallback_extraction_used": fallback_used,
-                },
-            }).eq("id", upload_id).execute()
-        except Exception:
-            pass
-
-        return {
-            "success": True,
-            "upload_id": upload_id,
-            "filename": f"{request.title}.txt",
-            "status": "completed",
-            "message": (
-                "Text processed successfully"
-                + (f" (only first {MAX_PASTE_CHARS:,} characters analyzed — please split into parts for full coverage)" if truncated_for_llm else "")
-                + (" (fallback draft POIs created — please verify/clean)" if fallback_used else "")
-            ),
-            "pois_extracted": pois_count,
-            "intelligence_extracted": {
-                "pois": pois_count,
-                "experiences": experiences_count,
-                "trends": trends_count,
-                "insights": insights_count,
-                "prices": prices_count,
-                "competitors": competitors_count,
-                "learnings": learnings_count,
-                "service_providers": providers_count,
-            },
-            "counts_real": real_counts,
-            "counts_estimated": estimated_counts,
-            "extraction_contract": extraction_contract,
-            "file_size_kb": len(text_redacted.encode('utf-8')) / 1024,
-        }
+            "metadata": upload_meta,
+            "content_sha256": content_sha256,
+            "force_extract": force_extract,
+            "user_id": user_id,
+            "user_email": user_email,
+        })
+        return await _job_response(upload_id, f"{request.title}.txt", wait)
         
     except HTTPException as e:
         raise e
@@ -910,6 +1023,68 @@ async def upload_text(
         )
 
 
+@router.get("/id/{upload_id}/status")
+async def get_upload_status(
+    upload_id: uuid.UUID,
+    request: Request,
+    wait: float = 0,
+    since: Optional[str] = None,
+    supabase = Depends(get_supabase),
+):
+    """
+    Processing status of an upload (queued, parsing, extracting, saving, completed, failed)
+    with per-stage timestamps; `result` holds the upload response once completed.
+
+    Long-poll: with `wait` (seconds, max 30) the call returns as soon as the
+    status differs from `since` (or changes at all), or when `wait` runs out.
+    Uploads this process doesn't run are followed by re-reading the upload row.
+    """
+    user = await get_current_user(request)
+    user_id = user.get("id")
+    user_email = (user.get("email") or "").lower()
+
+    job = await _upload_jobs.get(str(upload_id))
+    if job is not None:
+        owner = job.payload.get("user_id")
+        if owner != user_id and (job.payload.get("user_email") or "").lower() != user_email:
+            raise HTTPException(status_code=404, detail="Upload not found")
+        if wait > 0:
+            job = await _upload_jobs.wait(str(upload_id), since=since, timeout=min(wait, 30.0))
+        return job.status()
+
+    # Not known to this worker pool (finished long ago / other instance): poll the upload row
+    query = supabase.table("captain_uploads")\
+        .select("id, uploaded_by, uploaded_by_email, processing_status, processing_stages, error_message")\
+        .eq("id", str(upload_id))\
+        .limit(1)
+    resp = await asyncio.to_thread(query.execute)
+    if not resp.data:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    row = resp.data[0]
+    if row.get("uploaded_by") != user_id and (row.get("uploaded_by_email") or "").lower() != user_email:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    deadline = time.monotonic() + min(max(wait, 0.0), 30.0)
+    baseline = since if since is not None else row.get("processing_status")
+    while (
+        row.get("processing_status") == baseline
+        and row.get("processing_status") not in {"completed", "failed"}
+        and time.monotonic() < deadline
+    ):
+        await asyncio.sleep(min(STATUS_POLL_INTERVAL_S, max(0.0, deadline - time.monotonic())))
+        resp = await asyncio.to_thread(query.execute)
+        if resp.data:
+            row = resp.data[0]
+    return {
+        "upload_id": str(upload_id),
+        "status": row.get("processing_status"),
+        "stages": row.get("processing_stages") or {},
+        "attempts": None,
+        "error": row.get("error_message"),
+        "error_status": None,
+        "result": None,  # completed: full data via GET /id/{upload_id}
+    }
+
+
 @router.get("/history")
 async def get_upload_history(
     limit: int = 50,
@@ -1142,17 +1317,31 @@ async def update_upload(
     if should_refresh and isinstance(next_meta, dict):
         extracted = next_meta.get("extracted_data")
     if should_refresh and isinstance(extracted, dict) and extracted.get("pois") is not None:
+        # Delta save: only the POIs the captain added / changed / removed are written
+        previous_extracted = current_meta.get("extracted_data") if isinstance(current_meta.get("extracted_data"), dict) else {}
         try:
-            await save_intelligence_to_db(
+            await sync_extracted_pois(
                 supabase=supabase,
-                intelligence={"pois": extracted.get("pois") or []},
+                previous_pois=previous_extracted.get("pois") or [],
+                pois=extracted.get("pois") or [],
                 source_type="file_upload",
                 source_id=str(upload_id),
                 source_metadata={"filename": existing.data[0].get("filename")},
                 uploaded_by=user_id,
             )
-        except Exception:
-            pass
+        except Exception as e:
+            print(f"POI delta save failed, rewriting all POIs: {str(e)}")
+            try:
+                await save_intelligence_to_db(
+                    supabase=supabase,
+                    intelligence={"pois": extracted.get("pois") or []},
+                    source_type="file_upload",
+                    source_id=str(upload_id),
+                    source_metadata={"filename": existing.data[0].get("filename")},
+                    uploaded_by=user_id,
+                )
+            except Exception:
+                pass
 
         # Update counts for history display
         try:
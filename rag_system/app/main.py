@@ -157,6 +157,26 @@ except ImportError as e:
     print(f"Warning: Could not import company brain router: {e}")
 
 
+@app.on_event("startup")
+async def start_upload_workers():
+    """Start the upload worker pool (resumes unfinished jobs with the sqlite backend) and the parser processes"""
+    from app.services.parser_pool import get_parser_pool
+    from app.services.upload_jobs import get_upload_job_manager
+    await get_upload_job_manager().start()
+    try:
+        await get_parser_pool().warm_up()
+    except Exception as e:
+        print(f"[parser-pool] warm-up failed: {e}")
+
+
+@app.on_event("shutdown")
+async def stop_upload_workers():
+    from app.services.parser_pool import shutdown_parser_pool
+    from app.services.upload_jobs import get_upload_job_manager
+    await get_upload_job_manager().stop()
+    shutdown_parser_pool()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -194,6 +214,35 @@ async def health_check():
     }
 
 
+@app.get("/llm/scheduler")
+async def llm_scheduler_status():
+    """LLM scheduler introspection: queued/in-flight extraction work per provider and priority"""
+    from core.llm.scheduler import get_scheduler_stats
+    return {"providers": get_scheduler_stats()}
+
+
+@app.get("/upload/jobs")
+async def upload_jobs_status():
+    """Upload worker pool introspection: backend, workers, queued/running upload jobs, parser pool, parsed-text cache size"""
+    import asyncio
+    from app.services.file_processor import parse_cache_stats
+    from app.services.parser_pool import get_parser_pool
+    from app.services.upload_jobs import get_upload_job_manager
+    return {
+        **get_upload_job_manager().snapshot(),
+        "parser_pool": get_parser_pool().snapshot(),
+        "parse_cache": await asyncio.to_thread(parse_cache_stats),
+    }
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: LLM call counters and latency/queue-wait histograms per pipeline stage"""
+    from fastapi.responses import PlainTextResponse
+    from core.llm.telemetry import PROMETHEUS_CONTENT_TYPE, render_prometheus
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.post("/test/extraction")
 async def test_extraction(request: dict = None):
     """Test endpoint to verify Claude extraction is working"""
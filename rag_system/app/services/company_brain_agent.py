@@ -20,6 +20,8 @@ import anthropic
 
 from app.services.file_processor import process_file_auto
 from app.services.supabase_client import get_supabase
+from core.llm.scheduler import estimate_tokens, llm_slot
+from core.llm.telemetry import track_llm_call
 
 
 class CompanyBrainAgent:
@@ -40,7 +42,7 @@ class CompanyBrainAgent:
             print("WARNING: ANTHROPIC_API_KEY not set!")
             self.client = None
         else:
-            self.client = anthropic.Anthropic(api_key=api_key)
+            self.client = anthropic.AsyncAnthropic(api_key=api_key)
         
         self.model = "claude-sonnet-4-20250514"
         self.supabase = get_supabase()
@@ -78,27 +80,15 @@ class CompanyBrainAgent:
         # 1. Extract text from Word document
         try:
             # process_file_auto returns a tuple (text, metadata), not a dict
-            # Save to temp file first
-            import tempfile
             # IMPORTANT:
             # Preserve the original extension so `process_file_auto()` can route correctly.
             # (Hardcoding ".docx" breaks PDFs and old .doc files.)
             suffix = os.path.splitext(file_path or "")[1].lower() or ".txt"
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-                temp_file.write(file_content)
-                temp_path = temp_file.name
             
-            # Process file - returns (text, metadata) tuple
-            extracted_text, metadata = await process_file_auto(temp_path)
+            # Process the bytes in memory - returns (text, metadata) tuple
+            extracted_text, metadata = await process_file_auto(file_content, filename=f"upload{suffix}")
             text_content = extracted_text
             
-            # Clean up temp file
-            import os
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-            
             if len(text_content) < 100:
                 raise ValueError("Document appears empty or unreadable")
         
@@ -113,12 +103,20 @@ class CompanyBrainAgent:
         
         # 3. Call Claude for deep analysis
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=8000,  # Large context for comprehensive analysis
-                temperature=0.3,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            async with llm_slot(
+                "anthropic",
+                priority="batch",
+                tokens=estimate_tokens(len(prompt), 8000),
+                label="company_brain:analyze",
+            ) as waited:
+                with track_llm_call("company_brain:analyze", "anthropic", self.model, queue_wait_s=waited) as call:
+                    response = await self.client.messages.create(
+                        model=self.model,
+                        max_tokens=8000,  # Large context for comprehensive analysis
+                        temperature=0.3,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    call.add_usage(getattr(response, "usage", None))
             
             response_text = response.content[0].text if hasattr(response.content[0], 'text') else str(response.content[0])
             
@@ -164,12 +162,20 @@ class CompanyBrainAgent:
         prompt = self._build_synthesis_prompt(all_analyses)
         
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=10000,
-                temperature=0.3,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            async with llm_slot(
+                "anthropic",
+                priority="batch",
+                tokens=estimate_tokens(len(prompt), 10000),
+                label="company_brain:synthesize",
+            ) as waited:
+                with track_llm_call("company_brain:synthesize", "anthropic", self.model, queue_wait_s=waited) as call:
+                    response = await self.client.messages.create(
+                        model=self.model,
+                        max_tokens=10000,
+                        temperature=0.3,
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    call.add_usage(getattr(response, "usage", None))
             
             response_text = response.content[0].text if hasattr(response.content[0], 'text') else str(response.content[0])
             
@@ -0,0 +1,68 @@
+"""
+Content fingerprints for upload / scrape deduplication
+
+Identical PDFs get re-uploaded by different captains and the same pages get
+re-scraped. Rows in `captain_uploads` and `scraped_urls` carry a SHA-256
+`content_sha256` (raw bytes for files, normalized text for pastes and scraped
+pages); when a new upload matches a previous row that already has an
+`extraction_contract`, that contract is cloned instead of running the LLM again.
+"""
+
+import asyncio
+import copy
+import hashlib
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+def text_fingerprint(text: str) -> str:
+    """SHA-256 of text with whitespace collapsed and case folded."""
+    normalized = re.sub(r"\s+", " ", text or "").strip().casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+async def find_previous_extraction(
+    supabase,
+    table: str,
+    fingerprint: Optional[str],
+    *,
+    exclude_id: Optional[str] = None,
+    status_column: str = "processing_status",
+    status_value: str = "completed",
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Most recent `table` row with this fingerprint and a cached extraction.
+    Returns (row id, row metadata) or None. Lookup errors count as "no match".
+    """
+    if not fingerprint:
+        return None
+    try:
+        resp = await asyncio.to_thread(
+            lambda: supabase.table(table)
+            .select(f"id, {status_column}, metadata")
+            .eq("content_sha256", fingerprint)
+            .eq(status_column, status_value)
+            .order("created_at", desc=True)
+            .limit(5)
+            .execute()
+        )
+    except Exception as e:
+        print(f"[dedupe] fingerprint lookup on {table} failed: {e}")
+        return None
+    for row in resp.data or []:
+        meta = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
+        if row.get("id") != exclude_id and meta.get("extraction_contract"):
+            return row["id"], meta
+    return None
+
+
+def clone_contract(contract: Dict[str, Any], *, source: Dict[str, Any], reused_from: str) -> Dict[str, Any]:
+    """Copy of a cached extraction contract re-pointed at the new upload."""
+    cloned = copy.deepcopy(contract)
+    cloned["source"] = {**(cloned.get("source") or {}), **source}
+    report = dict(cloned.get("report") or {})
+    report["reused_from"] = reused_from
+    report["reused_at"] = datetime.utcnow().isoformat()
+    cloned["report"] = report
+    return cloned
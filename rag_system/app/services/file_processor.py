@@ -5,11 +5,25 @@ Handles extraction of text and metadata from various file formats
 
 import os
 import io
+import asyncio
 import base64
-from typing import Tuple, Dict, Optional
+import hashlib
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Tuple, Dict, Optional, Union
 import mimetypes
 import httpx
 
+from core.llm.cache import LLMResponseCache, make_cache_key
+from core.llm.image_prep import OCR_MAX_SIDE, OCR_MIN_SIDE, image_sha256, prepare_image
+from app.services.parser_pool import ParserError, ParserTimeout, get_parser_pool
+
 # PDF processing
 try:
     import PyPDF2
@@ -47,151 +61,419 @@ except ImportError:
     TESSERACT_AVAILABLE = False
 
 
-async def process_pdf(file_path: str) -> Tuple[str, Dict]:
+# Processors accept a path or the file contents in memory (bytes / memoryview).
+# The parsing itself runs in the parser pool (app.services.parser_pool); paths
+# are passed to the workers as-is, buffers as bytes, and a temp file is written
+# only for engines that need a path (PDF pages).
+FileSource = Union[str, bytes, bytearray, memoryview]
+
+
+def _as_bytes(data: Union[bytes, bytearray, memoryview]) -> bytes:
+    """`bytes` for APIs that insist on them, without copying when `data` already wraps a whole bytes object."""
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, memoryview) and isinstance(data.obj, bytes) and data.nbytes == len(data.obj):
+        return data.obj
+    return bytes(data)
+
+
+def _read_source(source: FileSource) -> bytes:
+    """File contents (a path is read once; buffers are not copied)."""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return f.read()
+    return _as_bytes(source)
+
+
+def _open_source(source: FileSource):
+    """Binary file object for libraries that read a stream."""
+    if isinstance(source, str):
+        return open(source, 'rb')
+    return io.BytesIO(_as_bytes(source))
+
+
+def _worker_source(source: FileSource) -> Union[str, bytes]:
+    """Picklable form of a source for the parser pool (memoryviews cannot be pickled)."""
+    return source if isinstance(source, (str, bytes)) else _as_bytes(source)
+
+
+@contextmanager
+def _source_path(source: FileSource, suffix: str) -> Iterator[str]:
+    """Path to the file; in-memory sources are written to a temp file for the duration."""
+    if isinstance(source, str):
+        yield source
+        return
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(source)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# PDF pages are extracted one job per page in the parser pool (PyPDF2 is pure Python and would block the event loop).
+PDF_PAGE_TIMEOUT_S = float(os.getenv("PDF_PAGE_TIMEOUT_S") or 15)
+# Stop reading once this many characters were extracted (extraction truncates anyway)
+PDF_CHAR_BUDGET = int(os.getenv("PDF_CHAR_BUDGET") or 300_000)
+# Give up on a PDF after this many page timeouts
+PDF_MAX_PAGE_TIMEOUTS = 3
+
+# Worker-process cache: the PdfReader of the file currently being read, keyed by (path, mtime)
+_worker_reader: Tuple[Optional[Tuple[str, float]], object] = (None, None)
+
+
+def _worker_pdf_reader(file_path: str):
+    global _worker_reader
+    key = (file_path, os.path.getmtime(file_path))
+    if _worker_reader[0] != key:
+        _worker_reader = (key, PyPDF2.PdfReader(file_path))
+    return _worker_reader[1]
+
+
+def _pdf_info(file_path: str) -> Dict:
+    """(worker) Page count + document metadata."""
+    reader = _worker_pdf_reader(file_path)
+    info = {"pages": len(reader.pages)}
+    if reader.metadata:
+        for key, name in (('/Title', 'title'), ('/Author', 'author'), ('/Subject', 'subject')):
+            if reader.metadata.get(key):
+                info[name] = str(reader.metadata.get(key))
+    return info
+
+
+def _pdf_page_text(file_path: str, page_index: int) -> str:
+    """(worker) Text of one page."""
+    return _worker_pdf_reader(file_path).pages[page_index].extract_text() or ""
+
+
+def _pdf_page_images(file_path: str, page_index: int) -> List[bytes]:
+    """(worker) Embedded images of one page (scanned PDFs)."""
+    page = _worker_pdf_reader(file_path).pages[page_index]
+    return [image.data for image in page.images]
+
+
+async def iter_pdf_pages(
+    file_path: str,
+    *,
+    char_budget: Optional[int] = None,
+    page_timeout_s: Optional[float] = None,
+    stats: Optional[Dict] = None,
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Stream (page_number, text) for the pages of a PDF, in order, extracted in
+    the parser pool with a per-page timeout (timed-out or failing pages are
+    skipped). Stops early once `char_budget` characters were yielded.
+
+    `stats` (optional) is filled with pages, pages_read, pages_failed,
+    pages_timed_out, empty_pages (no text layer) and char_budget_reached.
     """
-    Extract text from PDF files
+    budget = PDF_CHAR_BUDGET if char_budget is None else char_budget
+    timeout = PDF_PAGE_TIMEOUT_S if page_timeout_s is None else page_timeout_s
+    stats = stats if stats is not None else {}
+    stats.update({
+        "pages_read": 0, "pages_failed": [], "pages_timed_out": [], "empty_pages": [], "char_budget_reached": False,
+    })
+
+    pool = get_parser_pool()
+    try:
+        info = await pool.run("pdf", _pdf_info, file_path, timeout=timeout)
+    except ParserTimeout:
+        raise Exception(f"PDF could not be opened within {timeout:.0f}s")
+    stats.update(info)
+    total = int(info.get("pages") or 0)
+
+    # Keep a small window of pages in flight so the workers stay busy but we never over-read the budget by much
+    window = pool.workers * 2
+    pending: Dict[int, asyncio.Future] = {}
+    next_page = 0
+    chars = 0
+    try:
+        for page_index in range(total):
+            while next_page < total and len(pending) < window:
+                pending[next_page] = asyncio.ensure_future(
+                    pool.run("pdf_page", _pdf_page_text, file_path, next_page, timeout=timeout)
+                )
+                next_page += 1
+            future = pending.pop(page_index)
+            try:
+                text = await future
+            except ParserTimeout:
+                # The pool killed the stuck worker; the other pages in flight are retried in a new one
+                print(f"PDF page {page_index + 1} timed out after {timeout:.0f}s - skipped")
+                stats["pages_timed_out"].append(page_index + 1)
+                if len(stats["pages_timed_out"]) >= PDF_MAX_PAGE_TIMEOUTS:
+                    print(f"PDF reading stopped after {len(stats['pages_timed_out'])} page timeouts")
+                    break
+                continue
+            except Exception as e:
+                print(f"Error extracting page {page_index + 1}: {e}")
+                stats["pages_failed"].append(page_index + 1)
+                continue
+            stats["pages_read"] += 1
+            if not text.strip():
+                stats["empty_pages"].append(page_index + 1)
+                continue
+            yield page_index + 1, text
+            chars += len(text)
+            if budget and chars >= budget:
+                stats["char_budget_reached"] = True
+                break
+    finally:
+        for other in pending.values():
+            other.cancel()
+
+
+async def _ocr_pdf_pages(file_path: str, page_numbers: List[int]) -> Dict[int, str]:
+    """OCR the embedded images of the given (1-based) pages concurrently; returns page -> text."""
+    pool = get_parser_pool()
+    page_images = await asyncio.gather(*[
+        pool.run("pdf_images", _pdf_page_images, file_path, page_num - 1, timeout=PDF_PAGE_TIMEOUT_S)
+        for page_num in page_numbers
+    ], return_exceptions=True)
+
+    jobs: List[Tuple[int, bytes]] = []
+    for page_num, images in zip(page_numbers, page_images):
+        if isinstance(images, BaseException):
+            print(f"Could not read images of PDF page {page_num}: {images}")
+            continue
+        jobs.extend((page_num, image) for image in images)
+    if not jobs:
+        return {}
+
+    results = await ocr_images([image for _, image in jobs])
+    texts: Dict[int, List[str]] = {}
+    for (page_num, _), result in zip(jobs, results):
+        if result["text"]:
+            texts.setdefault(page_num, []).append(result["text"])
+    return {page_num: "\n".join(parts) for page_num, parts in texts.items()}
+
+
+async def process_pdf(source: FileSource) -> Tuple[str, Dict]:
+    """
+    Extract text from PDF files (page by page in the parser pool, see `iter_pdf_pages`)
     Returns: (extracted_text, metadata)
     """
     if not PDF_AVAILABLE:
         raise ImportError("PyPDF2 not installed. Run: pip install PyPDF2")
     
     try:
-        extracted_text = ""
+        pages: Dict[int, str] = {}
+        stats: Dict = {}
+        ocr_pages: List[int] = []
+        # The parser workers open the PDF by path
+        with _source_path(source, '.pdf') as file_path:
+            async for page_num, page_text in iter_pdf_pages(file_path, stats=stats):
+                pages[page_num] = page_text
+            # Scanned pages have no text layer: OCR their images
+            if stats.get("empty_pages") and not stats.get("char_budget_reached") and _ocr_available():
+                ocr_pages = stats["empty_pages"][:PDF_OCR_MAX_PAGES]
+                pages.update(await _ocr_pdf_pages(file_path, ocr_pages))
+        parts = []
+        for page_num in sorted(pages):
+            parts.append(f"\n--- Page {page_num} ---\n")
+            parts.append(pages[page_num])
+
         metadata = {
-            "pages": 0,
+            "pages": stats.get("pages", 0),
             "images": 0,
-            "tables": 0
+            "tables": 0,
+            "pages_read": stats.get("pages_read", 0),
         }
+        for key in ("title", "author", "subject"):
+            if stats.get(key):
+                metadata[key] = stats[key]
+        if stats.get("char_budget_reached"):
+            metadata["char_budget_reached"] = True
+        if stats.get("pages_timed_out"):
+            metadata["pages_timed_out"] = stats["pages_timed_out"]
+        if stats.get("pages_failed"):
+            metadata["pages_failed"] = stats["pages_failed"]
+        if ocr_pages:
+            metadata["ocr_pages"] = sorted(p for p in ocr_pages if p in pages)
+        without_text = [p for p in stats.get("empty_pages", []) if p not in pages]
+        if without_text:
+            metadata["pages_without_text"] = without_text
         
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            metadata["pages"] = len(pdf_reader.pages)
-            
-            # Extract text from each page
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        extracted_text += f"\n--- Page {page_num + 1} ---\n"
-                        extracted_text += page_text
-                except Exception as e:
-                    print(f"Error extracting page {page_num + 1}: {e}")
-            
-            # Get PDF metadata if available
-            if pdf_reader.metadata:
-                if pdf_reader.metadata.get('/Title'):
-                    metadata["title"] = pdf_reader.metadata.get('/Title')
-                if pdf_reader.metadata.get('/Author'):
-                    metadata["author"] = pdf_reader.metadata.get('/Author')
-                if pdf_reader.metadata.get('/Subject'):
-                    metadata["subject"] = pdf_reader.metadata.get('/Subject')
-        
-        return extracted_text.strip(), metadata
+        return "".join(parts).strip(), metadata
         
     except Exception as e:
         raise Exception(f"PDF processing failed: {str(e)}")
 
 
-async def process_word(file_path: str) -> Tuple[str, Dict]:
+async def process_word(source: FileSource) -> Tuple[str, Dict]:
     """
-    Extract text from Word documents (.docx)
+    Extract text from Word documents (.docx), parsed in the parser pool
     Returns: (extracted_text, metadata)
     """
     if not WORD_AVAILABLE:
         raise ImportError("python-docx not installed. Run: pip install python-docx")
     
     try:
-        doc = Document(file_path)
-        
-        extracted_text = ""
-        metadata = {
-            "paragraphs": 0,
-            "tables": 0,
-            "images": 0
-        }
-        
-        # Extract paragraphs
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                extracted_text += paragraph.text + "\n"
-                metadata["paragraphs"] += 1
-        
-        # Extract tables
-        for table in doc.tables:
-            metadata["tables"] += 1
-            extracted_text += "\n--- Table ---\n"
-            for row in table.rows:
-                row_text = " | ".join([cell.text.strip() for cell in row.cells])
-                extracted_text += row_text + "\n"
-        
-        # Count images
-        metadata["images"] = len([r for r in doc.part.rels.values() 
-                                  if "image" in r.target_ref])
-        
-        # Get core properties
-        if doc.core_properties:
-            if doc.core_properties.title:
-                metadata["title"] = doc.core_properties.title
-            if doc.core_properties.author:
-                metadata["author"] = doc.core_properties.author
-            if doc.core_properties.subject:
-                metadata["subject"] = doc.core_properties.subject
-        
-        return extracted_text.strip(), metadata
-        
+        return await get_parser_pool().run("word", _parse_word, _worker_source(source))
     except Exception as e:
         raise Exception(f"Word processing failed: {str(e)}")
 
 
-async def process_excel(file_path: str) -> Tuple[str, Dict]:
+def _parse_word(source: FileSource) -> Tuple[str, Dict]:
+    """(worker) Paragraphs and tables of a .docx."""
+    with _open_source(source) as f:
+        doc = Document(f)
+    
+    extracted_text = ""
+    metadata = {
+        "paragraphs": 0,
+        "tables": 0,
+        "images": 0
+    }
+    
+    # Extract paragraphs
+    for paragraph in doc.paragraphs:
+        if paragraph.text.strip():
+            extracted_text += paragraph.text + "\n"
+            metadata["paragraphs"] += 1
+    
+    # Extract tables
+    for table in doc.tables:
+        metadata["tables"] += 1
+        extracted_text += "\n--- Table ---\n"
+        for row in table.rows:
+            row_text = " | ".join([cell.text.strip() for cell in row.cells])
+            extracted_text += row_text + "\n"
+    
+    # Count images
+    metadata["images"] = len([r for r in doc.part.rels.values() 
+                              if "image" in r.target_ref])
+    
+    # Get core properties
+    if doc.core_properties:
+        if doc.core_properties.title:
+            metadata["title"] = doc.core_properties.title
+        if doc.core_properties.author:
+            metadata["author"] = doc.core_properties.author
+        if doc.core_properties.subject:
+            metadata["subject"] = doc.core_properties.subject
+    
+    return extracted_text.strip(), metadata
+
+
+# Spreadsheets are streamed row by row (openpyxl read-only mode) and stop early:
+# partner rate sheets can have tens of thousands of rows, and extraction only
+# uses the first few hundred thousand characters anyway.
+EXCEL_MAX_ROWS_PER_SHEET = int(os.getenv("EXCEL_MAX_ROWS_PER_SHEET") or 5000)
+EXCEL_MAX_CELLS_PER_SHEET = int(os.getenv("EXCEL_MAX_CELLS_PER_SHEET") or 100_000)
+EXCEL_CHAR_BUDGET = int(os.getenv("EXCEL_CHAR_BUDGET") or PDF_CHAR_BUDGET)
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime) and value.hour == value.minute == value.second == value.microsecond == 0:
+        return value.date().isoformat()  # Excel stores plain dates as midnight datetimes
+    return " ".join(str(value).split())
+
+
+def iter_excel_text(
+    source: FileSource,
+    *,
+    max_rows: Optional[int] = None,
+    max_cells: Optional[int] = None,
+    char_budget: Optional[int] = None,
+    stats: Optional[Dict] = None,
+) -> Iterator[str]:
+    """
+    Stream the text of a workbook: a "=== Sheet: name ===" line per sheet, then
+    one " | "-joined line per non-empty row. Blocking; run it off the event loop.
+
+    Each sheet stops after `max_rows` rows or `max_cells` cells, the workbook
+    after `char_budget` characters. `stats` (optional) is filled with sheets,
+    sheet_names, total_rows, total_columns, truncated_sheets and char_budget_reached.
+    """
+    max_rows = EXCEL_MAX_ROWS_PER_SHEET if max_rows is None else max_rows
+    max_cells = EXCEL_MAX_CELLS_PER_SHEET if max_cells is None else max_cells
+    budget = EXCEL_CHAR_BUDGET if char_budget is None else char_budget
+    stats = stats if stats is not None else {}
+
+    with _open_source(source) as f:
+        wb = openpyxl.load_workbook(f, read_only=True, data_only=True)
+        try:
+            stats.update({
+                "sheets": len(wb.sheetnames),
+                "sheet_names": wb.sheetnames,
+                "total_rows": 0,
+                "total_columns": 0,
+                "truncated_sheets": [],
+                "char_budget_reached": False,
+            })
+            chars = 0
+            for ws in wb.worksheets:
+                header = f"\n=== Sheet: {ws.title} ===\n"
+                chars += len(header)
+                yield header
+                rows = cells = 0
+                for row in ws.iter_rows(values_only=True):
+                    values = [_cell_text(value) for value in row]
+                    while values and not values[-1]:
+                        values.pop()
+                    if not values:
+                        continue
+                    if rows >= max_rows or cells + len(values) > max_cells:
+                        stats["truncated_sheets"].append(ws.title)
+                        break
+                    rows += 1
+                    cells += len(values)
+                    stats["total_rows"] += 1
+                    stats["total_columns"] = max(stats["total_columns"], len(values))
+                    line = " | ".join(values) + "\n"
+                    chars += len(line)
+                    yield line
+                    if budget and chars >= budget:
+                        stats["char_budget_reached"] = True
+                        return
+        finally:
+            wb.close()
+
+
+async def process_excel(source: FileSource) -> Tuple[str, Dict]:
     """
-    Extract text from Excel files (.xlsx, .xls)
+    Extract text from Excel files (.xlsx), streamed row by row in the parser pool (see `iter_excel_text`)
     Returns: (extracted_text, metadata)
     """
     if not EXCEL_AVAILABLE:
-        raise ImportError("openpyxl and pandas not installed. Run: pip install openpyxl pandas")
+        raise ImportError("openpyxl not installed. Run: pip install openpyxl")
     
     try:
-        # Load workbook
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-        
-        extracted_text = ""
-        metadata = {
-            "sheets": len(wb.sheetnames),
-            "sheet_names": wb.sheetnames,
-            "total_rows": 0,
-            "total_columns": 0
-        }
-        
-        # Process each sheet
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            extracted_text += f"\n=== Sheet: {sheet_name} ===\n"
-            
-            # Convert to pandas for easier processing
-            data = ws.values
-            cols = next(data)
-            data_list = list(data)
-            
-            if data_list:
-                df = pd.DataFrame(data_list, columns=cols)
-                
-                # Remove completely empty rows and columns
-                df = df.dropna(how='all').dropna(axis=1, how='all')
-                
-                metadata["total_rows"] += len(df)
-                metadata["total_columns"] = max(metadata["total_columns"], len(df.columns))
-                
-                # Convert to text
-                extracted_text += df.to_string(index=False, na_rep='')
-                extracted_text += "\n"
-        
-        return extracted_text.strip(), metadata
+        text, stats = await get_parser_pool().run(
+            "excel",
+            _parse_excel,
+            _worker_source(source),
+            EXCEL_MAX_ROWS_PER_SHEET,
+            EXCEL_MAX_CELLS_PER_SHEET,
+            EXCEL_CHAR_BUDGET,
+        )
+        metadata = {key: stats[key] for key in ("sheets", "sheet_names", "total_rows", "total_columns")}
+        if stats["truncated_sheets"]:
+            metadata["truncated_sheets"] = stats["truncated_sheets"]
+        if stats["char_budget_reached"]:
+            metadata["char_budget_reached"] = True
+        return text, metadata
         
     except Exception as e:
         raise Exception(f"Excel processing failed: {str(e)}")
 
 
+def _parse_excel(source: FileSource, max_rows: int, max_cells: int, char_budget: int) -> Tuple[str, Dict]:
+    """(worker) Workbook text + `iter_excel_text` stats."""
+    stats: Dict = {}
+    parts = list(iter_excel_text(source, max_rows=max_rows, max_cells=max_cells, char_budget=char_budget, stats=stats))
+    return "".join(parts).strip(), stats
+
+
 async def _vision_text_detection(base64_image: str, api_key: str) -> Optional[str]:
     """
     Call Google Vision API (REST) for OCR using an API key.
@@ -219,10 +501,108 @@ async def _vision_text_detection(base64_image: str, api_key: str) -> Optional[st
         return text.strip() if isinstance(text, str) and text.strip() else None
 
 
-async def process_image(file_path: str) -> Tuple[str, Dict]:
+# OCR: images are pre-scaled once (core.llm.image_prep), results are cached by
+# image hash, and multi-image inputs (scanned PDF pages) are OCR'd concurrently.
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY") or 4)
+# Scanned PDFs: OCR at most this many text-less pages
+PDF_OCR_MAX_PAGES = int(os.getenv("PDF_OCR_MAX_PAGES") or 50)
+
+_ocr_cache = LLMResponseCache(
+    max_entries=256,
+    ttl_s=float(os.getenv("OCR_CACHE_TTL_S") or 7 * 24 * 3600),
+    disk_path=os.getenv("OCR_CACHE_PATH") or "",
+)
+
+
+def _ocr_available() -> bool:
+    return bool(
+        (VISION_AVAILABLE and os.getenv('GOOGLE_APPLICATION_CREDENTIALS'))
+        or os.getenv('GOOGLE_VISION_API_KEY') or os.getenv('GOOGLE_PLACES_API_KEY')
+        or TESSERACT_AVAILABLE
+    )
+
+
+def _vision_client_text(content: bytes) -> Optional[str]:
+    """Google Vision via service account (blocking)."""
+    client = vision.ImageAnnotatorClient()
+    response = client.text_detection(image=vision.Image(content=content))
+    texts = response.text_annotations
+    return texts[0].description if texts else None
+
+
+def _tesseract_text(content: bytes) -> str:
+    from PIL import Image
+    with Image.open(io.BytesIO(content)) as img:
+        return pytesseract.image_to_string(img)
+
+
+async def ocr_image(content: bytes, *, cache: bool = True) -> Dict:
+    """
+    OCR one image: Google Vision (service account) -> Vision REST (API key) -> Tesseract.
+    Returns {"text", "engine", "confidence", "cached"}; text is "" when no engine found any.
+    """
+    key = make_cache_key(kind="ocr", image=image_sha256(content))
+    if cache:
+        hit = await _ocr_cache.get(key)
+        if hit is not None:
+            return {**hit, "cached": True}
+
+    result = {"text": "", "engine": None, "confidence": None}
+    try:
+        prepared, _, _ = await get_parser_pool().run(
+            "image_prep", prepare_image, content, max_side=OCR_MAX_SIDE, min_side=OCR_MIN_SIDE
+        )
+    except ParserError as e:
+        print(f"Image preparation failed: {e}")
+        return {**result, "cached": False}
+
+    if VISION_AVAILABLE and os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
+        try:
+            text = await asyncio.to_thread(_vision_client_text, prepared)
+            if text and text.strip():
+                result = {"text": text.strip(), "engine": "google_vision", "confidence": "high"}
+        except Exception as e:
+            print(f"Vision OCR failed: {e}")
+
+    api_key = os.getenv('GOOGLE_VISION_API_KEY') or os.getenv('GOOGLE_PLACES_API_KEY')
+    if not result["text"] and api_key:
+        try:
+            text = await _vision_text_detection(base64.b64encode(prepared).decode('utf-8'), api_key)
+            if text:
+                result = {"text": text.strip(), "engine": "google_vision_api", "confidence": "high"}
+        except Exception as api_err:
+            print(f"Vision API OCR failed: {api_err}")
+
+    if not result["text"] and TESSERACT_AVAILABLE:
+        try:
+            text = await get_parser_pool().run("tesseract", _tesseract_text, prepared)
+            if text and text.strip():
+                # Tesseract is good but not as accurate as Vision
+                result = {"text": text.strip(), "engine": "tesseract", "confidence": "medium"}
+        except Exception as tess_err:
+            print(f"Tesseract OCR failed: {tess_err}")
+
+    if cache and result["text"]:
+        await _ocr_cache.set(key, result)
+    return {**result, "cached": False}
+
+
+async def ocr_images(images: List[bytes], *, concurrency: Optional[int] = None) -> List[Dict]:
+    """OCR several images concurrently (at most `concurrency` at a time); results in input order."""
+    semaphore = asyncio.Semaphore(max(1, concurrency or OCR_CONCURRENCY))
+
+    async def _one(content: bytes) -> Dict:
+        async with semaphore:
+            return await ocr_image(content)
+
+    return await asyncio.gather(*[_one(content) for content in images])
+
+
+async def process_image(source: FileSource, filename: Optional[str] = None) -> Tuple[str, Dict]:
     """
     Extract text from images using Google Vision API (OCR)
     Falls back to basic image info if Vision API not available
+    The image bytes are read once; OCR runs on a pre-scaled copy and is cached by image hash.
     Returns: (extracted_text, metadata)
     """
     metadata = {
@@ -233,63 +613,23 @@ async def process_image(file_path: str) -> Tuple[str, Dict]:
     }
     
     try:
-        # Get basic image info
-        from PIL import Image
-        with Image.open(file_path) as img:
-            metadata["width"] = img.width
-            metadata["height"] = img.height
-            metadata["format"] = img.format
-        
-        # Attempt OCR with Google Vision (service account, high quality)
-        if VISION_AVAILABLE and os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
-            client = vision.ImageAnnotatorClient()
-            
-            with open(file_path, 'rb') as image_file:
-                content = image_file.read()
-            
-            image = vision.Image(content=content)
-            response = client.text_detection(image=image)
-            texts = response.text_annotations
-            
-            if texts:
-                extracted_text = texts[0].description
-                metadata["ocr_performed"] = True
-                metadata["ocr_engine"] = "google_vision"
-                metadata["confidence"] = "high"  # Google Vision is generally high confidence
-                return extracted_text.strip(), metadata
+        content = _read_source(source)
+        name = os.path.basename(source) if isinstance(source, str) else (filename or "image")
+
+        # Get basic image info (header only)
+        metadata.update(await get_parser_pool().run("image", _image_info, content))
         
-        # Attempt OCR with Google Vision REST API (API key)
-        api_key = os.getenv('GOOGLE_VISION_API_KEY') or os.getenv('GOOGLE_PLACES_API_KEY')
-        if api_key:
-            try:
-                with open(file_path, 'rb') as image_file:
-                    content = image_file.read()
-                base64_image = base64.b64encode(content).decode('utf-8')
-                extracted_text = await _vision_text_detection(base64_image, api_key)
-                if extracted_text:
-                    metadata["ocr_performed"] = True
-                    metadata["ocr_engine"] = "google_vision_api"
-                    metadata["confidence"] = "high"
-                    return extracted_text.strip(), metadata
-            except Exception as api_err:
-                print(f"Vision API OCR failed: {api_err}")
-
-        # Fallback: Tesseract OCR (free, open-source)
-        if TESSERACT_AVAILABLE:
-            try:
-                from PIL import Image
-                img = Image.open(file_path)
-                extracted_text = pytesseract.image_to_string(img)
-                if extracted_text and extracted_text.strip():
-                    metadata["ocr_performed"] = True
-                    metadata["ocr_engine"] = "tesseract"
-                    metadata["confidence"] = "medium"  # Tesseract is good but not as accurate as Vision
-                    return extracted_text.strip(), metadata
-            except Exception as tess_err:
-                print(f"Tesseract OCR failed: {tess_err}")
+        # OCR (pre-scaled, cached by image hash)
+        ocr = await ocr_image(content)
+        if ocr["text"]:
+            metadata["ocr_performed"] = True
+            metadata["ocr_engine"] = ocr["engine"]
+            metadata["confidence"] = ocr["confidence"]
+            metadata["ocr_cached"] = ocr["cached"]
+            return ocr["text"], metadata
         
         # Fallback: Return basic info (no OCR available)
-        extracted_text = f"Image file: {os.path.basename(file_path)}\n"
+        extracted_text = f"Image file: {name}\n"
         extracted_text += f"Dimensions: {metadata['width']}x{metadata['height']}\n"
         extracted_text += f"Format: {metadata['format']}\n"
         extracted_text += "Note: OCR not performed (no OCR engine available)"
@@ -300,47 +640,201 @@ async def process_image(file_path: str) -> Tuple[str, Dict]:
         raise Exception(f"Image processing failed: {str(e)}")
 
 
-async def process_text(file_path: str) -> Tuple[str, Dict]:
+def _image_info(content: bytes) -> Dict:
+    """(worker) Dimensions and format from the image header."""
+    from PIL import Image
+    with Image.open(io.BytesIO(content)) as img:
+        return {"width": img.width, "height": img.height, "format": img.format}
+
+
+async def process_text(source: FileSource) -> Tuple[str, Dict]:
     """
-    Extract text from plain text files
+    Extract text from plain text files (decoded in the parser pool)
     Returns: (extracted_text, metadata)
     """
     try:
-        # Try to detect encoding
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-        extracted_text = None
-        encoding_used = None
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    extracted_text = f.read()
-                    encoding_used = encoding
-                    break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-        
-        if extracted_text is None:
-            raise Exception("Could not decode text file with any known encoding")
-        
-        metadata = {
-            "encoding": encoding_used,
-            "lines": len(extracted_text.split('\n')),
-            "characters": len(extracted_text),
-            "words": len(extracted_text.split())
-        }
-        
-        return extracted_text.strip(), metadata
-        
+        return await get_parser_pool().run("text", _decode_text, _worker_source(source))
     except Exception as e:
         raise Exception(f"Text processing failed: {str(e)}")
 
 
-async def process_file_auto(file_path: str) -> Tuple[str, Dict]:
+def _decode_text(source: FileSource) -> Tuple[str, Dict]:
+    """(worker) Decode with the first encoding that fits."""
+    # Try to detect encoding
+    encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
+    extracted_text = None
+    encoding_used = None
+    data = _read_source(source)
+    
+    for encoding in encodings:
+        try:
+            # Same newline handling as reading the file in text mode
+            extracted_text = data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+            encoding_used = encoding
+            break
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    
+    if extracted_text is None:
+        raise Exception("Could not decode text file with any known encoding")
+    
+    metadata = {
+        "encoding": encoding_used,
+        "lines": len(extracted_text.split('\n')),
+        "characters": len(extracted_text),
+        "words": len(extracted_text.split())
+    }
+    
+    return extracted_text.strip(), metadata
+
+
+# Parsed-text cache: the same document is parsed again on retries, re-uploads and
+# re-analysis. (text, metadata) is stored zlib-compressed in SQLite, keyed by the
+# content SHA-256 + file type + PARSER_VERSION, and evicted least-recently-used
+# once the store exceeds PARSE_CACHE_MAX_MB. Bump PARSER_VERSION whenever a
+# processor's output changes. PARSE_CACHE_PATH="" disables the cache.
+PARSER_VERSION = "2026.10.2"
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "lexa_parse_cache.sqlite3"))
+PARSE_CACHE_MAX_MB = float(os.getenv("PARSE_CACHE_MAX_MB") or 256)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class _ParsedTextCache:
+    """SQLite-backed, size-bounded LRU store. All methods are blocking; call them off the event loop."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so importing this module (e.g. in parser pool workers) creates no file
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_accessed ON parse_cache(accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE parse_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        entry = json.loads(zlib.decompress(row[0]).decode("utf-8"))
+        return entry["text"], entry["metadata"]
+
+    def set(self, key: str, text: str, metadata: Dict) -> int:
+        """Store an entry; returns the number of entries evicted to stay within `max_bytes`."""
+        value = zlib.compress(
+            json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False, default=str).encode("utf-8"),
+            6,
+        )
+        if len(value) > self.max_bytes:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            # Keep the most recently used entries that fit in max_bytes
+            evicted = conn.execute(
+                "DELETE FROM parse_cache WHERE key IN ("
+                " SELECT key FROM ("
+                "  SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running FROM parse_cache"
+                " ) WHERE running > ?)",
+                (self.max_bytes,),
+            ).rowcount
+            conn.commit()
+            return evicted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_cache"
+            ).fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+_parse_cache = (
+    _ParsedTextCache(PARSE_CACHE_PATH, int(PARSE_CACHE_MAX_MB * 1024 * 1024)) if PARSE_CACHE_PATH else None
+)
+
+
+def content_sha256(source: FileSource) -> str:
+    """SHA-256 of the file contents (paths are hashed in chunks)."""
+    if not isinstance(source, str):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_cache_key(sha256: str, ext: str) -> str:
+    # Reading budgets change how much text a PDF / spreadsheet yields
+    if ext == '.pdf':
+        limits = f"{PDF_CHAR_BUDGET}"
+    elif ext == '.xlsx':
+        limits = f"{EXCEL_MAX_ROWS_PER_SHEET}/{EXCEL_MAX_CELLS_PER_SHEET}/{EXCEL_CHAR_BUDGET}"
+    else:
+        limits = "0"
+    return f"{PARSER_VERSION}:{ext}:{limits}:{sha256}"
+
+
+def _is_cacheable(text: str, metadata: Dict) -> bool:
+    """Only complete results: no timed-out/failed pages and no image or scanned page left without OCR text."""
+    if not text or metadata.get("pages_timed_out") or metadata.get("pages_failed"):
+        return False
+    if metadata.get("file_type") == "image" and not metadata.get("ocr_performed"):
+        return False
+    return not metadata.get("pages_without_text")
+
+
+def parse_cache_stats() -> Dict:
+    if _parse_cache is None:
+        return {"enabled": False}
+    try:
+        return {"enabled": True, "parser_version": PARSER_VERSION, **_parse_cache.stats()}
+    except Exception as e:
+        return {"enabled": True, "error": str(e)}
+
+
+async def process_file_auto(
+    source: FileSource,
+    filename: Optional[str] = None,
+    path: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    cache: bool = True,
+) -> Tuple[str, Dict]:
     """
     Automatically detect file type and process accordingly
-    Returns: (extracted_text, metadata)
+
+    Args:
+        source: file path, or the file contents (bytes / memoryview)
+        filename: original name, used for type detection of in-memory sources
+        path: existing on-disk copy of an in-memory source; used by engines that
+              need a path instead of writing a temp file
+        content_hash: SHA-256 of the contents if already known (saves hashing)
+        cache: look up / store the result in the parsed-text cache
+    Returns: (extracted_text, metadata); metadata["parse_cached"] is True on a cache hit
     """
+    file_path = filename or (source if isinstance(source, str) else path) or ""
     mime_type, _ = mimetypes.guess_type(file_path)
     ext = os.path.splitext(file_path)[1].lower()
     
@@ -351,7 +845,6 @@ async def process_file_auto(file_path: str) -> Tuple[str, Dict]:
             '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
             '.doc': 'application/msword',
             '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            '.xls': 'application/vnd.ms-excel',
             '.txt': 'text/plain',
             '.png': 'image/png',
             '.jpg': 'image/jpeg',
@@ -368,17 +861,29 @@ async def process_file_auto(file_path: str) -> Tuple[str, Dict]:
         '.docx': 'word',
         '.doc': 'word',
         '.xlsx': 'excel',
-        '.xls': 'excel',
         '.txt': 'text',
         '.png': 'image',
         '.jpg': 'image',
         '.jpeg': 'image'
     }
     file_type = file_type_map.get(ext, 'unknown')
-    
+
+    cache_key = None
+    if cache and _parse_cache is not None:
+        try:
+            sha256 = content_hash or await asyncio.to_thread(content_sha256, source)
+            cache_key = _parse_cache_key(sha256, ext)
+            cached = await asyncio.to_thread(_parse_cache.get, cache_key)
+            if cached is not None:
+                text, metadata = cached
+                metadata["parse_cached"] = True
+                return text, metadata
+        except Exception as e:
+            print(f"[parse-cache] lookup failed: {e}")
+
     # Route to appropriate processor
     if 'pdf' in mime_type:
-        text, metadata = await process_pdf(file_path)
+        text, metadata = await process_pdf(path or source)
     elif 'wordprocessingml' in mime_type or 'msword' in mime_type:
         # IMPORTANT:
         # python-docx can only read modern .docx files (ZIP package).
@@ -388,18 +893,30 @@ async def process_file_auto(file_path: str) -> Tuple[str, Dict]:
                 "Unsupported Word format: .doc (old Word). Please open it in Word/Google Docs and 'Save As' .docx, "
                 "or export as PDF, then upload again."
             )
-        text, metadata = await process_word(file_path)
+        text, metadata = await process_word(source)
     elif 'spreadsheetml' in mime_type or 'ms-excel' in mime_type:
-        text, metadata = await process_excel(file_path)
+        # openpyxl only reads OOXML workbooks; legacy binary .xls is not supported
+        if ext == '.xls':
+            raise Exception(
+                "Unsupported Excel format: .xls (old Excel). Please open it in Excel/Google Sheets and 'Save As' .xlsx, "
+                "then upload again."
+            )
+        text, metadata = await process_excel(source)
     elif 'image' in mime_type:
-        text, metadata = await process_image(file_path)
+        text, metadata = await process_image(source, filename=filename)
     elif 'text' in mime_type:
-        text, metadata = await process_text(file_path)
+        text, metadata = await process_text(source)
     else:
         raise Exception(f"Unsupported file type: {mime_type}")
     
     # Add file_type to metadata
     metadata['file_type'] = file_type
+
+    if cache_key and _is_cacheable(text, metadata):
+        try:
+            await asyncio.to_thread(_parse_cache.set, cache_key, text, metadata)
+        except Exception as e:
+            print(f"[parse-cache] store failed: {e}")
     return text, metadata
 
 
@@ -428,7 +945,7 @@ def get_installation_instructions() -> str:
     if not deps["word"]:
         instructions.append("Word support: pip install python-docx")
     if not deps["excel"]:
-        instructions.append("Excel support: pip install openpyxl pandas")
+        instructions.append("Excel support: pip install openpyxl")
     if not deps["ocr"]:
         instructions.append("OCR support: pip install google-cloud-vision pillow")
         instructions.append("  Also set GOOGLE_APPLICATION_CREDENTIALS environment variable")
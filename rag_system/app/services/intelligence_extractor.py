@@ -10,6 +10,8 @@ import anthropic
 import re
 from datetime import datetime
 from app.services.lexa_extraction_context import get_lexa_extraction_context
+from core.llm.scheduler import estimate_tokens, llm_slot
+from core.llm.telemetry import track_llm_call
 
 
 class IntelligenceExtractor:
@@ -34,7 +36,7 @@ class IntelligenceExtractor:
             self.model = "claude-sonnet-4-20250514"
         else:
             print(f"Initializing Anthropic client with API key (length: {len(api_key)})")
-            self.client = anthropic.Anthropic(api_key=api_key)
+            self.client = anthropic.AsyncAnthropic(api_key=api_key)
             # Use a currently supported Anthropic model
             self.model = "claude-sonnet-4-20250514"
             print(f"Using model: {self.model}")
@@ -68,14 +70,25 @@ class IntelligenceExtractor:
         
         # Build comprehensive extraction prompt
         prompt = self._build_comprehensive_prompt(text, source_file)
+        lexa_context = get_lexa_extraction_context()
         
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=8000,  # More tokens for comprehensive extraction
-                temperature=0.3,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            async with llm_slot(
+                "anthropic",
+                priority="extraction",
+                tokens=estimate_tokens(len(lexa_context) + len(prompt), 8000),
+                label="intelligence_extractor",
+            ) as waited:
+                with track_llm_call("intelligence_extractor", "anthropic", self.model, queue_wait_s=waited) as call:
+                    response = await self.client.messages.create(
+                        model=self.model,
+                        max_tokens=8000,  # More tokens for comprehensive extraction
+                        temperature=0.3,
+                        # Static LEXA context as a cacheable prefix (prompt caching)
+                        system=[{"type": "text", "text": lexa_context, "cache_control": {"type": "ephemeral"}}],
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                    call.add_usage(getattr(response, "usage", None))
             
             # Extract text from response (handle different response formats)
             if hasattr(response, 'content') and len(response.content) > 0:
@@ -139,14 +152,8 @@ class IntelligenceExtractor:
     def _build_comprehensive_prompt(self, text: str, source_file: Optional[str]) -> str:
         """Build prompt for comprehensive intelligence extraction"""
         
-        # Inject LEXA's rich domain context
-        lexa_context = get_lexa_extraction_context()
-        
+        # LEXA's domain context is sent separately as a cached system block (see extract_intelligence)
         prompt = f"""
-{lexa_context}
-
----
-
 ## YOUR EXTRACTION TASK
 
 Extract intelligence from this document with the lens of a luxury travel advisor preparing 
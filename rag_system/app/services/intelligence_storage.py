@@ -3,10 +3,14 @@ Intelligence Storage Service
 Saves extracted business intelligence to Supabase
 """
 
+import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 from app.services.supabase_client import get_supabase
 
+# Rows per bulk insert request
+INSERT_CHUNK_SIZE = 500
+
 
 def _as_list(v):
     return v if isinstance(v, list) else []
@@ -58,8 +62,7 @@ def _default_source_refs(*, source_type: str, source_id: str, source_url: str =
         }
     ]
 
-def _save_knowledge_nugget(
-    supabase,
+def _knowledge_nugget_row(
     *,
     user_id: str,
     upload_id: str,
@@ -72,31 +75,61 @@ def _save_knowledge_nugget(
     nugget_type: str = "poi_fragment",
 ):
     """
-    Save valuable unstructured snippets that are NOT POIs.
+    Row for valuable unstructured snippets that are NOT POIs (None if empty).
     This keeps intelligence without polluting extracted_pois.
     """
-    try:
-        t = (text or "").strip()
-        if not t:
-            return False
-        # Keep it short; we do not store full articles here.
-        if len(t) > 1500:
-            t = t[:1500]
-        payload = {
-            "upload_id": upload_id,
-            "scrape_id": scrape_id,
-            "created_by": user_id,
-            "nugget_type": nugget_type,
-            "destination": destination,
-            "text": t,
-            "source_refs": _default_source_refs(source_type=source_type, source_id=source_id, source_url=source_url),
-            "citations": [],
-            "enrichment": {"source_type": source_type},
-        }
-        supabase.table("knowledge_nuggets").insert(payload).execute()
-        return True
-    except Exception:
-        return False
+    t = (text or "").strip()
+    if not t:
+        return None
+    # Keep it short; we do not store full articles here.
+    if len(t) > 1500:
+        t = t[:1500]
+    return {
+        "upload_id": upload_id,
+        "scrape_id": scrape_id,
+        "created_by": user_id,
+        "nugget_type": nugget_type,
+        "destination": destination,
+        "text": t,
+        "source_refs": _default_source_refs(source_type=source_type, source_id=source_id, source_url=source_url),
+        "citations": [],
+        "enrichment": {"source_type": source_type},
+    }
+
+
+def _insert_rows(supabase, table: str, rows: List[Dict]) -> int:
+    """Blocking insert of `rows`; returns the number of rows written."""
+    result = supabase.table(table).insert(rows).execute()
+    return len(getattr(result, "data", None) or [])
+
+
+async def _bulk_insert(supabase, table: str, rows: List[Dict], chunk_size: int = INSERT_CHUNK_SIZE) -> int:
+    """
+    Insert `rows` in chunked bulk requests; returns the number of rows written.
+
+    Rows are grouped by their set of columns first (a bulk insert needs uniform
+    keys, and padding missing ones with NULL would override column defaults).
+    A chunk that fails is retried row by row, so one bad row only loses itself.
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    written = 0
+    for group in groups.values():
+        for start in range(0, len(group), chunk_size):
+            chunk = group[start:start + chunk_size]
+            try:
+                written += await asyncio.to_thread(_insert_rows, supabase, table, chunk)
+                continue
+            except Exception as e:
+                print(f"[storage] bulk insert of {len(chunk)} rows into {table} failed, retrying row by row: {e}")
+            for row in chunk:
+                try:
+                    written += await asyncio.to_thread(_insert_rows, supabase, table, [row])
+                except Exception as e:
+                    print(f"[storage] insert into {table} failed: {e}")
+    return written
 
 def _clamp_int(v, lo: int, hi: int, default: int):
     try:
@@ -274,12 +307,19 @@ async def save_intelligence_to_db(
         # If this source was re-processed, wipe previously materialized POIs first (best-effort)
         try:
             if upload_id:
-                supabase.table("extracted_pois").delete().eq("upload_id", upload_id).eq("created_by", user_id).execute()
+                await asyncio.to_thread(
+                    lambda: supabase.table("extracted_pois").delete().eq("upload_id", upload_id).eq("created_by", user_id).execute()
+                )
             if scrape_id:
-                supabase.table("extracted_pois").delete().eq("scrape_id", scrape_id).eq("created_by", user_id).execute()
+                await asyncio.to_thread(
+                    lambda: supabase.table("extracted_pois").delete().eq("scrape_id", scrape_id).eq("created_by", user_id).execute()
+                )
         except Exception:
             pass
 
+        # Rows are collected per table and written in bulk below
+        rows: Dict[str, List[Dict]] = {}
+
         if intelligence.get('pois'):
             for poi in _as_list(intelligence.get("pois")):
                 # If the "name" is actually a sentence fragment, store it as a knowledge nugget instead.
@@ -292,8 +332,7 @@ async def save_intelligence_to_db(
                     frag = raw_name
                     if isinstance(poi.get("description"), str) and poi.get("description") and len(frag) < 40:
                         frag = (poi.get("description") or "").strip() or frag
-                    _save_knowledge_nugget(
-                        supabase,
+                    nugget = _knowledge_nugget_row(
                         user_id=user_id,
                         upload_id=upload_id,
                         scrape_id=scrape_id,
@@ -304,6 +343,8 @@ async def save_intelligence_to_db(
                         source_url=source_url,
                         nugget_type="poi_fragment",
                     )
+                    if nugget:
+                        rows.setdefault('knowledge_nuggets', []).append(nugget)
                     continue
 
                 normalized = _normalize_poi_for_extracted_pois(poi, source_file=source_file, source_type=source_type)
@@ -316,21 +357,17 @@ async def save_intelligence_to_db(
                         source_type=source_type, source_id=source_id, source_url=source_url
                     )
 
-                poi_data = {
+                rows.setdefault('extracted_pois', []).append({
                     "upload_id": upload_id,
                     "scrape_id": scrape_id,
                     "created_by": user_id,
                     **normalized,
-                }
-
-                result = supabase.table('extracted_pois').insert(poi_data).execute()
-                if getattr(result, "data", None):
-                    counts['pois'] += 1
+                })
         
         # 2. Save Experience Ideas
         if intelligence.get('experiences'):
             for exp in intelligence['experiences']:
-                exp_data = {
+                rows.setdefault('extracted_experiences', []).append({
                     'upload_id': upload_id,
                     'scrape_id': scrape_id,
                     'created_by': user_id,
@@ -344,15 +381,12 @@ async def save_intelligence_to_db(
                     'estimated_budget': exp.get('estimated_budget'),
                     'unique_elements': exp.get('unique_elements'),
                     'inspiration_source': exp.get('inspiration_source')
-                }
-                result = supabase.table('extracted_experiences').insert(exp_data).execute()
-                if result.data:
-                    counts['experiences'] += 1
+                })
         
         # 3. Save Market Trends
         if intelligence.get('trends'):
             for trend in intelligence['trends']:
-                trend_data = {
+                rows.setdefault('market_trends', []).append({
                     'upload_id': upload_id,
                     'scrape_id': scrape_id,
                     'discovered_by': user_id,
@@ -365,15 +399,12 @@ async def save_intelligence_to_db(
                     'seasonality': trend.get('seasonality'),
                     'price_impact': trend.get('price_impact'),
                     'business_opportunity': trend.get('business_opportunity')
-                }
-                result = supabase.table('market_trends').insert(trend_data).execute()
-                if result.data:
-                    counts['trends'] += 1
+                })
         
         # 4. Save Client Insights
         if intelligence.get('client_insights'):
             for insight in intelligence['client_insights']:
-                insight_data = {
+                rows.setdefault('client_insights', []).append({
                     'upload_id': upload_id,
                     'scrape_id': scrape_id,
                     'discovered_by': user_id,
@@ -387,29 +418,23 @@ async def save_intelligence_to_db(
                     'information_sources': insight.get('information_sources', []),
                     'pain_points': insight.get('pain_points'),
                     'unmet_needs': insight.get('unmet_needs')
-                }
-                result = supabase.table('client_insights').insert(insight_data).execute()
-                if result.data:
-                    counts['insights'] += 1
+                })
         
         # 5. Save Price Intelligence
         if intelligence.get('price_intelligence'):
             price_data = intelligence['price_intelligence']
             if isinstance(price_data, dict) and price_data:
-                price_record = {
+                rows.setdefault('price_intelligence', []).append({
                     'upload_id': upload_id,
                     'scrape_id': scrape_id,
                     'discovered_by': user_id,
                     **price_data
-                }
-                result = supabase.table('price_intelligence').insert(price_record).execute()
-                if result.data:
-                    counts['prices'] += 1
+                })
         
         # 6. Save Competitor Analysis
         if intelligence.get('competitor_analysis'):
             for comp in intelligence['competitor_analysis']:
-                comp_data = {
+                rows.setdefault('competitor_analysis', []).append({
                     'upload_id': upload_id,
                     'scrape_id': scrape_id,
                     'discovered_by': user_id,
@@ -422,15 +447,12 @@ async def save_intelligence_to_db(
                     'target_market': comp.get('target_market'),
                     'differentiation': comp.get('differentiation'),
                     'lessons_for_lexa': comp.get('lessons_for_lexa')
-                }
-                result = supabase.table('competitor_analysis').insert(comp_data).execute()
-                if result.data:
-                    counts['competitors'] += 1
+                })
         
         # 7. Save Operational Learnings
         if intelligence.get('operational_learnings'):
             for learning in intelligence['operational_learnings']:
-                learning_data = {
+                rows.setdefault('operational_learnings', []).append({
                     'upload_id': upload_id,
                     'scrape_id': scrape_id,
                     'discovered_by': user_id,
@@ -439,10 +461,23 @@ async def save_intelligence_to_db(
                     'destination': learning.get('destination'),
                     'learning': learning.get('learning'),
                     'actionable': learning.get('actionable')
-                }
-                result = supabase.table('operational_learnings').insert(learning_data).execute()
-                if result.data:
-                    counts['learnings'] += 1
+                })
+
+        # The tables are independent: write them concurrently, each in chunked bulk inserts
+        tables = list(rows)
+        written = await asyncio.gather(*[_bulk_insert(supabase, table, rows[table]) for table in tables])
+        count_keys = {
+            'extracted_pois': 'pois',
+            'extracted_experiences': 'experiences',
+            'market_trends': 'trends',
+            'client_insights': 'insights',
+            'price_intelligence': 'prices',
+            'competitor_analysis': 'competitors',
+            'operational_learnings': 'learnings',
+        }
+        for table, n in zip(tables, written):
+            if table in count_keys:
+                counts[count_keys[table]] = n
         
         return counts
         
@@ -451,6 +486,169 @@ async def save_intelligence_to_db(
         return counts
 
 
+def _poi_key(poi: Dict) -> str:
+    """Stable identity of an extracted POI: case-folded name + destination."""
+    name = " ".join(str(poi.get("name") or "").split()).casefold()
+    destination = " ".join(str(poi.get("destination") or "").split()).casefold()
+    return f"{name}|{destination}"
+
+
+def _match_pois(previous: List[tuple], desired: List[tuple], stored: List[Dict]):
+    """
+    Pair each desired POI with the stored `extracted_pois` row it replaces.
+
+    `previous` / `desired` are (poi_id, normalized POI) pairs, `stored` the rows
+    (id/name/destination) in insertion order. A POI carrying the id of a stored
+    row is matched to that row. Otherwise POIs are grouped by `_poi_key`: the n-th
+    stored row of a group holds the n-th previous POI, a POI equal to a previous
+    one keeps that POI's row (so removing one of several same-name POIs deletes
+    its own row), and the rest take the group's remaining rows in order.
+
+    Returns ([(row_id or None, previous POI or None, normalized)], removed row ids).
+    """
+    row_ids = {str(row["id"]): row["id"] for row in stored}
+    groups: Dict[str, List[str]] = {}
+    for row in stored:
+        groups.setdefault(_poi_key(row), []).append(str(row["id"]))
+
+    previous_by_row: Dict[str, Dict] = {}
+    unplaced = []
+    for poi_id, poi in previous:
+        if poi_id in row_ids and poi_id not in previous_by_row:
+            previous_by_row[poi_id] = poi
+        else:
+            unplaced.append(poi)
+    free = {key: [r for r in rows if r not in previous_by_row] for key, rows in groups.items()}
+    for poi in unplaced:
+        rows = free.get(_poi_key(poi))
+        if rows:
+            previous_by_row[rows.pop(0)] = poi
+
+    claimed: Dict[str, int] = {}
+    matches: List[Optional[str]] = [None] * len(desired)
+
+    def claim(i: int, candidates, accept) -> None:
+        for row in candidates:
+            if row not in claimed and accept(row):
+                matches[i] = row
+                claimed[row] = i
+                return
+
+    for i, (poi_id, _) in enumerate(desired):
+        claim(i, [poi_id] if poi_id in row_ids else [], lambda row: True)
+    for i, (_, poi) in enumerate(desired):
+        if matches[i] is None:
+            claim(i, groups.get(_poi_key(poi), []), lambda row: previous_by_row.get(row) == poi)
+    for i, (_, poi) in enumerate(desired):
+        if matches[i] is None:
+            claim(i, groups.get(_poi_key(poi), []), lambda row: True)
+
+    pairs = [
+        (row_ids[row] if row else None, previous_by_row.get(row) if row else None, poi)
+        for row, (_, poi) in zip(matches, desired)
+    ]
+    removed = [row_ids[row] for row in row_ids if row not in claimed]
+    return pairs, removed
+
+
+async def sync_extracted_pois(
+    supabase,
+    previous_pois: List[Dict],
+    pois: List[Dict],
+    source_type: str,
+    source_id: str,
+    source_metadata: Dict = None,
+    uploaded_by: str = None
+) -> Dict[str, int]:
+    """
+    Delta-save edited POIs for one upload/scrape into `extracted_pois`.
+
+    Compares the edited `pois` against the previously stored ones (the cached
+    `extracted_data.pois`) by stored id or `_poi_key` (see `_match_pois`) and
+    only writes what changed: bulk inserts (`_bulk_insert`), one update per
+    edited POI and one batched delete. The stored rows are listed first
+    (id/name/destination only), so POIs missing from the table are re-inserted
+    even if the cached copy has them.
+
+    Returns counts: inserted, updated, deleted, unchanged, nuggets.
+    """
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "nuggets": 0}
+    upload_id = source_id if source_type in ['file_upload', 'text_paste'] else None
+    scrape_id = source_id if source_type == 'url_scrape' else None
+    user_id = uploaded_by
+    source_file = None
+    source_url = None
+    if isinstance(source_metadata, dict):
+        source_file = source_metadata.get("filename") or source_metadata.get("title")
+        source_url = source_metadata.get("url")
+
+    def _normalize_all(items) -> List[tuple]:
+        out = []
+        for poi in _as_list(items):
+            normalized = _normalize_poi_for_extracted_pois(poi, source_file=source_file, source_type=source_type)
+            if normalized:
+                out.append((str(poi["id"]) if poi.get("id") else None, normalized))
+        return out
+
+    query = supabase.table("extracted_pois").select("id, name, destination")
+    query = query.eq("upload_id", upload_id) if upload_id else query.eq("scrape_id", scrape_id)
+    stored_rows = await asyncio.to_thread(query.eq("created_by", user_id).order("created_at").execute)
+    matched, removed = _match_pois(
+        _normalize_all(previous_pois), _normalize_all(pois), getattr(stored_rows, "data", None) or []
+    )
+
+    # Sentence-fragment "POIs" become knowledge nuggets (as in save_intelligence_to_db), once, when added
+    previous_names = {(p.get("name") or "").strip() for p in _as_list(previous_pois) if isinstance(p, dict)}
+    nuggets = []
+    for poi in _as_list(pois):
+        raw_name = (poi.get("name") or "").strip() if isinstance(poi, dict) else ""
+        if raw_name and raw_name not in previous_names and _looks_like_bad_poi_name(raw_name):
+            dest = poi.get("destination") or poi.get("location") or poi.get("city") or poi.get("where")
+            nugget = _knowledge_nugget_row(
+                user_id=user_id,
+                upload_id=upload_id,
+                scrape_id=scrape_id,
+                destination=(dest.strip() if isinstance(dest, str) else None),
+                text=raw_name,
+                source_type=source_type,
+                source_id=source_id,
+                source_url=source_url,
+                nugget_type="poi_fragment",
+            )
+            if nugget:
+                nuggets.append(nugget)
+
+    inserts = []
+    for row_id, before, normalized in matched:
+        if row_id is None:
+            if not isinstance(normalized.get("source_refs"), list) or len(normalized.get("source_refs")) == 0:
+                normalized["source_refs"] = _default_source_refs(
+                    source_type=source_type, source_id=source_id, source_url=source_url
+                )
+            inserts.append({"upload_id": upload_id, "scrape_id": scrape_id, "created_by": user_id, **normalized})
+            continue
+        if before == normalized:
+            counts["unchanged"] += 1
+            continue
+        # Clear fields the captain removed; keep provenance the row already has
+        cleared = {k: None for k in (before or {}) if k not in normalized and k != "source_refs"}
+        await asyncio.to_thread(
+            supabase.table("extracted_pois").update({**cleared, **normalized}).eq("id", row_id).execute
+        )
+        counts["updated"] += 1
+
+    if inserts:
+        counts["inserted"] = await _bulk_insert(supabase, "extracted_pois", inserts)
+    if nuggets:
+        counts["nuggets"] = await _bulk_insert(supabase, "knowledge_nuggets", nuggets)
+
+    if removed:
+        await asyncio.to_thread(supabase.table("extracted_pois").delete().in_("id", removed).execute)
+        counts["deleted"] = len(removed)
+
+    return counts
+
+
 async def get_intelligence_for_script_creation(
     supabase,
     destination: str = None,
@@ -0,0 +1,59 @@
+"""
+Multipass Pass Checkpoints
+
+Each completed PassResult is stored in `captain_upload_passes`, keyed by
+(upload_id, pass_name), so a retried extraction resumes from the last good pass
+instead of re-running the expensive expand pass. Checkpoints are tied to the
+sha256 of the source text; they are ignored if the text changed.
+
+Checkpointing is best effort: storage errors are logged and never fail an extraction.
+"""
+
+import asyncio
+import hashlib
+from typing import Dict
+
+from app.services.multipass_contract import PassResult
+
+CHECKPOINT_TABLE = "captain_upload_passes"
+
+
+class PassCheckpoints:
+    def __init__(self, supabase, upload_id: str, text: str):
+        self.supabase = supabase
+        self.upload_id = str(upload_id)
+        self.text_hash = hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+    async def load(self) -> Dict[str, PassResult]:
+        """Completed passes for this upload and text, by pass name."""
+        try:
+            resp = await asyncio.to_thread(
+                lambda: self.supabase.table(CHECKPOINT_TABLE)
+                .select("pass_name, result")
+                .eq("upload_id", self.upload_id)
+                .eq("text_hash", self.text_hash)
+                .execute()
+            )
+        except Exception as e:
+            print(f"[multipass] checkpoint load failed for {self.upload_id}: {e}")
+            return {}
+        return {row["pass_name"]: row["result"] for row in (resp.data or []) if row.get("result")}
+
+    async def save(self, result: PassResult) -> None:
+        pass_name = result.get("pass_name")
+        try:
+            await asyncio.to_thread(
+                lambda: self.supabase.table(CHECKPOINT_TABLE)
+                .upsert(
+                    {
+                        "upload_id": self.upload_id,
+                        "pass_name": pass_name,
+                        "text_hash": self.text_hash,
+                        "result": result,
+                    },
+                    on_conflict="upload_id,pass_name",
+                )
+                .execute()
+            )
+        except Exception as e:
+            print(f"[multipass] checkpoint save failed for {self.upload_id}/{pass_name}: {e}")
@@ -126,6 +126,8 @@ class PassResult(TypedDict, total=False):
     findings: List[str]
     warnings: List[str]
     package: Package
+    chunks: int  # set when the pass ran map-reduce over source chunks
+    source_truncated: Dict[str, int]  # set when the prompt only saw the start of the source
 
 
 class ExtractionContract(TypedDict, total=False):
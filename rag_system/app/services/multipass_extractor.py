@@ -7,13 +7,35 @@ Passes:
 3) validate - dedupe, add confidence, citations, separate real vs estimated counts
 4) report   - summarize warnings and validation notes
 
+validate/report run locally and deterministically by default
+(`multipass_postprocess.py`); `deep=True` runs them as LLM passes instead.
+
 All passes target the JSON contract defined in `multipass_contract.py`.
+
+Responses are streamed and parsed incrementally: pass `on_item` to receive each
+venue / sub_experience / destination as soon as the model closes it, and a
+truncated response still yields its complete part instead of failing the pass.
+
+Sources longer than the pass window are not truncated by the expand pass: it
+runs map-reduce over overlapping chunks (split on page/section boundaries) and
+the chunk packages are merged and de-duplicated deterministically. A chunk that
+fails is reported as missing instead of failing the pass. The outline and deep
+validate/report passes only read the start of the source; when it is cut, the
+pass and the contract report record it (`source_truncated` / `truncated_passes`).
+
+With `checkpoints`, every completed pass is persisted as it finishes and a retry
+resumes after the last good pass.
+
+The static part of every prompt (LEXA context, contract, fixed rules) is built
+once and sent as a cacheable system block (Anthropic prompt caching), so only
+the pass-specific part is billed as fresh input tokens.
 """
 
+import asyncio
 import json
 import os
-import re
-from typing import Dict, Optional
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, Optional
 from datetime import datetime
 import anthropic
 
@@ -25,6 +47,22 @@ from app.services.multipass_contract import (
     Package,
 )
 from app.services.lexa_extraction_context import get_lexa_extraction_context
+from app.services.multipass_checkpoints import PassCheckpoints
+from app.services.multipass_postprocess import report_package, validate_package
+from core.llm.cassette import get_cassette_store
+from core.llm.chunking import merge_results, split_text
+from core.llm.json_stream import StreamingJSONParser
+from core.llm.scheduler import estimate_tokens, llm_slot
+from core.llm.telemetry import record_parse_failure, track_llm_call, usage_counts
+
+# on_item(pass_name, section, item) - called for each streamed venue / sub_experience / destination
+ItemCallback = Callable[[str, str, Dict], Awaitable[None]]
+
+# Source text per prompt: the single-pass (fast) expand sees a larger window,
+# since itinerary details are spread across many pages. Longer sources are chunked.
+FAST_TEXT_LIMIT = 60000
+PASS_TEXT_LIMIT = 18000
+CHUNK_OVERLAP = 2000
 
 
 class MultipassExtractor:
@@ -34,21 +72,52 @@ class MultipassExtractor:
             print("WARNING: ANTHROPIC_API_KEY not set. Multipass extraction will fail.")
             self.client = None
         else:
-            self.client = anthropic.Anthropic(api_key=api_key)
+            self.client = anthropic.AsyncAnthropic(api_key=api_key)
         self.model = "claude-sonnet-4-20250514"
         self.contract_brief = describe_contract()
+        # Static prompt prefixes (with / without the LEXA domain context), built once
+        self._prefixes = {
+            with_context: self._build_static_prefix(with_context) for with_context in (True, False)
+        }
+        # LLM_CASSETTE_MODE=replay serves recorded responses (no API key or network needed)
+        self.cassettes = get_cassette_store()
 
-    async def extract(self, text: str, source: Dict[str, object]) -> ExtractionContract:
+    async def extract(
+        self,
+        text: str,
+        source: Dict[str, object],
+        on_item: Optional[ItemCallback] = None,
+        checkpoints: Optional[PassCheckpoints] = None,
+        deep: bool = False,
+    ) -> ExtractionContract:
         """
         Run the multipass pipeline on provided text.
         Returns an ExtractionContract with per-pass results and final_package.
+
+        validate/report are local post-processing unless `deep` is set.
+
+        With `checkpoints`, passes already completed for this upload are reused
+        (in order, up to the first missing one) and new passes are saved as they finish.
         """
-        if not self.client:
+        if not self.client and not self.cassettes.replaying:
             raise RuntimeError("Anthropic client not initialized.")
 
         contract = empty_contract(source=source)
-
-        outline = await self._run_pass(
+        completed = await checkpoints.load() if checkpoints else {}
+        resumed: list = []
+
+        async def checkpointed(pass_name: str, run) -> PassResult:
+            # Only a contiguous prefix is reused: once a pass re-runs, later checkpoints are stale.
+            if pass_name in completed and len(resumed) == len(contract["passes"]):
+                print(f"[multipass] {pass_name}: resumed from checkpoint")
+                resumed.append(pass_name)
+                return completed[pass_name]
+            result = await run()
+            if checkpoints and result.get("status") != "failed":
+                await checkpoints.save(result)
+            return result
+
+        outline = await checkpointed("outline", lambda: self._run_pass(
             pass_name="outline",
             text=text,
             previous_package=None,
@@ -57,11 +126,11 @@ class MultipassExtractor:
                 "Estimate counts for sub_experiences/venues/archetypes if needed.",
                 "Return strict JSON with package + findings + warnings + status.",
             ],
-        )
+            on_item=on_item,
+        ))
         contract["passes"].append(outline)
 
-        expand = await self._run_pass(
-            pass_name="expand",
+        expand = await checkpointed("expand", lambda: self._run_expand(
             text=text,
             previous_package=outline.get("package"),
             extra_rules=[
@@ -69,10 +138,17 @@ class MultipassExtractor:
                 "Populate script_seed (no venue names in signature_highlights).",
                 "Keep counts.real_extracted for source-backed items; estimated_potential for inferred volume.",
             ],
-        )
+            on_item=on_item,
+        ))
         contract["passes"].append(expand)
 
-        validate = await self._run_pass(
+        if not deep:
+            validate = validate_package(expand.get("package") or outline.get("package") or {})
+            report = report_package(validate)
+            contract["passes"].extend([validate, report])
+            return self._finish_contract(contract, validate["package"], report, resumed, mode="multipass")
+
+        validate = await checkpointed("validate", lambda: self._run_pass(
             pass_name="validate",
             text=text,
             previous_package=expand.get("package"),
@@ -81,13 +157,14 @@ class MultipassExtractor:
                 "Attach citations for concrete claims; label generic items with `generic`: true in properties if added.",
                 "Flag missing sections in warnings.",
             ],
-        )
+            on_item=on_item,
+        ))
         contract["passes"].append(validate)
 
         # Final package is from validate pass (best effort)
         final_package: Package = validate.get("package", expand.get("package", outline.get("package", {})))  # type: ignore
 
-        report = await self._run_pass(
+        report = await checkpointed("report", lambda: self._run_pass(
             pass_name="report",
             text=text,
             previous_package=final_package,
@@ -96,28 +173,45 @@ class MultipassExtractor:
                 "Restate counts (real_extracted vs estimated_potential).",
                 "No new content; only reflect/assess.",
             ],
-        )
+            on_item=on_item,
+        ))
         contract["passes"].append(report)
+        return self._finish_contract(contract, final_package, report, resumed, mode="multipass_deep")
 
+    @staticmethod
+    def _finish_contract(
+        contract: ExtractionContract, final_package: Package, report: PassResult, resumed: list, mode: str
+    ) -> ExtractionContract:
         contract["final_package"] = final_package
         contract["report"] = {
-            "warnings": report.get("warnings", []),
+            "warnings": list(report.get("warnings") or []),
             "findings": report.get("findings", []),
             "generated_at": datetime.utcnow().isoformat(),
+            "mode": mode,
         }
+        if resumed:
+            contract["report"]["resumed_passes"] = resumed
+        truncated = {p["pass_name"]: p["source_truncated"] for p in contract["passes"] if p.get("source_truncated")}
+        if truncated:
+            contract["report"]["truncated_passes"] = truncated
+            for p in contract["passes"]:
+                for w in p.get("warnings") or []:
+                    if w.startswith("Source truncated") and w not in contract["report"]["warnings"]:
+                        contract["report"]["warnings"].append(w)
         return contract
 
-    async def extract_fast(self, text: str, source: Dict[str, object]) -> ExtractionContract:
+    async def extract_fast(
+        self, text: str, source: Dict[str, object], on_item: Optional[ItemCallback] = None
+    ) -> ExtractionContract:
         """
         Fast extraction mode (single LLM call).
         Designed for production request/response flows to avoid timeouts.
         """
-        if not self.client:
+        if not self.client and not self.cassettes.replaying:
             raise RuntimeError("Anthropic client not initialized.")
 
         contract = empty_contract(source=source)
-        expand = await self._run_pass(
-            pass_name="expand",
+        expand = await self._run_expand(
             text=text,
             previous_package=None,
             extra_rules=[
@@ -144,16 +238,106 @@ class MultipassExtractor:
                 "In package.metadata for provider pages, include: core_offerings (with emotional_drivers per offering), customer_pain_points (deduped), value_propositions, competitive_gaps_for_lexa.",
                 "Return strict JSON with package + findings + warnings + status.",
             ],
+            on_item=on_item,
         )
         contract["passes"].append(expand)
-        contract["final_package"] = expand.get("package", {})  # type: ignore
-        contract["report"] = {
-            "warnings": expand.get("warnings", []),
-            "findings": expand.get("findings", []),
-            "generated_at": datetime.utcnow().isoformat(),
-            "mode": "fast",
+        return self._finish_contract(
+            contract, expand.get("package", {}), expand, [], mode="chunked" if expand.get("chunks") else "fast"  # type: ignore
+        )
+
+    async def _run_expand(
+        self,
+        text: str,
+        previous_package: Optional[Package],
+        extra_rules: list,
+        on_item: Optional[ItemCallback] = None,
+    ) -> PassResult:
+        """
+        Expand pass; sources longer than the prompt window are split into
+        overlapping chunks, extracted concurrently (the LLM scheduler caps how
+        many run at once) and merged into one PassResult.
+        """
+        chunks = split_text(text, self._text_limit("expand", previous_package), CHUNK_OVERLAP)
+        if len(chunks) <= 1:
+            return await self._run_pass("expand", text, previous_package, extra_rules, on_item=on_item)
+
+        print(f"[multipass] expand: {len(text)} chars -> {len(chunks)} chunks")
+        # A failing chunk (API error, timeout) must not discard the others: collect
+        # exceptions and merge whatever succeeded; only fail if every chunk did.
+        results = await asyncio.gather(*[
+            self._run_pass(
+                "expand",
+                chunk,
+                previous_package,
+                extra_rules + [
+                    f"This is part {i} of {len(chunks)} of a longer source. Extract only what this part contains; "
+                    "other parts are extracted separately and merged."
+                ],
+                on_item=on_item,
+            )
+            for i, chunk in enumerate(chunks, start=1)
+        ], return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for e in errors:
+            if not isinstance(e, Exception):
+                raise e
+        if len(errors) == len(results):
+            raise errors[0]
+        for i, r in enumerate(results, start=1):
+            if isinstance(r, Exception):
+                print(f"[multipass] expand: chunk {i}/{len(chunks)} failed: {r}")
+                results[i - 1] = {"pass_name": "expand", "status": "failed", "findings": [], "warnings": [], "package": {}}
+        return self._merge_chunk_results(results)
+
+    @staticmethod
+    def _merge_chunk_results(results: list) -> PassResult:
+        """
+        Merge per-chunk expand results in chunk order. List items are de-duplicated
+        by name/title (see core.llm.chunking); counts are recomputed from the merged
+        package rather than taken from any single chunk.
+        """
+        packages = [r.get("package") or {} for r in results]
+        package = merge_results(packages)
+
+        real: Dict[str, int] = {}
+        estimated: Dict[str, int] = {}
+        for p in packages:
+            counts = p.get("counts") or {}
+            for key, value in (counts.get("real_extracted") or {}).items():
+                if isinstance(value, (int, float)):
+                    real[key] = max(real.get(key, 0), int(value))
+            for key, value in (counts.get("estimated_potential") or {}).items():
+                if isinstance(value, (int, float)):
+                    estimated[key] = max(estimated.get(key, 0), int(value))
+        for key in real:
+            if isinstance(package.get(key), list):
+                real[key] = len(package[key])
+        for key, value in real.items():
+            estimated[key] = max(estimated.get(key, 0), value)
+        package["counts"] = {"real_extracted": real, "estimated_potential": estimated}
+
+        warnings = []
+        findings = []
+        for i, r in enumerate(results, start=1):
+            for w in r.get("warnings") or []:
+                if w not in warnings:
+                    warnings.append(w)
+            for f in r.get("findings") or []:
+                if f not in findings:
+                    findings.append(f)
+            if r.get("status") == "failed":
+                warnings.append(f"Chunk {i} of {len(results)} failed; its content is missing.")
+
+        failed = sum(1 for r in results if r.get("status") == "failed")
+        status = "ok" if not failed else ("failed" if failed == len(results) else "needs_review")
+        return {
+            "pass_name": "expand",
+            "package": package,
+            "findings": findings,
+            "warnings": warnings,
+            "status": status,
+            "chunks": len(results),
         }
-        return contract
 
     async def _run_pass(
         self,
@@ -161,57 +345,124 @@ class MultipassExtractor:
         text: str,
         previous_package: Optional[Package],
         extra_rules: Optional[list],
+        on_item: Optional[ItemCallback] = None,
     ) -> PassResult:
         """
         Run one pass and return a PassResult (with package + findings + warnings).
         """
+        system = self._prefixes[pass_name == "expand"]
         prompt = self._build_prompt(pass_name, text, previous_package, extra_rules or [])
-        response = self.client.messages.create(  # type: ignore
-            model=self.model,
-            max_tokens=9000,
-            temperature=0.3 if pass_name != "report" else 0.2,
-            messages=[{"role": "user", "content": prompt}],
-        )
-
-        response_text = self._extract_response_text(response)
-        parsed = self._parse_pass_response(response_text)
+        temperature = 0.3 if pass_name != "report" else 0.2
+        request = {
+            "provider": "anthropic",
+            "model": self.model,
+            "system": system,
+            "content": prompt,
+            "max_tokens": 9000,
+            "temperature": temperature,
+        }
+        async with llm_slot(
+            "anthropic",
+            priority="extraction",
+            tokens=estimate_tokens(len(system) + len(prompt), 9000),
+            label=f"multipass:{pass_name}",
+        ) as waited:
+            with track_llm_call(f"multipass:{pass_name}", "anthropic", self.model, queue_wait_s=waited) as call:
+                parser = StreamingJSONParser()
+                if self.cassettes.replaying:
+                    response_text, usage = await self.cassettes.replay(request)
+                    await self._emit_items(pass_name, parser.feed(response_text), on_item)
+                else:
+                    response_text, usage = await self._stream_pass(system, prompt, temperature, parser, pass_name, on_item)
+                call.add_usage(usage)
+
+        if self.cassettes.recording:
+            await self.cassettes.record(request, text=response_text, usage=usage, latency_s=call.latency_s)
+        parsed = self._parse_pass_response(response_text, parser)
+        if parsed.get("status") == "failed":
+            record_parse_failure(f"multipass:{pass_name}", "anthropic")
         parsed["pass_name"] = pass_name  # ensure present
         if "status" not in parsed:
             parsed["status"] = "ok"
+        text_limit = self._text_limit(pass_name, previous_package)
+        if len(text) > text_limit:
+            warnings = parsed.get("warnings") if isinstance(parsed.get("warnings"), list) else []
+            parsed["warnings"] = warnings + [
+                f"Source truncated for the {pass_name} pass: only the first {text_limit} of {len(text)} characters were read."
+            ]
+            parsed["source_truncated"] = {"read_chars": text_limit, "total_chars": len(text)}
         return parsed  # type: ignore
 
-    def _build_prompt(
+    async def _stream_pass(
         self,
+        system: str,
+        prompt: str,
+        temperature: float,
+        parser: StreamingJSONParser,
         pass_name: str,
-        text: str,
-        previous_package: Optional[Package],
-        extra_rules: list,
-    ) -> str:
+        on_item: Optional[ItemCallback],
+    ):
+        """
+        Stream one pass from Anthropic, feeding deltas to `parser` as they arrive.
+        Returns (response_text, usage).
+        """
+        parts = []
+        usage = SimpleNamespace(**usage_counts(None))
+        events = await self.client.messages.create(  # type: ignore
+            model=self.model,
+            max_tokens=9000,
+            temperature=temperature,
+            # Cache breakpoint after the static prefix; the pass-specific prompt follows.
+            system=[{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+        )
+        async for event in events:
+            kind = getattr(event, "type", None)
+            if kind == "message_start":
+                usage = SimpleNamespace(**usage_counts(getattr(getattr(event, "message", None), "usage", None)))
+            elif kind == "message_delta":
+                usage.output_tokens = int(getattr(getattr(event, "usage", None), "output_tokens", 0) or 0)
+                if getattr(getattr(event, "delta", None), "stop_reason", None) == "max_tokens":
+                    print(f"[multipass] {pass_name}: response hit max_tokens; keeping the complete part")
+            elif kind == "content_block_delta":
+                delta = getattr(getattr(event, "delta", None), "text", None)
+                if delta:
+                    parts.append(delta)
+                    await self._emit_items(pass_name, parser.feed(delta), on_item)
+        return "".join(parts), usage
+
+    async def _emit_items(self, pass_name: str, items: list, on_item: Optional[ItemCallback]) -> None:
+        if on_item is None:
+            return
+        for section, item in items:
+            try:
+                await on_item(pass_name, section, item)
+            except Exception as e:
+                print(f"[multipass] on_item callback failed for {section}: {e}")
+
+    @staticmethod
+    def _text_limit(pass_name: str, previous_package: Optional[Package]) -> int:
+        return FAST_TEXT_LIMIT if (pass_name == "expand" and not previous_package) else PASS_TEXT_LIMIT
+
+    def _build_static_prefix(self, with_context: bool) -> str:
+        """
+        Pass-independent part of the prompt. Must stay byte-identical between
+        calls for the provider's prompt cache to hit.
+        """
         contract_desc = json.dumps(self.contract_brief, indent=2)
-        prior = json.dumps(previous_package, indent=2) if previous_package else "{}"
-        rules = "\n".join([f"- {r}" for r in extra_rules])
-
-        # Use a larger text window for the single-pass (fast) expand mode.
-        # This is critical for itinerary-style documents where details are spread across many pages.
-        text_limit = 60000 if (pass_name == "expand" and not previous_package) else 18000
-
-        # Inject LEXA's rich domain context for intelligence-level extraction
-        lexa_context = get_lexa_extraction_context()
+        # Inject LEXA's rich domain context for intelligence-level extraction (expand pass)
+        lexa_context = get_lexa_extraction_context() if with_context else ""
 
         return f"""You are LEXA's senior intelligence analyst. Extract with investor-pitch quality.
 
-{lexa_context if pass_name == "expand" else ""}
+{lexa_context}
 
 ---
 
-Pass: {pass_name}
-
 Contract (abbreviated):
 {contract_desc}
 
-Previous package (if any):
-{prior}
-
 Rules:
 - Follow the contract keys exactly.
 - For "expand" pass: Map emotions with intensities (1-10), match client archetypes, identify trends.
@@ -219,39 +470,47 @@ Rules:
 - Do not wrap JSON in markdown.
 - Concrete claims need citations with confidence; otherwise mark as generic.
 - Separate counts.real_extracted vs estimated_potential.
-- {rules}
+"""
+
+    def _build_prompt(
+        self,
+        pass_name: str,
+        text: str,
+        previous_package: Optional[Package],
+        extra_rules: list,
+    ) -> str:
+        """Pass-specific part of the prompt (sent after the cached static prefix)."""
+        prior = json.dumps(previous_package, indent=2) if previous_package else "{}"
+        rules = "\n".join([f"- {r}" for r in extra_rules])
+
+        text_limit = self._text_limit(pass_name, previous_package)
+
+        return f"""Pass: {pass_name}
+
+Previous package (if any):
+{prior}
+
+Pass rules:
+{rules}
 
 Source text (truncate if huge, but extract as much as possible):
 {text[:text_limit]}
 """
 
-    def _extract_response_text(self, response) -> str:
-        if hasattr(response, "content") and response.content:
-            first = response.content[0]
-            if hasattr(first, "text"):
-                return first.text
-            if isinstance(first, dict) and "text" in first:
-                return first["text"]
-        return str(response)
-
-    def _parse_pass_response(self, response_text: str) -> Dict:
+    def _parse_pass_response(self, response_text: str, parser: Optional[StreamingJSONParser] = None) -> Dict:
         """
-        Attempt to parse JSON from Claude response robustly.
-        """
-        json_str = None
-
-        # Try code block
-        m = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", response_text, re.DOTALL)
-        if m:
-            json_str = m.group(1)
+        Parse JSON from Claude response robustly.
 
-        if not json_str:
-            m = re.search(r"\{[\s\S]*\}", response_text)
-            if m:
-                json_str = m.group(0)
+        Prose or markdown around the JSON is ignored; if the response was cut off
+        (e.g. max_tokens), the complete part is kept and a warning is added.
+        """
+        if parser is None:
+            parser = StreamingJSONParser()
+            parser.feed(response_text)
+        data = parser.finish()
 
-        if not json_str:
-            print(f"[multipass] Could not find JSON in response. First 500 chars:\n{response_text[:500]}")
+        if not isinstance(data, dict):
+            print(f"[multipass] Could not parse JSON from response. First 500 chars:\n{response_text[:500]}")
             return {
                 "status": "failed",
                 "findings": [],
@@ -259,48 +518,42 @@ Source text (truncate if huge, but extract as much as possible):
                 "package": {},
             }
 
-        try:
-            data = json.loads(json_str)
-            # If model returned final_package only, normalize to package
-            if "package" not in data:
-                data["package"] = data.get("final_package", {})
-
-            # Claude sometimes returns the package fields at the top-level and leaves `package` empty.
-            # Detect that and wrap the known package keys into `package`.
-            package_keys = {
-                "experience_overview",
-                "emotional_map",
-                "sub_experiences",
-                "destinations",
-                "venues",
-                "service_providers",
-                "client_archetypes",
-                "script_seed",
-                "relationships",
-                "citations",
-                "confidence",
-                "counts",
-                "metadata",
-            }
-            has_top_level_package_fields = any(k in data for k in package_keys)
-            package_val = data.get("package")
-            package_is_empty = not isinstance(package_val, dict) or len(package_val.keys()) == 0
-            if has_top_level_package_fields and package_is_empty:
-                wrapped = {}
-                for k in list(data.keys()):
-                    if k in package_keys:
-                        wrapped[k] = data.pop(k)
-                data["package"] = wrapped
-            return data
-        except json.JSONDecodeError as e:
-            print(f"[multipass] JSON parsing error: {e}")
-            print(f"[multipass] snippet: {json_str[:500]}")
-            return {
-                "status": "failed",
-                "findings": [],
-                "warnings": [f"JSON parse error: {e}"],
-                "package": {},
-            }
+        if parser.truncated:
+            print(f"[multipass] Response was truncated after {len(response_text)} chars; recovered partial JSON")
+            warnings = data.get("warnings") if isinstance(data.get("warnings"), list) else []
+            data["warnings"] = warnings + ["Response truncated; kept the items completed before the cut-off."]
+
+        # If model returned final_package only, normalize to package
+        if "package" not in data:
+            data["package"] = data.get("final_package", {})
+
+        # Claude sometimes returns the package fields at the top-level and leaves `package` empty.
+        # Detect that and wrap the known package keys into `package`.
+        package_keys = {
+            "experience_overview",
+            "emotional_map",
+            "sub_experiences",
+            "destinations",
+            "venues",
+            "service_providers",
+            "client_archetypes",
+            "script_seed",
+            "relationships",
+            "citations",
+            "confidence",
+            "counts",
+            "metadata",
+        }
+        has_top_level_package_fields = any(k in data for k in package_keys)
+        package_val = data.get("package")
+        package_is_empty = not isinstance(package_val, dict) or len(package_val.keys()) == 0
+        if has_top_level_package_fields and package_is_empty:
+            wrapped = {}
+            for k in list(data.keys()):
+                if k in package_keys:
+                    wrapped[k] = data.pop(k)
+            data["package"] = wrapped
+        return data
 
 
 # Singleton helper
@@ -314,11 +567,19 @@ def get_multipass_extractor() -> MultipassExtractor:
     return _mp_extractor
 
 
-async def run_multipass_extraction(text: str, source: Dict[str, object]) -> ExtractionContract:
+async def run_multipass_extraction(
+    text: str,
+    source: Dict[str, object],
+    on_item: Optional[ItemCallback] = None,
+    checkpoints: Optional[PassCheckpoints] = None,
+    deep: bool = False,
+) -> ExtractionContract:
     extractor = get_multipass_extractor()
-    return await extractor.extract(text, source)
+    return await extractor.extract(text, source, on_item=on_item, checkpoints=checkpoints, deep=deep)
 
 
-async def run_fast_extraction(text: str, source: Dict[str, object]) -> ExtractionContract:
+async def run_fast_extraction(
+    text: str, source: Dict[str, object], on_item: Optional[ItemCallback] = None
+) -> ExtractionContract:
     extractor = get_multipass_extractor()
-    return await extractor.extract_fast(text, source)
+    return await extractor.extract_fast(text, source, on_item=on_item)
@@ -0,0 +1,178 @@
+"""
+LEXA Brain v2 - Local validate/report passes
+
+Deterministic replacements for the mechanical `validate` and `report` LLM passes
+of the multipass pipeline, operating on the Package from `multipass_contract.py`:
+
+- validate: normalized-name dedupe, drop nameless items / incomplete edges,
+            citation presence checks, per-section confidence, count
+            reconciliation (real_extracted = citation-backed items)
+- report:   restate counts, collect warnings and data quality gaps
+
+They run in milliseconds; the LLM versions remain available as the "deep" mode.
+"""
+
+import copy
+from typing import Dict, List, Tuple
+
+from app.services.multipass_contract import Package, PassResult
+from core.llm.chunking import dedupe_items
+
+# List sections and the field that names their items
+NAMED_SECTIONS: Dict[str, str] = {
+    "sub_experiences": "title",
+    "destinations": "name",
+    "venues": "name",
+    "service_providers": "name",
+    "client_archetypes": "name",
+}
+# Counted in counts.real_extracted / estimated_potential
+COUNTED_SECTIONS: Tuple[str, ...] = tuple(NAMED_SECTIONS) + ("relationships", "trends")
+# Expected in every useful package; missing ones are flagged
+CORE_SECTIONS: Tuple[str, ...] = ("sub_experiences", "venues", "destinations", "client_archetypes")
+
+# Below this, a section is reported as a data quality gap
+LOW_CONFIDENCE = 0.5
+LOW_CITATION_SHARE = 0.5
+
+
+def _has_citation(item: object) -> bool:
+    return isinstance(item, dict) and bool(item.get("citations") or item.get("citation") or item.get("evidence"))
+
+
+def _is_generic(item: object) -> bool:
+    if not isinstance(item, dict):
+        return False
+    props = item.get("properties") if isinstance(item.get("properties"), dict) else {}
+    return bool(item.get("generic") or props.get("generic"))
+
+
+def _section_confidence(items: List[object]) -> float:
+    """Mean item confidence; share of cited items when the model gave none."""
+    scores = [
+        float(i["confidence"]) for i in items
+        if isinstance(i, dict) and isinstance(i.get("confidence"), (int, float))
+    ]
+    if scores:
+        return round(sum(scores) / len(scores), 2)
+    return round(sum(1 for i in items if _has_citation(i)) / len(items), 2)
+
+
+def validate_package(package: Package) -> PassResult:
+    """
+    Local `validate` pass: returns a cleaned copy of `package` with findings and warnings.
+    """
+    pkg: Package = copy.deepcopy(package) if isinstance(package, dict) else {}  # type: ignore
+    findings: List[str] = []
+    warnings: List[str] = []
+
+    for section, key in NAMED_SECTIONS.items():
+        items = pkg.get(section) or []
+        if not isinstance(items, list):
+            continue
+        named = [i for i in items if isinstance(i, dict) and str(i.get(key) or "").strip()]
+        if len(named) < len(items):
+            warnings.append(f"{section}: dropped {len(items) - len(named)} item(s) without a {key}.")
+        unique = dedupe_items(named)
+        if len(unique) < len(named):
+            findings.append(f"{section}: merged {len(named) - len(unique)} duplicate(s).")
+        pkg[section] = unique  # type: ignore
+
+    edges = pkg.get("relationships") or []
+    if isinstance(edges, list):
+        complete = [
+            e for e in edges
+            if isinstance(e, dict) and e.get("start_node") and e.get("end_node") and e.get("type")
+        ]
+        if len(complete) < len(edges):
+            warnings.append(f"relationships: dropped {len(edges) - len(complete)} edge(s) missing start_node/end_node/type.")
+        pkg["relationships"] = dedupe_items(complete)
+
+    for section in ("emotional_map", "citations", "trends"):
+        if isinstance(pkg.get(section), list):
+            pkg[section] = dedupe_items(pkg[section])  # type: ignore
+
+    # Model output may have any shape here: only trust dicts
+    counts = pkg.get("counts")
+    model_estimates = counts.get("estimated_potential") if isinstance(counts, dict) else None
+    if not isinstance(model_estimates, dict):
+        model_estimates = {}
+    real: Dict[str, int] = {}
+    estimated: Dict[str, int] = {}
+    raw_confidence = pkg.get("confidence")
+    confidence: Dict[str, float] = dict(raw_confidence) if isinstance(raw_confidence, dict) else {}
+    if raw_confidence is not None and not isinstance(raw_confidence, dict):
+        warnings.append("confidence: ignored non-object value from the model.")
+    for section in COUNTED_SECTIONS:
+        items = pkg.get(section) or []
+        if not isinstance(items, list):
+            continue
+        cited = [i for i in items if _has_citation(i)]
+        real[section] = len(cited)
+        estimate = model_estimates.get(section)
+        estimated[section] = max(len(items), int(estimate) if isinstance(estimate, (int, float)) else 0)
+        if not items:
+            continue
+        if section not in confidence:
+            confidence[section] = _section_confidence(items)
+        uncited = [i for i in items if not _has_citation(i) and not _is_generic(i)]
+        if uncited:
+            warnings.append(f"{section}: {len(uncited)} of {len(items)} item(s) lack citations and are not marked generic.")
+    pkg["counts"] = {"real_extracted": real, "estimated_potential": estimated}
+    pkg["confidence"] = confidence
+
+    missing = [s for s in CORE_SECTIONS if not pkg.get(s)]
+    for section in missing:
+        warnings.append(f"Missing section: {section}.")
+    seed = pkg.get("script_seed") or {}
+    if not (isinstance(seed, dict) and (seed.get("theme") or seed.get("hook"))):
+        warnings.append("Missing section: script_seed.")
+
+    return {
+        "pass_name": "validate",
+        "status": "needs_review" if len(missing) == len(CORE_SECTIONS) else "ok",
+        "findings": findings,
+        "warnings": warnings,
+        "package": pkg,
+    }
+
+
+def report_package(validate: PassResult) -> PassResult:
+    """
+    Local `report` pass over a validate result: restates counts and summarizes
+    warnings / quality gaps. No new content; the package is returned unchanged.
+    """
+    package = validate.get("package") or {}
+    counts = package.get("counts") or {}
+    real = counts.get("real_extracted") or {}
+    estimated = counts.get("estimated_potential") or {}
+    confidence = package.get("confidence") or {}
+
+    findings: List[str] = list(validate.get("findings") or [])
+    gaps: List[str] = []
+    for section in COUNTED_SECTIONS:
+        total = len(package.get(section) or [])
+        if not total and not estimated.get(section):
+            continue
+        findings.append(
+            f"{section}: {total} extracted ({real.get(section, 0)} citation-backed), "
+            f"estimated potential {estimated.get(section, total)}."
+        )
+        if total and real.get(section, 0) / total < LOW_CITATION_SHARE:
+            gaps.append(f"{section}: under {int(LOW_CITATION_SHARE * 100)}% of items are citation-backed.")
+        score = confidence.get(section)
+        if isinstance(score, (int, float)) and score < LOW_CONFIDENCE:
+            gaps.append(f"{section}: low confidence ({score}).")
+
+    report_warnings: List[str] = []
+    for w in list(validate.get("warnings") or []) + gaps:
+        if w not in report_warnings:
+            report_warnings.append(w)
+
+    return {
+        "pass_name": "report",
+        "status": "ok",
+        "findings": findings,
+        "warnings": report_warnings,
+        "package": package,
+    }
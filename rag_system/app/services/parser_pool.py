@@ -0,0 +1,260 @@
+"""
+Document Parser Pool
+
+All document parsing (PyPDF2, python-docx, openpyxl, PIL, Tesseract) runs in a
+pool of worker processes instead of the API process, so a malformed or
+pathological file cannot pin the event loop's CPU or balloon its memory:
+
+- each worker is its own single-process executor, so a job owns its worker:
+  a job that exceeds its wall-clock timeout has only that worker killed (and
+  replaced), and a worker that dies fails only the job it was running
+- memory cap per worker (address-space limit, POSIX only): allocations beyond
+  it fail with MemoryError; a worker the OS kills is reported as a crash
+- workers are recycled after a number of jobs (leaky C extensions, caches)
+- jobs beyond the number of workers wait in a queue; queue depth, running jobs,
+  per-parser latency and outcomes are exported with the LLM metrics (/api/metrics)
+
+Configuration (environment):
+
+    PARSER_WORKERS              worker processes (default PDF_WORKERS or 2)
+    PARSER_JOB_TIMEOUT_S        default wall-clock limit per job (default 60)
+    PARSER_MAX_MEMORY_MB        address-space limit per worker (default 1024, 0 = none)
+    PARSER_MAX_JOBS_PER_WORKER  jobs before a worker is replaced (default 1000; PDF pages count one each)
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Set
+
+from core.llm.telemetry import register_counter, register_gauge, register_histogram
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PARSER_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+_jobs_total = register_counter(
+    "document_parser_jobs_total", "Document parser jobs by outcome.", ("parser", "outcome")
+)
+_latency = register_histogram(
+    "document_parser_latency_seconds", "Run time of document parser jobs.", ("parser",), _PARSER_LATENCY_BUCKETS
+)
+_queue_wait = register_histogram(
+    "document_parser_queue_wait_seconds", "Time parser jobs waited for a free worker.", ("parser",), _PARSER_LATENCY_BUCKETS
+)
+_queue_depth = register_gauge("document_parser_queue_depth", "Parser jobs waiting for a free worker.")
+_running = register_gauge("document_parser_running", "Parser jobs currently running.")
+_restarts = register_counter(
+    "document_parser_pool_restarts_total", "Parser pool restarts (worker killed).", ("reason",)
+)
+
+
+class ParserError(Exception):
+    """A parser job was aborted by the pool (timeout, memory limit, worker crash)."""
+
+
+class ParserTimeout(ParserError):
+    pass
+
+
+class ParserCrashed(ParserError):
+    pass
+
+
+def _init_worker(max_memory_mb: int) -> None:
+    if resource is not None and max_memory_mb > 0:
+        limit = max_memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            print(f"[parser-pool] could not set memory limit: {e}")
+
+
+def _ready(worker_index: int) -> int:
+    return worker_index
+
+
+class ParserPool:
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        job_timeout_s: float = 60.0,
+        max_memory_mb: int = 1024,
+        max_jobs_per_worker: int = 1000,
+    ):
+        self.workers = max(1, int(workers))
+        self.job_timeout_s = job_timeout_s
+        self.max_memory_mb = max_memory_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        # Idle single-worker executors (None = not started yet); a job takes one for its whole run
+        self._idle: Optional[asyncio.Queue] = None
+        self._executors: Set[ProcessPoolExecutor] = set()
+        self._queued = 0
+        self._running = 0
+        self._restarts: Dict[str, int] = {}
+
+    def _idle_queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self.workers):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        kwargs: Dict[str, Any] = {}
+        if self.max_jobs_per_worker > 0 and sys.version_info >= (3, 11):
+            kwargs["max_tasks_per_child"] = self.max_jobs_per_worker
+        # Spawned (not forked) workers: no copy of the API process' threads, sockets or event loop
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.max_memory_mb,),
+            **kwargs,
+        )
+        self._executors.add(executor)
+        return executor
+
+    def _kill(self, executor: ProcessPoolExecutor, reason: str) -> None:
+        """Terminate one worker; its slot starts a fresh one on the next job."""
+        self._executors.discard(executor)
+        self._restarts[reason] = self._restarts.get(reason, 0) + 1
+        _restarts.inc((reason,))
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    def _update_gauges(self) -> None:
+        _queue_depth.set((), self._queued)
+        _running.set((), self._running)
+
+    async def run(self, parser: str, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in a worker process (fn must be a picklable top-level function).
+        `parser` labels the job in metrics. Raises ParserTimeout / ParserCrashed,
+        or whatever `fn` raised. Only this job's worker is killed on timeout, crash
+        or cancellation; other jobs keep running.
+        """
+        timeout = self.job_timeout_s if timeout is None else timeout
+        idle = self._idle_queue()
+        call = functools.partial(fn, *args, **kwargs) if kwargs else functools.partial(fn, *args)
+        loop = asyncio.get_running_loop()
+        outcome = "error"
+        acquired = False
+        executor: Optional[ProcessPoolExecutor] = None
+        queued_at = time.monotonic()
+        self._queued += 1
+        self._update_gauges()
+        try:
+            executor = await idle.get()
+            acquired = True
+            if executor is None:
+                executor = self._new_executor()
+            self._queued -= 1
+            self._running += 1
+            self._update_gauges()
+            _queue_wait.observe((parser,), time.monotonic() - queued_at)
+            started = time.monotonic()
+            try:
+                future = loop.run_in_executor(executor, call)
+                try:
+                    result = await asyncio.wait_for(future, timeout=timeout)
+                except asyncio.TimeoutError:
+                    outcome = "timeout"
+                    print(f"[parser-pool] {parser} job timed out after {timeout:.0f}s - restarting its worker")
+                    self._kill(executor, "timeout")
+                    executor = None
+                    raise ParserTimeout(f"{parser} parsing timed out after {timeout:.0f}s")
+                except BrokenProcessPool:
+                    # The worker died while running this job (and only this job): it is the culprit
+                    outcome = "crashed"
+                    print(f"[parser-pool] {parser} worker died - restarting it")
+                    self._kill(executor, "crashed")
+                    executor = None
+                    raise ParserCrashed(
+                        f"{parser} parser process died (memory limit {self.max_memory_mb} MB or crash)"
+                    )
+                except MemoryError:
+                    outcome = "memory"
+                    raise ParserCrashed(f"{parser} parsing exceeded the {self.max_memory_mb} MB memory limit")
+                outcome = "ok"
+                return result
+            finally:
+                self._running -= 1
+                _latency.observe((parser,), time.monotonic() - started)
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            if executor is not None:
+                # The job keeps running in the worker; don't hand a busy worker to the next job
+                self._kill(executor, "cancelled")
+                executor = None
+            raise
+        finally:
+            if acquired:
+                idle.put_nowait(executor)
+            else:
+                self._queued -= 1
+            _jobs_total.inc((parser, outcome))
+            self._update_gauges()
+
+    async def warm_up(self) -> None:
+        """Start the workers ahead of the first upload (spawning one imports all parsers, ~1s)."""
+        loop = asyncio.get_running_loop()
+        idle = self._idle_queue()
+        executors = []
+        while not idle.empty():
+            executors.append(idle.get_nowait() or self._new_executor())
+        try:
+            await asyncio.gather(*[loop.run_in_executor(e, _ready, i) for i, e in enumerate(executors)])
+        finally:
+            for executor in executors:
+                idle.put_nowait(executor)
+
+    def shutdown(self) -> None:
+        executors, self._executors = self._executors, set()
+        self._idle = None
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": self._queued,
+            "running": self._running,
+            "job_timeout_s": self.job_timeout_s,
+            "max_memory_mb": self.max_memory_mb,
+            "max_jobs_per_worker": self.max_jobs_per_worker,
+            "restarts": dict(self._restarts),
+        }
+
+
+_pool: Optional[ParserPool] = None
+
+
+def get_parser_pool() -> ParserPool:
+    global _pool
+    if _pool is None:
+        _pool = ParserPool(
+            workers=int(os.getenv("PARSER_WORKERS") or os.getenv("PDF_WORKERS") or 2),
+            job_timeout_s=float(os.getenv("PARSER_JOB_TIMEOUT_S") or 60),
+            max_memory_mb=int(os.getenv("PARSER_MAX_MEMORY_MB") or 1024),
+            max_jobs_per_worker=int(os.getenv("PARSER_MAX_JOBS_PER_WORKER") or 1000),
+        )
+    return _pool
+
+
+def shutdown_parser_pool() -> None:
+    """Stop the parser worker processes (app shutdown)."""
+    if _pool is not None:
+        _pool.shutdown()
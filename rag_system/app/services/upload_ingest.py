@@ -0,0 +1,126 @@
+"""
+Streaming upload ingestion
+
+Uploads are copied chunk by chunk from the request into the job spool file,
+so a request never holds the whole file in memory. While streaming we:
+
+- enforce the size limit (abort as soon as it is exceeded)
+- sniff the real MIME type from the first bytes (magic numbers)
+- compute the SHA-256 content fingerprint
+
+The spool file is then the single copy of the upload: the worker parses it and
+streams it to Supabase Storage from disk.
+"""
+
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+# Bytes needed to recognize every supported format
+SNIFF_BYTES = 8
+
+# Declared extension -> sniffed MIME types it may contain
+_EXTENSION_TYPES = {
+    "pdf": {"application/pdf"},
+    "png": {"image/png"},
+    "jpg": {"image/jpeg"},
+    "jpeg": {"image/jpeg"},
+    "docx": {"application/zip"},
+    "xlsx": {"application/zip"},
+    "doc": {"application/x-ole-storage"},
+    "txt": {"text/plain"},
+    "json": {"text/plain"},
+}
+
+# Formats we have no reader for (legacy .xls needs xlrd; openpyxl only reads OOXML)
+UNSUPPORTED_EXTENSIONS = {"xls"}
+
+
+class UploadRejected(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    size: int
+    sha256: str
+    mime_type: str
+
+
+def sniff_mime(head: bytes) -> str:
+    """MIME type from magic bytes; text/plain for NUL-free data, else octet-stream."""
+    if head.startswith(b"%PDF"):
+        return "application/pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip"  # docx / xlsx (OOXML packages)
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        return "application/x-ole-storage"  # legacy .doc (and .xls, which is rejected)
+    if head.startswith((b"\xff\xfe", b"\xfe\xff", b"\xef\xbb\xbf")) or b"\x00" not in head:
+        return "text/plain"  # BOM-marked (UTF-8/16) or NUL-free text
+    return "application/octet-stream"
+
+
+async def spool_upload(
+    file,
+    dest_path: str,
+    *,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024,
+    filename: Optional[str] = None,
+) -> SpooledUpload:
+    """
+    Stream an UploadFile into `dest_path` (size limit, MIME sniffing, SHA-256 on the fly).
+    Raises UploadRejected (and removes the partial file) if the upload is too
+    large or its content does not match its extension.
+    """
+    name = filename or getattr(file, "filename", None) or ""
+    ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    mime_type = None
+    out = await asyncio.to_thread(open, dest_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(f"File too large. Max {max_bytes / 1024 / 1024:g}MB.", status_code=413)
+            if mime_type is None:
+                head = (head + chunk)[:SNIFF_BYTES]
+                if len(head) >= SNIFF_BYTES:
+                    mime_type = _check_type(head, ext)
+            digest.update(chunk)
+            await asyncio.to_thread(out.write, chunk)
+        if mime_type is None:
+            mime_type = _check_type(head, ext)
+    except BaseException:
+        out.close()
+        try:
+            os.remove(dest_path)
+        except OSError:
+            pass
+        raise
+    await asyncio.to_thread(out.close)
+    return SpooledUpload(path=dest_path, size=size, sha256=digest.hexdigest(), mime_type=mime_type)
+
+
+def _check_type(head: bytes, ext: str) -> str:
+    if ext in UNSUPPORTED_EXTENSIONS:
+        raise UploadRejected(f"Unsupported file type: .{ext}. Save the file as .{ext}x and upload again.")
+    mime_type = sniff_mime(head)
+    expected = _EXTENSION_TYPES.get(ext)
+    if expected is not None and mime_type not in expected:
+        raise UploadRejected(f"File content does not match its .{ext} extension (looks like {mime_type}).")
+    return mime_type
@@ -0,0 +1,376 @@
+"""
+Upload Job Queue
+
+Captain uploads are processed in the background: the endpoint enqueues a job and
+returns the upload_id immediately, a worker pool runs parsing -> extraction ->
+saving, and clients follow progress via the status (long-poll) endpoint.
+
+- Stages: queued -> parsing -> extracting -> saving -> completed | failed,
+  each with a timestamp (`stages`); an `on_stage` hook mirrors them into
+  captain_uploads
+- Failed attempts are retried with exponential backoff unless the handler
+  raises `PermanentJobError`
+- Backends: in-process (default) or SQLite, which survives restarts: jobs that
+  were queued or running when the process stopped are picked up again
+
+Configuration (environment):
+
+    UPLOAD_JOB_BACKEND        memory | sqlite (default memory)
+    UPLOAD_JOB_DB             SQLite file (default .upload_jobs.sqlite3)
+    UPLOAD_JOB_WORKERS        concurrent jobs (default 2)
+    UPLOAD_JOB_MAX_ATTEMPTS   attempts per job, including the first (default 3)
+    UPLOAD_JOB_RETRY_DELAY_S  base retry backoff (default 5)
+    UPLOAD_JOB_SPOOL_DIR      uploaded files waiting for a worker (default /tmp/lexa_upload_jobs)
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+STAGES = ("queued", "parsing", "extracting", "saving", "completed", "failed")
+TERMINAL_STAGES = ("completed", "failed")
+
+# Finished jobs kept in memory for status polls
+_FINISHED_JOBS_KEPT = 500
+
+
+class PermanentJobError(Exception):
+    """Fails an upload job without retrying (bad input, nothing extracted, ...)."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class UploadJob:
+    upload_id: str
+    kind: str  # handler name, e.g. "file" | "text"
+    payload: Dict[str, Any]
+    stage: str = "queued"
+    stages: Dict[str, str] = field(default_factory=dict)  # stage -> ISO timestamp
+    attempts: int = 0
+    error: Optional[str] = None
+    error_status: Optional[int] = None  # HTTP-style code of the failure (4xx = bad input)
+    result: Optional[Dict[str, Any]] = None
+    available_at: float = 0.0  # wall clock; retries wait until then
+
+    @property
+    def finished(self) -> bool:
+        return self.stage in TERMINAL_STAGES
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "upload_id": self.upload_id,
+            "status": self.stage,
+            "stages": dict(self.stages),
+            "attempts": self.attempts,
+            "error": self.error,
+            "error_status": self.error_status,
+            "result": self.result if self.stage == "completed" else None,
+        }
+
+
+ProgressFn = Callable[[str], Awaitable[None]]
+JobHandler = Callable[[UploadJob, ProgressFn], Awaitable[Dict[str, Any]]]
+StageHook = Callable[[UploadJob], Awaitable[None]]
+
+
+class SQLiteJobStore:
+    """Durable job records (one row per upload)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS upload_jobs (
+                    upload_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    stages TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    error_status INTEGER,
+                    result TEXT,
+                    available_at REAL NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _row_to_job(row) -> UploadJob:
+        return UploadJob(
+            upload_id=row[0],
+            kind=row[1],
+            payload=json.loads(row[2]),
+            stage=row[3],
+            stages=json.loads(row[4]),
+            attempts=int(row[5]),
+            error=row[6],
+            error_status=row[7],
+            result=json.loads(row[8]) if row[8] else None,
+            available_at=float(row[9]),
+        )
+
+    def _save(self, job: UploadJob) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO upload_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.upload_id,
+                    job.kind,
+                    json.dumps(job.payload, default=str),
+                    job.stage,
+                    json.dumps(job.stages),
+                    job.attempts,
+                    job.error,
+                    job.error_status,
+                    json.dumps(job.result, default=str) if job.result is not None else None,
+                    job.available_at,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def _get(self, upload_id: str) -> Optional[UploadJob]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM upload_jobs WHERE upload_id = ?", (upload_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def _unfinished(self) -> List[UploadJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM upload_jobs WHERE stage NOT IN (?, ?) ORDER BY updated_at",
+                TERMINAL_STAGES,
+            ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    async def save(self, job: UploadJob) -> None:
+        await asyncio.to_thread(self._save, job)
+
+    async def get(self, upload_id: str) -> Optional[UploadJob]:
+        return await asyncio.to_thread(self._get, upload_id)
+
+    async def unfinished(self) -> List[UploadJob]:
+        return await asyncio.to_thread(self._unfinished)
+
+
+class UploadJobManager:
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        max_attempts: int = 3,
+        retry_delay_s: float = 5.0,
+        store: Optional[SQLiteJobStore] = None,
+    ):
+        self.workers = max(1, int(workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay_s = max(0.0, float(retry_delay_s))
+        self.store = store
+        self.on_stage: Optional[StageHook] = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._jobs: "OrderedDict[str, UploadJob]" = OrderedDict()
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._start_lock = asyncio.Lock()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    # -- lifecycle -------------------------------------------------------------
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the worker pool (idempotent); resumes unfinished SQLite jobs."""
+        async with self._start_lock:
+            if self._tasks:
+                return
+            self._queue = asyncio.Queue()
+            if self.store is not None:
+                for job in await self.store.unfinished():
+                    job.stage = "queued"  # interrupted mid-run: start the attempt over
+                    self._jobs[job.upload_id] = job
+                    self._schedule(job)
+                    print(f"[upload-jobs] resumed {job.kind} job {job.upload_id}")
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # -- public API ------------------------------------------------------------
+
+    async def enqueue(self, upload_id: str, kind: str, payload: Dict[str, Any]) -> UploadJob:
+        if kind not in self._handlers:
+            raise ValueError(f"No upload job handler registered for {kind!r}")
+        await self.start()
+        job = UploadJob(upload_id=str(upload_id), kind=kind, payload=payload)
+        self._jobs[job.upload_id] = job
+        await self._set_stage(job, "queued")
+        self._schedule(job)
+        return job
+
+    async def get(self, upload_id: str) -> Optional[UploadJob]:
+        job = self._jobs.get(str(upload_id))
+        if job is None and self.store is not None:
+            job = await self.store.get(str(upload_id))
+        return job
+
+    async def wait(self, upload_id: str, *, since: Optional[str] = None, timeout: float = 25.0) -> Optional[UploadJob]:
+        """
+        Long-poll: return once the job's stage differs from `since` (any change
+        if None), it finishes, or `timeout` elapses.
+        """
+        job = await self.get(upload_id)
+        if job is None or job.finished or (since is not None and job.stage != since):
+            return job
+        event = self._changed.setdefault(job.upload_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout=max(0.0, timeout))
+        except asyncio.TimeoutError:
+            pass
+        return await self.get(upload_id)
+
+    async def wait_until_finished(self, upload_id: str) -> Optional[UploadJob]:
+        job = await self.get(upload_id)
+        while job is not None and not job.finished:
+            job = await self.wait(upload_id, since=job.stage, timeout=60)
+        return job
+
+    def snapshot(self) -> Dict[str, Any]:
+        by_stage: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_stage[job.stage] = by_stage.get(job.stage, 0) + 1
+        return {
+            "backend": "sqlite" if self.store is not None else "memory",
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_attempts": self.max_attempts,
+            "jobs_by_stage": by_stage,
+        }
+
+    # -- internals -------------------------------------------------------------
+
+    def _schedule(self, job: UploadJob) -> None:
+        delay = job.available_at - time.time()
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job.upload_id)  # type: ignore
+        else:
+            self._queue.put_nowait(job.upload_id)  # type: ignore
+
+    async def _set_stage(self, job: UploadJob, stage: str) -> None:
+        job.stage = stage
+        job.stages[stage] = datetime.utcnow().isoformat()
+        if self.store is not None:
+            try:
+                await self.store.save(job)
+            except Exception as e:
+                print(f"[upload-jobs] could not persist job {job.upload_id}: {e}")
+        if self.on_stage is not None:
+            try:
+                await self.on_stage(job)
+            except Exception as e:
+                print(f"[upload-jobs] stage hook failed for {job.upload_id}: {e}")
+        event = self._changed.pop(job.upload_id, None)
+        if event is not None:
+            event.set()
+        if job.finished:
+            self._forget_old_jobs()
+
+    def _forget_old_jobs(self) -> None:
+        finished = [uid for uid, j in self._jobs.items() if j.finished]
+        for uid in finished[: max(0, len(finished) - _FINISHED_JOBS_KEPT)]:
+            self._jobs.pop(uid, None)
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        while True:
+            upload_id = await self._queue.get()
+            try:
+                job = self._jobs.get(upload_id)
+                if job is not None and not job.finished:
+                    await self._run(job)
+            except Exception as e:
+                print(f"[upload-jobs] worker {index} error on {upload_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: UploadJob) -> None:
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            job.error, job.error_status = f"No handler registered for {job.kind!r}", 500
+            await self._set_stage(job, "failed")
+            return
+
+        async def progress(stage: str) -> None:
+            await self._set_stage(job, stage)
+
+        job.attempts += 1
+        self._running += 1
+        try:
+            result = await handler(job, progress)
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            job.error_status = getattr(e, "status_code", 500)
+            if isinstance(e, PermanentJobError) or job.attempts >= self.max_attempts:
+                print(f"[upload-jobs] {job.upload_id} failed after {job.attempts} attempt(s): {job.error}")
+                await self._set_stage(job, "failed")
+                return
+            delay = self.retry_delay_s * (2 ** (job.attempts - 1))
+            print(f"[upload-jobs] {job.upload_id} attempt {job.attempts} failed ({job.error}); retrying in {delay:.0f}s")
+            job.available_at = time.time() + delay
+            await self._set_stage(job, "queued")
+            self._schedule(job)
+        else:
+            job.result = result
+            job.error = job.error_status = None
+            await self._set_stage(job, "completed")
+        finally:
+            self._running -= 1
+
+
+_manager: Optional[UploadJobManager] = None
+
+
+def get_upload_job_manager() -> UploadJobManager:
+    global _manager
+    if _manager is None:
+        backend = (os.getenv("UPLOAD_JOB_BACKEND") or "memory").strip().lower()
+        store = SQLiteJobStore(os.getenv("UPLOAD_JOB_DB") or ".upload_jobs.sqlite3") if backend == "sqlite" else None
+        _manager = UploadJobManager(
+            workers=int(os.getenv("UPLOAD_JOB_WORKERS") or 2),
+            max_attempts=int(os.getenv("UPLOAD_JOB_MAX_ATTEMPTS") or 3),
+            retry_delay_s=float(os.getenv("UPLOAD_JOB_RETRY_DELAY_S") or 5),
+            store=store,
+        )
+    return _manager
+
+
+def get_upload_spool_dir() -> str:
+    path = os.getenv("UPLOAD_JOB_SPOOL_DIR") or "/tmp/lexa_upload_jobs"
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -55,6 +55,33 @@ class Settings(BaseSettings):
     anthropic_model: str = "claude-sonnet-4-5-20250929"
     openai_text_model: str = "gpt-4o-mini"
     openai_vision_model: str = "gpt-4o-mini"
+
+    # LLM connection pooling (one long-lived async client per provider)
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_s: float = 30.0
+    llm_request_timeout_s: float = 90.0
+
+    # LLM response cache (memory LRU + optional SQLite tier; empty path = memory only)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_ttl_s: float = 6 * 3600
+    llm_cache_disk_path: str = ""
+    llm_cache_disk_max_entries: int = 5000
+
+    # LLM provider circuit breaker + hedged failover
+    llm_breaker_window_s: float = 60.0
+    llm_breaker_min_requests: int = 5
+    llm_breaker_error_rate: float = 0.5
+    llm_breaker_open_s: float = 30.0
+    # Slow-call trip: provider seconds per latency class (scheduler priority; 0 = off)
+    llm_breaker_slow_interactive_s: float = 30.0
+    llm_breaker_slow_extraction_s: float = 0.0
+    llm_breaker_slow_batch_s: float = 0.0
+    llm_breaker_slow_rate: float = 0.5
+    llm_hedge_enabled: bool = False
+    llm_hedge_min_samples: int = 20
+    llm_hedge_min_delay_s: float = 2.0
     
     # Embedding Model
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
@@ -5,13 +5,15 @@ This module enables LEXA to adapt her personality, tone, and communication style
 to match ultra-luxury clients exactly where they are emotionally.
 """
 
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, Optional
 from dataclasses import dataclass
 import structlog
 
 from core.ailessia.emotion_interpreter import EmotionalReading, EmotionalState
 from config.settings import settings
 from core.llm.router import generate_text as llm_generate_text
+from core.llm.router import stream_text as llm_stream_text
+from core.llm.router import has_llm_provider
 
 logger = structlog.get_logger()
 
@@ -169,7 +171,8 @@ class PersonalityMirror:
         tone_name: str,
         client_name: Optional[str] = None,
         emotional_context: Optional[Dict] = None,
-        conversation_stage: str = "discovery"
+        conversation_stage: str = "discovery",
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None
     ) -> str:
         """
         Generate LEXA's response in the adapted tone.
@@ -180,6 +183,8 @@ class PersonalityMirror:
             client_name: Client's name for personalization
             emotional_context: Current emotional context
             conversation_stage: Current conversation stage
+            on_token: Optional async callback; when given, the response is
+                streamed and each text delta is passed to it as it arrives
         
         Returns:
             Generated response in LEXA's voice
@@ -189,9 +194,12 @@ class PersonalityMirror:
             self.TONE_PROFILES["sophisticated_friend"]
         )
         
-        # If no provider keys exist, use deterministic formatting.
-        if not settings.anthropic_api_key and not settings.openai_api_key:
-            return self._format_with_tone(content, tone_config, client_name)
+        # If no provider is available (no keys, no cassette replay), use deterministic formatting.
+        if not has_llm_provider():
+            response = self._format_with_tone(content, tone_config, client_name)
+            if on_token is not None:
+                await on_token(response)
+            return response
 
         # Use provider (Claude primary, OpenAI fallback) for nuanced generation
         prompt = self._build_generation_prompt(
@@ -201,6 +209,11 @@ class PersonalityMirror:
             emotional_context,
             conversation_stage
         )
+
+        if on_token is not None:
+            return await self._stream_response(
+                prompt, content, tone_config, client_name, conversation_stage, on_token
+            )
         
         try:
             response = await llm_generate_text(
@@ -208,6 +221,8 @@ class PersonalityMirror:
                 user_text=prompt,
                 max_tokens=800,
                 prefer=settings.default_llm,
+                cache=False,  # sampled conversation turns must not be replayed to other clients
+                caller="lexa:converse",
             )
             if not response:
                 response = self._format_with_tone(content, tone_config, client_name)
@@ -219,6 +234,42 @@ class PersonalityMirror:
         except Exception as e:
             logger.error("Response generation failed", error=str(e))
             return self._format_with_tone(content, tone_config, client_name)
+
+    async def _stream_response(
+        self,
+        prompt: str,
+        content: str,
+        tone_config: ToneProfile,
+        client_name: Optional[str],
+        conversation_stage: str,
+        on_token: Callable[[str], Awaitable[None]]
+    ) -> str:
+        """Stream the generated response through `on_token`; returns the full text."""
+        parts = []
+        try:
+            async for delta in llm_stream_text(
+                system=LEXA_LUXURY_SYSTEM_PROMPT,
+                user_text=prompt,
+                max_tokens=800,
+                prefer=settings.default_llm,
+                cache=False,  # sampled conversation turns must not be replayed to other clients
+                caller="lexa:converse_stream",
+            ):
+                parts.append(delta)
+                await on_token(delta)
+        except Exception as e:
+            logger.error("Response streaming failed", error=str(e), streamed_chars=sum(len(p) for p in parts))
+
+        response = "".join(parts).strip()
+        if not response:
+            # Nothing reached the client yet; send the deterministic version instead.
+            response = self._format_with_tone(content, tone_config, client_name)
+            await on_token(response)
+
+        logger.info("Streamed response",
+                   tone=tone_config.name,
+                   stage=conversation_stage)
+        return response
     
     def _format_with_tone(
         self,
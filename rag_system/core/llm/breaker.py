@@ -0,0 +1,162 @@
+"""
+Provider Circuit Breaker
+------------------------
+
+Tracks each provider's recent health over a rolling time window:
+- error rate (transient failures / calls) trips the breaker
+- slow-call rate trips it too: per latency class (the caller's scheduler
+  priority), successful calls slower than that class' threshold count as slow
+- provider latency of successful calls (scheduler queue wait excluded) feeds a
+  p95 estimate per latency class, used for hedged requests; an 800-token reply
+  and a 9000-token extraction never share a window
+
+States:
+- closed:    provider is healthy; calls go through
+- open:      provider tripped; calls go straight to the fallback provider
+- half_open: cool-down elapsed; calls are allowed again and the next outcome
+             decides between closed (success) and open (failure)
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_s: float = 60.0,
+        min_requests: int = 5,
+        error_rate: float = 0.5,
+        open_s: float = 30.0,
+        latency_samples: int = 200,
+        slow_call_s: Optional[Dict[str, float]] = None,
+        slow_rate: float = 0.5,
+    ):
+        self.name = name
+        self.window_s = float(window_s)
+        self.min_requests = max(1, int(min_requests))
+        self.error_rate = float(error_rate)
+        self.open_s = float(open_s)
+        self.latency_samples_max = max(1, int(latency_samples))
+        # latency class -> seconds above which a successful call counts as slow (missing/0 = off)
+        self.slow_call_s = {k: float(v) for k, v in (slow_call_s or {}).items() if v and v > 0}
+        self.slow_rate = float(slow_rate)
+        # (timestamp, ok, latency class, slow)
+        self._outcomes: Deque[Tuple[float, bool, str, bool]] = deque()
+        # per latency class: provider latencies of successful calls (seconds), most recent last
+        self._latencies: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._opened_at: Optional[float] = None
+        self.trips = 0
+
+    # -- state -------------------------------------------------------------
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.open_s:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """True unless the breaker is open and still cooling down."""
+        return self.state != "open"
+
+    # -- recording ---------------------------------------------------------
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_s
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        for latencies in self._latencies.values():
+            while latencies and latencies[0][0] < cutoff:
+                latencies.popleft()
+
+    def record_success(self, latency_s: float, latency_class: str = "default") -> None:
+        """`latency_s` is provider time only: measured after the scheduler slot was acquired."""
+        now = time.monotonic()
+        threshold = self.slow_call_s.get(latency_class)
+        slow = threshold is not None and latency_s >= threshold
+        state = self.state
+        if state == "half_open":
+            if slow:
+                self._trip(now, reason=f"probe slow ({latency_s:.1f}s)")
+                return
+            logger.info("LLM provider recovered; closing circuit", provider=self.name)
+            self._opened_at = None
+            self._outcomes.clear()
+        self._outcomes.append((now, True, latency_class, slow))
+        latencies = self._latencies.get(latency_class)
+        if latencies is None:
+            latencies = self._latencies[latency_class] = deque(maxlen=self.latency_samples_max)
+        latencies.append((now, float(latency_s)))
+        self._prune(now)
+        if slow and self._opened_at is None:
+            in_class = [o for o in self._outcomes if o[2] == latency_class]
+            slow_calls = sum(1 for o in in_class if o[3])
+            if len(in_class) >= self.min_requests and slow_calls / len(in_class) >= self.slow_rate:
+                self._trip(now, reason=f"slow {latency_class} calls {slow_calls}/{len(in_class)}")
+
+    def record_failure(self, latency_class: str = "default") -> None:
+        now = time.monotonic()
+        state = self.state
+        if state == "open":
+            return
+        if state == "half_open":
+            self._trip(now, reason="probe failed")
+            return
+        self._outcomes.append((now, False, latency_class, False))
+        self._prune(now)
+        total = len(self._outcomes)
+        failures = sum(1 for o in self._outcomes if not o[1])
+        if self._opened_at is None and total >= self.min_requests and failures / total >= self.error_rate:
+            self._trip(now, reason=f"error rate {failures}/{total}")
+
+    def _trip(self, now: float, *, reason: str) -> None:
+        self._opened_at = now
+        self._outcomes.clear()
+        self.trips += 1
+        logger.warning("LLM provider circuit opened", provider=self.name, reason=reason, open_s=self.open_s)
+
+    # -- latency -----------------------------------------------------------
+
+    def latency_percentile(self, q: float, latency_class: str = "default") -> Optional[float]:
+        self._prune(time.monotonic())
+        latencies = self._latencies.get(latency_class)
+        if not latencies:
+            return None
+        values = sorted(l for _, l in latencies)
+        idx = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+        return values[idx]
+
+    def latency_samples(self, latency_class: str = "default") -> int:
+        return len(self._latencies.get(latency_class) or ())
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        total = len(self._outcomes)
+        failures = sum(1 for o in self._outcomes if not o[1])
+        latency = {}
+        for latency_class in sorted(self._latencies):
+            p95 = self.latency_percentile(0.95, latency_class)
+            latency[latency_class] = {
+                "p95_s": round(p95, 3) if p95 is not None else None,
+                "samples": self.latency_samples(latency_class),
+                "slow_calls": sum(1 for o in self._outcomes if o[2] == latency_class and o[3]),
+            }
+        return {
+            "state": self.state,
+            "window_requests": total,
+            "window_failures": failures,
+            "window_error_rate": round(failures / total, 3) if total else 0.0,
+            "latency": latency,
+            "trips": self.trips,
+        }
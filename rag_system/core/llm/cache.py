@@ -0,0 +1,201 @@
+"""
+LLM Response Cache
+------------------
+
+Content-addressed cache for provider responses. The same source text often goes
+through extraction more than once (re-uploads, edits, re-analysis); a cache hit
+skips the provider round-trip entirely.
+
+Two tiers:
+- memory: in-process LRU with TTL (always on when caching is enabled)
+- disk:   optional SQLite file that survives restarts (set `llm_cache_disk_path`)
+
+Values are stored JSON-serialized, so every hit returns a fresh copy that callers
+may mutate freely.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+
+def make_cache_key(**parts: Any) -> str:
+    """
+    Stable SHA-256 over the request fields that determine the response.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """SQLite-backed tier. All methods are blocking; call them off the event loop."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0], row[1]
+
+    def set(self, key: str, value: str, expires_at: float) -> int:
+        """Store a value; returns the number of rows evicted to stay within bounds."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            evicted = max(0, count - self.max_entries)
+            if evicted:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (evicted,),
+                )
+            self._conn.commit()
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache with TTL and bounded size.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        ttl_s: float = 3600.0,
+        disk_path: str = "",
+        disk_max_entries: int = 5000,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._disk: Optional[_DiskTier] = None
+        if disk_path:
+            try:
+                self._disk = _DiskTier(disk_path, max(1, int(disk_max_entries)))
+            except Exception as e:
+                logger.warning("LLM disk cache unavailable; using memory tier only", path=disk_path, error=str(e))
+        self.stats: Dict[str, int] = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions_memory": 0,
+            "evictions_disk": 0,
+        }
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions_memory"] += 1
+
+    async def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._memory.move_to_end(key)
+                self.stats["hits_memory"] += 1
+                return json.loads(entry[0])
+            del self._memory[key]
+
+        if self._disk is not None:
+            try:
+                found = await asyncio.to_thread(self._disk.get, key)
+            except Exception as e:
+                logger.warning("LLM disk cache read failed", error=str(e))
+                found = None
+            if found is not None:
+                value, expires_at = found
+                self._remember(key, value, expires_at)
+                self.stats["hits_disk"] += 1
+                return json.loads(value)
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            serialized = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        expires_at = time.time() + self.ttl_s
+        self._remember(key, serialized, expires_at)
+        self.stats["stores"] += 1
+        if self._disk is not None:
+            try:
+                evicted = await asyncio.to_thread(self._disk.set, key, serialized, expires_at)
+                self.stats["evictions_disk"] += evicted
+            except Exception as e:
+                logger.warning("LLM disk cache write failed", error=str(e))
+
+    async def clear(self) -> None:
+        self._memory.clear()
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.clear)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits_memory"] + self.stats["hits_disk"] + self.stats["misses"]
+        hits = self.stats["hits_memory"] + self.stats["hits_disk"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_max_entries": self.max_entries,
+            "disk_enabled": self._disk is not None,
+            "ttl_s": self.ttl_s,
+        }
@@ -0,0 +1,173 @@
+"""
+LLM Cassettes (record / replay)
+-------------------------------
+
+Offline provider for deterministic benchmarks. Each provider request is hashed
+(provider, model, prompt, sampling parameters) and its response is stored as one
+JSON file in a cassette directory:
+
+- record: call the real provider and write every response to the cassette dir
+- replay: never touch the network; serve recorded responses (a missing
+          recording raises `CassetteMiss`) after a synthetic latency
+
+Used by the LLM router and by MultipassExtractor, so configuration comes from
+environment variables:
+
+    LLM_CASSETTE_MODE        off | record | replay (default off)
+    LLM_CASSETTE_DIR         cassette directory (default .llm_cassettes)
+    LLM_REPLAY_LATENCY_MS    fixed latency per replayed call, or "recorded" to
+                             reuse the latency captured at record time (default 0)
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import structlog
+
+from core.llm.telemetry import usage_counts
+
+logger = structlog.get_logger()
+
+MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(RuntimeError):
+    """No recording exists for a request in replay mode."""
+
+
+
+
+class CassetteStore:
+    def __init__(self, *, mode: str, directory: str, latency: str):
+        self.mode = mode if mode in MODES else "off"
+        self.directory = directory
+        self.recorded_latency = latency.strip().lower() == "recorded"
+        try:
+            self.fixed_latency_s = 0.0 if self.recorded_latency else max(0.0, float(latency or 0) / 1000.0)
+        except ValueError:
+            self.fixed_latency_s = 0.0
+        self.stats: Dict[str, int] = {"replayed": 0, "misses": 0, "recorded": 0}
+        if self.mode != "off":
+            os.makedirs(self.directory, exist_ok=True)
+            logger.info("LLM cassette mode enabled", mode=self.mode, directory=self.directory)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @staticmethod
+    def request_key(request: Dict[str, Any]) -> str:
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self._path(key))
+
+    def _latency_for(self, entry: Dict[str, Any]) -> float:
+        if self.recorded_latency:
+            return float(entry.get("latency_s") or 0.0)
+        return self.fixed_latency_s
+
+    async def _load(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        key = self.request_key(request)
+        entry = await asyncio.to_thread(self._read, key)
+        if entry is None:
+            self.stats["misses"] += 1
+            raise CassetteMiss(
+                f"No recorded LLM response for {request.get('provider')}/{request.get('model')} request {key[:12]}"
+            )
+        self.stats["replayed"] += 1
+        return entry
+
+    async def replay(self, request: Dict[str, Any]) -> Tuple[str, SimpleNamespace]:
+        """
+        Recorded (text, usage) for `request`, after the synthetic latency.
+        """
+        entry = await self._load(request)
+        latency_s = self._latency_for(entry)
+        if latency_s > 0:
+            await asyncio.sleep(latency_s)
+        return entry.get("text") or "", SimpleNamespace(**usage_counts(entry.get("usage")))
+
+    async def replay_stream(self, request: Dict[str, Any], usage_out: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+        """
+        Yield the recorded text in word-sized chunks, spreading the synthetic
+        latency evenly across them. Token usage is written into `usage_out`.
+        """
+        entry = await self._load(request)
+        if usage_out is not None:
+            usage_out.update(usage_counts(entry.get("usage")))
+        chunks = re.findall(r"\S+\s*|\s+", entry.get("text") or "") or [""]
+        delay_s = self._latency_for(entry) / len(chunks)
+        for chunk in chunks:
+            if delay_s > 0:
+                await asyncio.sleep(delay_s)
+            if chunk:
+                yield chunk
+
+    async def record(self, request: Dict[str, Any], *, text: str, usage: Any, latency_s: float) -> None:
+        key = self.request_key(request)
+        entry = {
+            "key": key,
+            "provider": request.get("provider"),
+            "model": request.get("model"),
+            "recorded_at": time.time(),
+            "latency_s": round(float(latency_s), 4),
+            "usage": usage_counts(usage),
+            "text": text,
+        }
+        try:
+            await asyncio.to_thread(self._write, key, entry)
+            self.stats["recorded"] += 1
+        except Exception as e:
+            logger.warning("Failed to write LLM cassette", key=key, error=str(e))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "directory": self.directory if self.mode != "off" else None,
+            "latency": "recorded" if self.recorded_latency else self.fixed_latency_s,
+            **self.stats,
+        }
+
+
+_store: Optional[CassetteStore] = None
+
+
+def get_cassette_store() -> CassetteStore:
+    global _store
+    if _store is None:
+        _store = CassetteStore(
+            mode=(os.getenv("LLM_CASSETTE_MODE") or "off").strip().lower(),
+            directory=os.getenv("LLM_CASSETTE_DIR") or ".llm_cassettes",
+            latency=os.getenv("LLM_REPLAY_LATENCY_MS") or "0",
+        )
+    return _store
+
+
+def get_cassette_stats() -> Dict[str, Any]:
+    return get_cassette_store().snapshot()
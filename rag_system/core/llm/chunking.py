@@ -0,0 +1,161 @@
+"""
+Chunked (map-reduce) extraction helpers
+---------------------------------------
+
+Long documents do not fit one extraction call. These helpers split source text
+into overlapping chunks on natural boundaries and merge the per-chunk JSON
+results back into one deterministic result:
+
+- split_text:   page markers > headings > blank lines > line breaks > sentences
+- merge_results: dicts are merged key by key (first non-empty scalar wins, in
+                 chunk order); list items are de-duplicated by identity (name /
+                 title / relationship endpoints, else canonical JSON) and
+                 duplicates are merged into the first occurrence
+
+Settings-free so both the LLM router and the captain-portal extractors can use it.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import copy
+import json
+import re
+
+# Preferred cut points, best first.
+_BOUNDARIES: Sequence["re.Pattern[str]"] = (
+    re.compile(r"\n--- Page \d+ ---\n"),          # file_processor PDF page markers
+    re.compile(r"\n(?=#{1,6} )"),                  # markdown headings
+    re.compile(r"\n[ \t]*\n"),                      # paragraphs
+    re.compile(r"\n"),                              # lines
+    re.compile(r"(?<=[.!?])\s+"),                   # sentences
+)
+
+# Keys that identify a list item, in order of preference.
+_IDENTITY_KEYS = ("name", "title", "topic", "source_span")
+
+
+def _best_cut(text: str, lo: int, hi: int) -> int:
+    """Last preferred boundary in text[lo:hi]; `hi` if there is none."""
+    for pattern in _BOUNDARIES:
+        cut = None
+        for m in pattern.finditer(text, lo, hi):
+            cut = m.start() if m.start() > lo else None
+        if cut is not None:
+            return cut
+    return hi
+
+
+def _first_cut(text: str, lo: int, hi: int) -> int:
+    """First preferred boundary in text[lo:hi]; `lo` if there is none."""
+    for pattern in _BOUNDARIES:
+        m = pattern.search(text, lo, hi)
+        if m is not None:
+            return m.start()
+    return lo
+
+
+def split_text(text: str, max_chars: int, overlap: int = 0) -> List[str]:
+    """
+    Split `text` into chunks of at most `max_chars`, cutting on the best
+    boundary in the second half of each window. Consecutive chunks share about
+    `overlap` characters so items straddling a cut appear whole in one of them.
+    """
+    text = text or ""
+    max_chars = max(1, int(max_chars))
+    overlap = max(0, min(int(overlap), max_chars // 2))
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks: List[str] = []
+    start = 0
+    n = len(text)
+    while start < n:
+        end = min(n, start + max_chars)
+        if end < n:
+            end = _best_cut(text, start + max_chars // 2, end)
+        chunks.append(text[start:end])
+        if end >= n:
+            break
+        # Start the next chunk about `overlap` chars back, on the first boundary after that point.
+        next_start = end - overlap
+        if overlap:
+            next_start = _first_cut(text, next_start, end)
+        start = max(next_start, start + 1)
+    return chunks
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+
+def item_identity(item: Any) -> str:
+    """
+    Stable identity of a list item for de-duplication across chunks.
+    """
+    if isinstance(item, dict):
+        for key in _IDENTITY_KEYS:
+            if item.get(key):
+                return f"{key}:{_normalize(item[key])}"
+        if item.get("start_node") or item.get("from"):
+            ends = (
+                item.get("start_node") or item.get("from"),
+                item.get("type"),
+                item.get("end_node") or item.get("to"),
+            )
+            return "edge:" + "|".join(_normalize(e) for e in ends)
+        if item.get("chunk"):
+            return f"chunk:{_normalize(item['chunk'])[:200]}"
+    if isinstance(item, str):
+        return f"str:{_normalize(item)}"
+    return "json:" + json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _merge_lists(base: List[Any], extra: Iterable[Any]) -> List[Any]:
+    index = {item_identity(item): i for i, item in enumerate(base)}
+    for item in extra:
+        key = item_identity(item)
+        if key not in index:
+            index[key] = len(base)
+            base.append(copy.deepcopy(item))
+        elif isinstance(base[index[key]], dict) and isinstance(item, dict):
+            merge_into(base[index[key]], item)
+    return base
+
+
+def dedupe_items(items: Iterable[Any]) -> List[Any]:
+    """
+    Copy of `items` with duplicates (same `item_identity`) merged into their first occurrence.
+    """
+    return _merge_lists([], items)
+
+
+def merge_into(base: Dict[str, Any], extra: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge `extra` into `base` in place (see module docstring) and return `base`.
+    """
+    for key, value in extra.items():
+        current = base.get(key)
+        if _is_empty(current):
+            if not _is_empty(value) or key not in base:
+                base[key] = copy.deepcopy(value)
+        elif isinstance(current, dict) and isinstance(value, dict):
+            merge_into(current, value)
+        elif isinstance(current, list) and isinstance(value, list):
+            _merge_lists(current, value)
+    return base
+
+
+def merge_results(results: Sequence[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk JSON results in chunk order into one result.
+    """
+    merged: Dict[str, Any] = {}
+    for result in results:
+        if isinstance(result, dict):
+            merge_into(merged, result)
+    return merged
@@ -0,0 +1,108 @@
+"""
+Image preparation for OCR / vision calls
+----------------------------------------
+
+Screenshots and scans arrive at whatever resolution the device produced. OCR
+engines and vision models gain nothing from pixels beyond a certain size (the
+providers downscale server-side anyway), but we still pay for uploading and
+base64-encoding them. `prepare_image` normalizes an image once before OCR:
+
+- EXIF orientation applied, palette/alpha images flattened to RGB
+- longest side capped at `max_side` (and optionally raised to `min_side`, which
+  helps Tesseract with tiny screenshots)
+- re-encoded as JPEG (photos) or PNG (everything else) only when that is smaller
+  or the image was changed; otherwise the original bytes are kept
+
+`image_sha256` is the cache key for OCR results. Settings-free so the LLM router
+and the captain-portal file processor can both use it. Without Pillow the
+original bytes pass through unchanged.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+import hashlib
+import io
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Anthropic's recommended long edge; larger images are resized server-side anyway.
+VISION_MAX_SIDE = 1568
+# Good Tesseract/Vision accuracy for screenshots and scanned pages.
+OCR_MAX_SIDE = 2000
+OCR_MIN_SIDE = 1000
+
+_MEDIA_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "GIF": "image/gif", "WEBP": "image/webp"}
+
+
+def image_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def prepare_image(
+    data: bytes,
+    *,
+    max_side: int = OCR_MAX_SIDE,
+    min_side: int = 0,
+    jpeg_quality: int = 88,
+) -> Tuple[bytes, str, Dict[str, Any]]:
+    """
+    Return (image_bytes, media_type, info) ready for OCR.
+
+    `info` records the original and final size and whether the image was re-encoded.
+    """
+    if not PIL_AVAILABLE:
+        return data, "application/octet-stream", {"prepared": False}
+    try:
+        img = Image.open(io.BytesIO(data))
+        source_format = img.format or ""
+        original_size = img.size
+        changed = img.getexif().get(0x0112, 1) != 1  # EXIF orientation
+        img = ImageOps.exif_transpose(img)
+
+        long_side = max(img.size)
+        scale = 1.0
+        if long_side > max_side:
+            scale = max_side / long_side
+        elif min_side and long_side < min_side:
+            scale = min_side / long_side
+        if scale != 1.0:
+            img = img.resize(
+                (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                Image.LANCZOS,
+            )
+            changed = True
+
+        if img.mode not in ("RGB", "L"):
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            rgba = img.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            img = background
+            changed = True
+
+        out = io.BytesIO()
+        if source_format == "JPEG":
+            img.save(out, format="JPEG", quality=jpeg_quality, optimize=True)
+            media_type = "image/jpeg"
+        else:
+            img.save(out, format="PNG", optimize=True)
+            media_type = "image/png"
+        encoded = out.getvalue()
+
+        info = {
+            "prepared": True,
+            "original_size": list(original_size),
+            "size": list(img.size),
+            "original_bytes": len(data),
+        }
+        if not changed and len(encoded) >= len(data) and source_format in _MEDIA_TYPES:
+            info["bytes"] = len(data)
+            return data, _MEDIA_TYPES[source_format], info
+        info["bytes"] = len(encoded)
+        return encoded, media_type, info
+    except Exception as e:
+        return data, "application/octet-stream", {"prepared": False, "error": str(e)}
@@ -0,0 +1,207 @@
+"""
+Streaming JSON Parser
+---------------------
+
+Incremental, tolerant parser for JSON produced by an LLM token by token.
+
+- `feed(delta)` scans only the new characters and returns the items of watched
+  arrays (e.g. `venues`, `sub_experiences`, `destinations`) as soon as each item
+  closes, so callers can act on them before the model finishes.
+- `finish()` parses the whole document. Prose or markdown fences around the JSON
+  are ignored, and a truncated response (max_tokens, dropped connection) is
+  repaired by cutting back to the last complete value and closing the open
+  brackets, instead of losing the entire payload. Items of watched arrays are
+  kept whole or dropped, never half-written.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Optional, Tuple
+import json
+
+DEFAULT_WATCHED_SECTIONS: Tuple[str, ...] = ("venues", "sub_experiences", "destinations")
+
+_WHITESPACE = " \t\r\n"
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "expect_key", "section", "watched", "in_item", "item_start")
+
+    def __init__(self, kind: str, section: Optional[str], watched: bool, in_item: bool):
+        self.kind = kind  # "{" or "["
+        self.key: Optional[str] = None  # last key seen (objects)
+        self.expect_key = kind == "{"
+        self.section = section  # key this container is stored under
+        self.watched = watched  # array whose items are emitted
+        self.in_item = in_item  # nested inside an item of a watched array
+        self.item_start: Optional[int] = None
+
+
+class StreamingJSONParser:
+    def __init__(self, watch: Iterable[str] = DEFAULT_WATCHED_SECTIONS):
+        self.watch = frozenset(watch)
+        self.truncated = False
+        self._text = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._root_start: Optional[int] = None
+        self._root_end: Optional[int] = None
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._scalar_start: Optional[int] = None
+        self._safe = 0  # end of the last complete value
+        self._safe_closers = ""  # brackets that close the document at `_safe`
+        self._items: List[Tuple[str, Any]] = []
+
+    @property
+    def complete(self) -> bool:
+        return self._root_end is not None
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk of text; returns (section, item) pairs for every
+        watched array item that closed within it.
+        """
+        if not delta or self._root_end is not None:
+            return []
+        self._text += delta
+        self._scan()
+        items, self._items = self._items, []
+        return items
+
+    def finish(self) -> Optional[Any]:
+        """
+        Parse the document; repairs truncated output (sets `truncated`).
+        Returns None if no JSON object/array could be recovered.
+        """
+        if self._root_start is None:
+            return None
+        if self._root_end is not None:
+            try:
+                return json.loads(self._text[self._root_start:self._root_end])
+            except json.JSONDecodeError:
+                return None
+        candidate = self._text[self._root_start:self._safe] + self._safe_closers
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            return None
+        self.truncated = True
+        return value
+
+    # -- scanning ------------------------------------------------------------
+
+    def _scan(self) -> None:
+        text = self._text
+        i = self._pos
+        n = len(text)
+        while i < n and self._root_end is None:
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._end_string(i)
+            elif self._root_start is None:
+                # Skip prose / markdown fences before the document starts.
+                if c in "{[":
+                    self._root_start = i
+                    self._open(c, i)
+            elif c == '"':
+                self._in_string = True
+                self._string_start = i
+                top = self._stack[-1]
+                if not (top.kind == "{" and top.expect_key):
+                    self._value_start(i)
+            elif c in "{[":
+                self._value_start(i)
+                self._open(c, i)
+            elif c in "}]":
+                self._end_scalar(i)
+                self._stack.pop()
+                if not self._stack:
+                    self._root_end = i + 1
+                    self._safe, self._safe_closers = i + 1, ""
+                else:
+                    self._value_end(i + 1)
+            elif c == ",":
+                self._end_scalar(i)
+                top = self._stack[-1]
+                if top.kind == "{":
+                    top.expect_key = True
+            elif c == ":":
+                self._stack[-1].expect_key = False
+            elif c in _WHITESPACE:
+                self._end_scalar(i)
+            elif self._scalar_start is None:
+                # number / true / false / null
+                self._scalar_start = i
+                self._value_start(i)
+            i += 1
+        self._pos = i
+
+    def _open(self, kind: str, i: int) -> None:
+        if self._stack:
+            parent = self._stack[-1]
+            section = parent.key if parent.kind == "{" else parent.section
+            in_item = parent.in_item or parent.watched
+        else:
+            section, in_item = None, False
+        watched = kind == "[" and not in_item and section in self.watch
+        self._stack.append(_Frame(kind, section, watched, in_item))
+        self._mark_safe(i + 1)
+
+    def _value_start(self, i: int) -> None:
+        top = self._stack[-1]
+        if top.watched and top.item_start is None:
+            top.item_start = i
+
+    def _value_end(self, end: int) -> None:
+        top = self._stack[-1]
+        self._mark_safe(end)
+        if top.watched and top.item_start is not None:
+            raw = self._text[top.item_start:end]
+            top.item_start = None
+            try:
+                self._items.append((top.section or "", json.loads(raw)))
+            except json.JSONDecodeError:
+                pass
+
+    def _end_string(self, i: int) -> None:
+        top = self._stack[-1]
+        if top.kind == "{" and top.expect_key:
+            try:
+                top.key = json.loads(self._text[self._string_start:i + 1])
+            except json.JSONDecodeError:
+                top.key = None
+            return
+        self._value_end(i + 1)
+
+    def _end_scalar(self, i: int) -> None:
+        if self._scalar_start is None:
+            return
+        self._scalar_start = None
+        self._value_end(i)
+
+    def _mark_safe(self, end: int) -> None:
+        # Inside an unfinished watched item: a cut here would keep a half item.
+        if self._stack and self._stack[-1].in_item:
+            return
+        self._safe = end
+        self._safe_closers = "".join("}" if f.kind == "{" else "]" for f in reversed(self._stack))
+
+
+def parse_json_tolerant(text: str) -> Tuple[Optional[Any], bool]:
+    """
+    One-shot tolerant parse of a complete LLM response.
+
+    Returns (value, truncated); value is None if nothing could be recovered.
+    """
+    parser = StreamingJSONParser()
+    parser.feed(text or "")
+    value = parser.finish()
+    return value, parser.truncated
@@ -8,24 +8,153 @@ we automatically fall back to OpenAI (ChatGPT) when configured.
 Design goals:
 - Keep call sites simple
 - Avoid long hangs (short timeouts + small retries)
+- Reuse warm connections (one pooled async client per provider)
+- Never pay twice for the same prompt (content-addressed response cache)
+- Coalesce identical in-flight requests (double-clicks, frontend retries)
+- Skip providers whose circuit breaker is open; optionally hedge slow calls
+- Let interactive calls jump ahead of bulk extraction (priority scheduler)
+- Stream conversational replies token by token (failover before the first token)
+- Record every provider call (tokens, queue wait, latency, retries) for /api/metrics
+- Record/replay provider responses from cassettes for offline benchmarks
+- Map-reduce long inputs over overlapping chunks instead of truncating them
 - Return best-effort results (fallback heuristics if no provider is reachable)
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List
+import contextlib
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
 import asyncio
+import contextvars
+import copy
 import json
 import re
 import time
 import structlog
 
 from config.settings import settings
+from core.llm.breaker import CircuitBreaker
+from core.llm.cache import LLMResponseCache, make_cache_key
+from core.llm.cassette import get_cassette_store
+from core.llm.chunking import merge_results, split_text
+from core.llm.image_prep import VISION_MAX_SIDE, image_sha256, prepare_image
+from core.llm.json_stream import parse_json_tolerant
+from core.llm.scheduler import estimate_tokens, llm_slot, report_usage
+from core.llm.telemetry import LLMCall, record_llm_call, usage_counts
 
 logger = structlog.get_logger()
 
+_PROVIDERS = ("anthropic", "openai")
+
+# Sampling temperatures (OpenAI calls; also part of the cache key)
+_JSON_TEMPERATURE = 0.2
+_TEXT_TEMPERATURE = 0.7
+
+# Longest user text sent in one extraction call; `extract_json_chunked` splits beyond it
+EXTRACT_TEXT_LIMIT = 20000
+_CHUNK_OVERLAP = 1500
+
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def _get_response_cache() -> Optional[LLMResponseCache]:
+    global _response_cache
+    if not settings.llm_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = LLMResponseCache(
+            max_entries=settings.llm_cache_max_entries,
+            ttl_s=settings.llm_cache_ttl_s,
+            disk_path=settings.llm_cache_disk_path,
+            disk_max_entries=settings.llm_cache_disk_max_entries,
+        )
+    return _response_cache
+
+
+def _response_cache_key(*, kind: str, system: str, user_text: str, max_tokens: int, prefer: str) -> str:
+    if prefer == "openai":
+        model = getattr(settings, "openai_text_model", "gpt-4o-mini")
+    else:
+        model = getattr(settings, "anthropic_model", settings.model_name)
+    return make_cache_key(
+        kind=kind,
+        system=system,
+        user_text=user_text,
+        model=model,
+        max_tokens=max_tokens,
+        temperature=_JSON_TEMPERATURE if kind == "json" else _TEXT_TEMPERATURE,
+    )
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters for the response cache.
+    """
+    cache = _get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.snapshot()}
+
+
+# In-flight requests by cache key (single-flight coalescing)
+_inflight: Dict[str, "asyncio.Task[Any]"] = {}
+_inflight_stats: Dict[str, int] = {"leaders": 0, "coalesced": 0}
+
+
+async def _single_flight(key: str, fn, share: bool = True):
+    """
+    Run `fn()` once per key at a time; concurrent callers with the same key await
+    the in-flight result instead of issuing a duplicate provider call.
+
+    The shared task is shielded so a cancelled caller (e.g. a client disconnect)
+    does not cancel the call for everyone else waiting on it.
+
+    With `share=False` (the caller passed `cache=False`) the call neither joins
+    nor offers an in-flight result: the opt-out covers both layers.
+    """
+    if not share:
+        return await fn()
+    task = _inflight.get(key)
+    if task is not None and not task.done():
+        _inflight_stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    task = asyncio.ensure_future(fn())
+    _inflight[key] = task
+    _inflight_stats["leaders"] += 1
+
+    def _forget(t: "asyncio.Task[Any]") -> None:
+        if _inflight.get(key) is t:
+            del _inflight[key]
+
+    task.add_done_callback(_forget)
+    return await asyncio.shield(task)
+
+
+def get_inflight_stats() -> Dict[str, int]:
+    """
+    Single-flight counters: provider calls issued vs duplicates coalesced.
+    """
+    return {**_inflight_stats, "in_flight": len(_inflight)}
+
 
 def _is_transient_provider_error(err: Exception) -> bool:
+    # Prefer structured signals: SDK status codes and network/timeout exception types.
+    status = getattr(err, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(err, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+
+        if isinstance(err, (httpx.TimeoutException, httpx.NetworkError)):
+            return True
+    except ImportError:
+        pass
+
     msg = str(err).lower()
     # Broad but pragmatic: covers DNS/timeout/connection/reset/provider outages.
     transient_markers = [
@@ -57,7 +186,24 @@ def _strip_json_fences(s: str) -> str:
     return t
 
 
-async def _retry_async(fn, attempts: int = 2, base_delay_s: float = 0.6):
+def _parse_json_payload(raw: str) -> Dict[str, Any]:
+    """
+    Parse a provider's JSON answer. Tolerates prose around the object and keeps
+    the complete part of a truncated response; raises JSONDecodeError if nothing
+    usable is found.
+    """
+    try:
+        return json.loads(_strip_json_fences(raw))
+    except json.JSONDecodeError:
+        value, truncated = parse_json_tolerant(raw)
+        if not isinstance(value, dict):
+            raise
+        if truncated:
+            logger.warning("LLM JSON response was truncated; using the recovered part", chars=len(raw or ""))
+        return value
+
+
+async def _retry_async(fn, attempts: int = 2, base_delay_s: float = 0.6, should_retry=None):
     last_err = None
     for i in range(attempts):
         try:
@@ -68,49 +214,353 @@ async def _retry_async(fn, attempts: int = 2, base_delay_s: float = 0.6):
                 break
             if not _is_transient_provider_error(e):
                 break
+            if should_retry is not None and not should_retry():
+                break
             await asyncio.sleep(base_delay_s * (2 ** i))
     raise last_err  # type: ignore
 
 
+# ---------------------------------------------------------------------------
+# Failover (circuit breaker + optional hedging)
+# ---------------------------------------------------------------------------
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_hedge_stats: Dict[str, int] = {"hedged": 0, "hedge_wins": 0}
+
+
+def _get_breaker(provider: str) -> CircuitBreaker:
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            provider,
+            window_s=settings.llm_breaker_window_s,
+            min_requests=settings.llm_breaker_min_requests,
+            error_rate=settings.llm_breaker_error_rate,
+            open_s=settings.llm_breaker_open_s,
+            slow_call_s={
+                "interactive": settings.llm_breaker_slow_interactive_s,
+                "extraction": settings.llm_breaker_slow_extraction_s,
+                "batch": settings.llm_breaker_slow_batch_s,
+            },
+            slow_rate=settings.llm_breaker_slow_rate,
+        )
+        _breakers[provider] = breaker
+    return breaker
+
+
+def _provider_configured(provider: str) -> bool:
+    if get_cassette_store().replaying:
+        return provider in _PROVIDERS
+    if provider == "anthropic":
+        return bool(settings.anthropic_api_key)
+    if provider == "openai":
+        return bool(settings.openai_api_key)
+    return False
+
+
+def _provider_order(prefer: str) -> List[str]:
+    """
+    Configured providers in preference order, skipping any whose circuit is open.
+    If every configured provider is tripped, try them all anyway (best effort).
+    """
+    configured = [p for p in (prefer, "openai" if prefer != "openai" else "anthropic") if _provider_configured(p)]
+    healthy = [p for p in configured if _get_breaker(p).allow()]
+    return healthy or configured
+
+
+async def _observed_call(provider: str, fn, latency_class: str) -> Any:
+    """
+    Run one provider call and feed the outcome into that provider's breaker.
+
+    The latency sample is provider time only (what the call helpers report via
+    `_note_response`, measured after the scheduler slot was acquired), so a
+    backed-up queue does not look like a slow provider.
+    """
+    breaker = _get_breaker(provider)
+    call = _current_call.get()
+    before = call.latency_s if call is not None else 0.0
+    started = time.monotonic()
+
+    def provider_time() -> float:
+        return call.latency_s - before if call is not None else time.monotonic() - started
+
+    try:
+        result = await fn()
+    except json.JSONDecodeError:
+        # The provider answered; the payload was just not valid JSON.
+        breaker.record_success(provider_time(), latency_class)
+        raise
+    except Exception as e:
+        if _is_transient_provider_error(e):
+            breaker.record_failure(latency_class)
+        raise
+    breaker.record_success(provider_time(), latency_class)
+    return result
+
+
+# Telemetry record of the provider attempt running in this context; filled in by
+# the provider call helpers (model, tokens, queue wait, latency).
+_current_call: "contextvars.ContextVar[Optional[LLMCall]]" = contextvars.ContextVar("llm_current_call", default=None)
+
+
+async def _attempt(provider: str, fn, *, caller: str, latency_class: str, fallback: bool = False) -> Any:
+    # Stop retrying as soon as the provider's circuit opens.
+    breaker = _get_breaker(provider)
+    call = LLMCall(caller=caller, provider=provider, fallback=fallback)
+    token = _current_call.set(call)
+    tries = 0
+
+    async def once():
+        nonlocal tries
+        tries += 1
+        return await _observed_call(provider, fn, latency_class)
+
+    try:
+        return await _retry_async(once, should_retry=breaker.allow)
+    except json.JSONDecodeError:
+        call.parse_failure = True
+        raise
+    except asyncio.CancelledError:
+        call.outcome = "cancelled"
+        raise
+    except Exception:
+        call.outcome = "error"
+        raise
+    finally:
+        call.retries = max(0, tries - 1)
+        _current_call.reset(token)
+        record_llm_call(call)
+
+
+def _note_response(*, model: str, usage: Any, queue_wait_s: float, latency_s: float) -> None:
+    call = _current_call.get()
+    if call is None:
+        return
+    call.model = model
+    call.add_usage(usage)
+    call.queue_wait_s += queue_wait_s
+    call.latency_s += latency_s
+
+
+def _hedge_delay(provider: str, latency_class: str) -> Optional[float]:
+    """
+    Seconds to wait on `provider` before firing a hedged request, or None when
+    hedging is disabled or there is not enough latency history for this class yet.
+    """
+    if not settings.llm_hedge_enabled:
+        return None
+    breaker = _get_breaker(provider)
+    if breaker.latency_samples(latency_class) < settings.llm_hedge_min_samples:
+        return None
+    p95 = breaker.latency_percentile(0.95, latency_class)
+    if p95 is None:
+        return None
+    return max(settings.llm_hedge_min_delay_s, p95)
+
+
+async def _hedged_call(
+    primary: str, fallback: str, calls: Dict[str, Any], delay_s: float, label: str, caller: str, latency_class: str
+) -> Any:
+    """
+    Start `primary`; if it has not finished after `delay_s` (its observed p95),
+    also start `fallback` and return whichever succeeds first.
+    """
+    primary_task = asyncio.ensure_future(_attempt(primary, calls[primary], caller=caller, latency_class=latency_class))
+    done, _ = await asyncio.wait({primary_task}, timeout=delay_s)
+    if done:
+        err = primary_task.exception()
+        if err is None:
+            return primary_task.result()
+        logger.warning(f"{primary} {label} failed; trying fallback", error=str(err))
+        return await _attempt(fallback, calls[fallback], caller=caller, latency_class=latency_class, fallback=True)
+
+    _hedge_stats["hedged"] += 1
+    logger.info("LLM primary slower than p95; sending hedged request", primary=primary, fallback=fallback, delay_s=round(delay_s, 2))
+    hedge_task = asyncio.ensure_future(_attempt(fallback, calls[fallback], caller=caller, latency_class=latency_class, fallback=True))
+    tasks = {primary_task: primary, hedge_task: fallback}
+    pending = set(tasks)
+    last_error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                err = task.exception()
+                if err is None:
+                    if tasks[task] == fallback:
+                        _hedge_stats["hedge_wins"] += 1
+                    return task.result()
+                last_error = err
+                logger.warning(f"{tasks[task]} {label} failed during hedged request", error=str(err))
+    finally:
+        for task in pending:
+            task.cancel()
+    raise last_error  # type: ignore
+
+
+async def _call_with_failover(*, label: str, prefer: str, calls: Dict[str, Any], caller: str, priority: str) -> Any:
+    """
+    Call providers in health-aware preference order and return the first success.
+    `priority` is the latency class: hedging compares against that class' p95.
+
+    Raises the last provider error (or RuntimeError if none is configured).
+    """
+    order = _provider_order(prefer)
+    if not order:
+        raise RuntimeError("No LLM provider configured")
+
+    if len(order) > 1:
+        delay_s = _hedge_delay(order[0], priority)
+        if delay_s is not None:
+            return await _hedged_call(order[0], order[1], calls, delay_s, label, caller, priority)
+
+    last_error: Optional[Exception] = None
+    for provider in order:
+        try:
+            return await _attempt(
+                provider, calls[provider], caller=caller, latency_class=priority, fallback=provider != order[0]
+            )
+        except Exception as e:
+            last_error = e
+            logger.warning(f"{provider} {label} failed; trying fallback if available", error=str(e))
+    raise last_error  # type: ignore
+
+
+def has_llm_provider() -> bool:
+    """
+    True if any provider can be called (an API key is set, or cassettes are replayed).
+    """
+    return any(_provider_configured(p) for p in _PROVIDERS)
+
+
+def get_provider_health() -> Dict[str, Any]:
+    """
+    Circuit state, rolling error rate and p95 latency per provider, plus hedge
+    and cassette (record/replay) counters.
+    """
+    return {
+        "providers": {p: _get_breaker(p).snapshot() for p in _PROVIDERS if _provider_configured(p)},
+        "hedging": {"enabled": bool(settings.llm_hedge_enabled), **_hedge_stats},
+        "cassettes": get_cassette_store().snapshot(),
+    }
+
+
 async def extract_json(
     *,
     system: str,
     user_text: str,
     max_tokens: int = 2500,
     prefer: str = "anthropic",
+    cache: bool = True,
+    priority: str = "extraction",
+    caller: str = "extract_json",
 ) -> Dict[str, Any]:
     """
     Extract JSON from a provider with automatic failover.
+
+    Successful provider responses are cached by content hash; pass `cache=False`
+    to force a fresh call. Identical concurrent requests share one provider call
+    (also skipped with `cache=False`).
+    `caller` tags the call in telemetry (pipeline stage, e.g. "intake:extract").
     """
-    user_text = (user_text or "")[:20000]
-    providers = [prefer, "openai" if prefer != "openai" else "anthropic"]
+    user_text = (user_text or "")[:EXTRACT_TEXT_LIMIT]
+    cache_key = _response_cache_key(kind="json", system=system, user_text=user_text, max_tokens=max_tokens, prefer=prefer)
 
-    last_error: Optional[Exception] = None
-    for provider in providers:
-        if provider == "anthropic" and settings.anthropic_api_key:
-            try:
-                return await _retry_async(lambda: _anthropic_json(system=system, user_text=user_text, max_tokens=max_tokens))
-            except Exception as e:
-                last_error = e
-                logger.warning("Anthropic failed; trying fallback if available", error=str(e))
-                continue
-        if provider == "openai" and settings.openai_api_key:
-            try:
-                return await _retry_async(lambda: _openai_json(system=system, user_text=user_text, max_tokens=max_tokens))
-            except Exception as e:
-                last_error = e
-                logger.warning("OpenAI failed; trying fallback if available", error=str(e))
-                continue
+    response_cache = _get_response_cache() if cache else None
+    if response_cache is not None:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-    # Final fallback: return a conservative chunk-only payload
-    logger.error("All LLM providers failed; returning fallback JSON", error=str(last_error) if last_error else None)
-    return {
-        "entities": {"pois": [], "destinations": []},
-        "relations": [],
-        "knowledge": [],
-        "chunks": [{"chunk": user_text[:4000], "purpose": "rag"}],
-        "notes": ["All LLM providers unreachable; used fallback extraction."],
-    }
+    result = await _single_flight(
+        cache_key,
+        lambda: _extract_json_with_failover(
+            system=system,
+            user_text=user_text,
+            max_tokens=max_tokens,
+            prefer=prefer,
+            priority=priority,
+            caller=caller,
+            response_cache=response_cache,
+            cache_key=cache_key,
+        ),
+        share=cache,
+    )
+    return copy.deepcopy(result)
+
+
+async def extract_json_chunked(
+    *,
+    system: str,
+    user_text: str,
+    max_tokens: int = 2500,
+    prefer: str = "anthropic",
+    cache: bool = True,
+    priority: str = "extraction",
+    caller: str = "extract_json",
+    chunk_chars: int = EXTRACT_TEXT_LIMIT,
+    overlap: int = _CHUNK_OVERLAP,
+) -> Dict[str, Any]:
+    """
+    `extract_json` for inputs longer than one call can take.
+
+    The text is split on page/section boundaries into overlapping chunks, each
+    chunk is extracted concurrently (the scheduler still caps provider
+    concurrency), and the results are merged in chunk order with duplicate list
+    items folded together. Short inputs take the plain single-call path.
+    """
+    chunks = split_text(user_text or "", chunk_chars, overlap)
+    if len(chunks) <= 1:
+        return await extract_json(
+            system=system, user_text=user_text, max_tokens=max_tokens,
+            prefer=prefer, cache=cache, priority=priority, caller=caller,
+        )
+
+    logger.info("Chunked JSON extraction", caller=caller, chunks=len(chunks), chars=len(user_text))
+    results = await asyncio.gather(*[
+        extract_json(
+            system=system, user_text=chunk, max_tokens=max_tokens,
+            prefer=prefer, cache=cache, priority=priority, caller=caller,
+        )
+        for chunk in chunks
+    ])
+    return merge_results(results)
+
+
+async def _extract_json_with_failover(
+    *,
+    system: str,
+    user_text: str,
+    max_tokens: int,
+    prefer: str,
+    priority: str,
+    caller: str,
+    response_cache: Optional[LLMResponseCache],
+    cache_key: str,
+) -> Dict[str, Any]:
+    try:
+        result = await _call_with_failover(
+            label="JSON extraction",
+            prefer=prefer,
+            caller=caller,
+            priority=priority,
+            calls={
+                "anthropic": lambda: _anthropic_json(system=system, user_text=user_text, max_tokens=max_tokens, priority=priority),
+                "openai": lambda: _openai_json(system=system, user_text=user_text, max_tokens=max_tokens, priority=priority),
+            },
+        )
+        if response_cache is not None:
+            await response_cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        # Final fallback: return a conservative chunk-only payload
+        logger.error("All LLM providers failed; returning fallback JSON", error=str(e))
+        return {
+            "entities": {"pois": [], "destinations": []},
+            "relations": [],
+            "knowledge": [],
+            "chunks": [{"chunk": user_text[:4000], "purpose": "rag"}],
+            "notes": ["All LLM providers unreachable; used fallback extraction."],
+        }
 
 
 async def ocr_and_extract_json(
@@ -120,41 +570,93 @@ async def ocr_and_extract_json(
     max_tokens: int = 2500,
     prefer: str = "anthropic",
     media_type: str = "image/png",
+    cache: bool = True,
+    priority: str = "extraction",
+    caller: str = "ocr",
 ) -> Dict[str, Any]:
     """
     OCR + extraction from an image with failover.
 
+    The image is downscaled/re-encoded for vision first (`core.llm.image_prep`)
+    and successful results are cached by image hash; pass `cache=False` to force
+    a fresh call.
+
     Note: OpenAI vision is optional. If not configured, we return a pending-style payload.
     """
-    providers = [prefer, "openai" if prefer != "openai" else "anthropic"]
+    prepared, prepared_type, info = await asyncio.to_thread(prepare_image, image_bytes, max_side=VISION_MAX_SIDE)
+    if info.get("prepared"):
+        image_bytes, media_type = prepared, prepared_type
+        if info.get("bytes") != info.get("original_bytes"):
+            logger.info("Vision image prepared", caller=caller, **{k: info[k] for k in ("original_size", "size", "original_bytes", "bytes")})
 
-    last_error: Optional[Exception] = None
-    for provider in providers:
-        if provider == "anthropic" and settings.anthropic_api_key:
-            try:
-                return await _retry_async(lambda: _anthropic_vision_json(system=system, image_bytes=image_bytes, max_tokens=max_tokens, media_type=media_type))
-            except Exception as e:
-                last_error = e
-                logger.warning("Anthropic vision failed; trying fallback if available", error=str(e))
-                continue
-        if provider == "openai" and settings.openai_api_key:
-            try:
-                return await _retry_async(lambda: _openai_vision_json(system=system, image_bytes=image_bytes, max_tokens=max_tokens, media_type=media_type))
-            except Exception as e:
-                last_error = e
-                logger.warning("OpenAI vision failed; trying fallback if available", error=str(e))
-                continue
+    cache_key = _response_cache_key(
+        kind="vision", system=system, user_text=image_sha256(image_bytes), max_tokens=max_tokens, prefer=prefer
+    )
+    response_cache = _get_response_cache() if cache else None
+    if response_cache is not None:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-    logger.error("All vision providers failed; returning pending OCR payload", error=str(last_error) if last_error else None)
-    return {
-        "ocr_text": "",
-        "entities": {"pois": [], "destinations": []},
-        "relations": [],
-        "knowledge": [],
-        "chunks": [],
-        "notes": ["OCR pending: all providers unreachable. Keep the raw image and retry later."],
-        "status": "pending_ocr",
-    }
+    result = await _single_flight(
+        cache_key,
+        lambda: _ocr_with_failover(
+            system=system,
+            image_bytes=image_bytes,
+            max_tokens=max_tokens,
+            prefer=prefer,
+            media_type=media_type,
+            priority=priority,
+            caller=caller,
+            response_cache=response_cache,
+            cache_key=cache_key,
+        ),
+        share=cache,
+    )
+    return copy.deepcopy(result)
+
+
+async def _ocr_with_failover(
+    *,
+    system: str,
+    image_bytes: bytes,
+    max_tokens: int,
+    prefer: str,
+    media_type: str,
+    priority: str,
+    caller: str,
+    response_cache: Optional[LLMResponseCache],
+    cache_key: str,
+) -> Dict[str, Any]:
+    try:
+        result = await _call_with_failover(
+            label="vision",
+            prefer=prefer,
+            caller=caller,
+            priority=priority,
+            calls={
+                "anthropic": lambda: _anthropic_vision_json(
+                    system=system, image_bytes=image_bytes, max_tokens=max_tokens, media_type=media_type, priority=priority
+                ),
+                "openai": lambda: _openai_vision_json(
+                    system=system, image_bytes=image_bytes, max_tokens=max_tokens, media_type=media_type, priority=priority
+                ),
+            },
+        )
+        if response_cache is not None:
+            await response_cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        logger.error("All vision providers failed; returning pending OCR payload", error=str(e))
+        return {
+            "ocr_text": "",
+            "entities": {"pois": [], "destinations": []},
+            "relations": [],
+            "knowledge": [],
+            "chunks": [],
+            "notes": ["OCR pending: all providers unreachable. Keep the raw image and retry later."],
+            "status": "pending_ocr",
+        }
 
 
 async def generate_text(
@@ -163,175 +665,612 @@ async def generate_text(
     user_text: str,
     max_tokens: int = 800,
     prefer: str = "anthropic",
+    cache: bool = True,
+    priority: str = "interactive",
+    caller: str = "generate_text",
 ) -> str:
     """
     Generate plain text (non-JSON) with failover.
+
+    Successful provider responses are cached by content hash; pass `cache=False`
+    to force a fresh call. Identical concurrent requests share one provider call
+    (also skipped with `cache=False`).
+    """
+    user_text = (user_text or "")[:12000]
+    cache_key = _response_cache_key(kind="text", system=system, user_text=user_text, max_tokens=max_tokens, prefer=prefer)
+
+    response_cache = _get_response_cache() if cache else None
+    if response_cache is not None:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    return await _single_flight(
+        cache_key,
+        lambda: _generate_text_with_failover(
+            system=system,
+            user_text=user_text,
+            max_tokens=max_tokens,
+            prefer=prefer,
+            priority=priority,
+            caller=caller,
+            response_cache=response_cache,
+            cache_key=cache_key,
+        ),
+        share=cache,
+    )
+
+
+async def _generate_text_with_failover(
+    *,
+    system: str,
+    user_text: str,
+    max_tokens: int,
+    prefer: str,
+    priority: str,
+    caller: str,
+    response_cache: Optional[LLMResponseCache],
+    cache_key: str,
+) -> str:
+    try:
+        result = await _call_with_failover(
+            label="text generation",
+            prefer=prefer,
+            caller=caller,
+            priority=priority,
+            calls={
+                "anthropic": lambda: _anthropic_text(system=system, user_text=user_text, max_tokens=max_tokens, priority=priority),
+                "openai": lambda: _openai_text(system=system, user_text=user_text, max_tokens=max_tokens, priority=priority),
+            },
+        )
+        if response_cache is not None and result:
+            await response_cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        logger.error("All LLM providers failed; returning user_text as fallback", error=str(e))
+        return user_text
+
+
+async def stream_text(
+    *,
+    system: str,
+    user_text: str,
+    max_tokens: int = 800,
+    prefer: str = "anthropic",
+    cache: bool = True,
+    priority: str = "interactive",
+    caller: str = "stream_text",
+) -> AsyncIterator[str]:
+    """
+    Stream plain text deltas as the provider produces them.
+
+    Failover happens only before the first token: once text has been yielded a
+    provider error is re-raised (the caller already showed part of the answer).
+    A cache hit (shared with `generate_text`) is yielded as a single chunk.
+
+    Raises RuntimeError if no provider could start a stream.
     """
     user_text = (user_text or "")[:12000]
-    providers = [prefer, "openai" if prefer != "openai" else "anthropic"]
+    cache_key = _response_cache_key(kind="text", system=system, user_text=user_text, max_tokens=max_tokens, prefer=prefer)
+
+    response_cache = _get_response_cache() if cache else None
+    if response_cache is not None:
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
 
+    streams = {
+        "anthropic": lambda call: _anthropic_text_stream(
+            system=system, user_text=user_text, max_tokens=max_tokens, priority=priority, call=call
+        ),
+        "openai": lambda call: _openai_text_stream(
+            system=system, user_text=user_text, max_tokens=max_tokens, priority=priority, call=call
+        ),
+    }
+    order = _provider_order(prefer)
     last_error: Optional[Exception] = None
-    for provider in providers:
-        if provider == "anthropic" and settings.anthropic_api_key:
-            try:
-                return await _retry_async(lambda: _anthropic_text(system=system, user_text=user_text, max_tokens=max_tokens))
-            except Exception as e:
-                last_error = e
-                logger.warning("Anthropic text generation failed; trying fallback if available", error=str(e))
-                continue
-        if provider == "openai" and settings.openai_api_key:
-            try:
-                return await _retry_async(lambda: _openai_text(system=system, user_text=user_text, max_tokens=max_tokens))
-            except Exception as e:
-                last_error = e
-                logger.warning("OpenAI text generation failed; trying fallback if available", error=str(e))
-                continue
+    for provider in order:
+        breaker = _get_breaker(provider)
+        call = LLMCall(caller=caller, provider=provider, fallback=provider != order[0])
+        parts: List[str] = []
+        stream = streams[provider](call)
+        try:
+            async for delta in stream:
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            call.outcome = "error"
+            if _is_transient_provider_error(e):
+                breaker.record_failure(priority)
+            if parts:
+                logger.warning(f"{provider} text stream failed mid-response", error=str(e))
+                raise
+            last_error = e
+            logger.warning(f"{provider} text stream failed; trying fallback if available", error=str(e))
+            continue
+        except BaseException:
+            # Consumer went away (client disconnect) or the task was cancelled.
+            call.outcome = "cancelled"
+            raise
+        finally:
+            # Close the provider stream now (not whenever it is garbage collected): this
+            # ends the HTTP response and releases its llm_slot when the consumer stops early.
+            await stream.aclose()
+            record_llm_call(call)
 
-    logger.error("All LLM providers failed; returning user_text as fallback", error=str(last_error) if last_error else None)
-    return user_text
+        # Provider time only (no queue wait, no time the consumer spent on each delta)
+        breaker.record_success(call.latency_s, priority)
+        text = "".join(parts).strip()
+        if response_cache is not None and text:
+            await response_cache.set(cache_key, text)
+        return
 
+    raise RuntimeError(f"No LLM provider could start a text stream: {last_error}")
 
-async def _anthropic_json(*, system: str, user_text: str, max_tokens: int) -> Dict[str, Any]:
-    from anthropic import Anthropic
 
-    def _call() -> str:
-        client = Anthropic(api_key=settings.anthropic_api_key)
-        msg = client.messages.create(
-            model=getattr(settings, "anthropic_model", settings.model_name),
-            max_tokens=max_tokens,
-            system=system,
-            messages=[{"role": "user", "content": user_text}],
+# ---------------------------------------------------------------------------
+# Provider clients
+# ---------------------------------------------------------------------------
+#
+# One long-lived async client per provider, each backed by its own pooled
+# httpx.AsyncClient (keep-alive connections are reused across calls). Clients are
+# created lazily on first use and bound to the running event loop.
+
+_clients: Dict[str, Any] = {}
+_clients_loop: Optional[asyncio.AbstractEventLoop] = None
+_clients_guard: Any = None  # async generator that closes the clients when their loop shuts down
+_pool_stats: Dict[str, Dict[str, Any]] = {
+    p: {"in_flight": 0, "peak_in_flight": 0, "requests": 0, "saturated": 0} for p in _PROVIDERS
+}
+
+
+def _http_client():
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry_s,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=settings.llm_request_timeout_s)
+
+
+def _get_client(provider: str):
+    """
+    Return the shared async client for a provider (created on first use).
+    """
+    global _clients, _clients_loop, _clients_guard
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        # Connections cannot be shared across event loops (e.g. scripts calling asyncio.run twice).
+        _retire_clients(_clients_loop, _clients)
+        _clients, _clients_loop = {}, loop
+        _clients_guard = _clients_lifetime(_clients)
+        loop.create_task(_clients_guard.__anext__())  # runs it up to its `yield`
+
+    client = _clients.get(provider)
+    if client is not None:
+        return client
+
+    if provider == "anthropic":
+        from anthropic import AsyncAnthropic
+
+        client = AsyncAnthropic(api_key=settings.anthropic_api_key, http_client=_http_client())
+    elif provider == "openai":
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=_http_client())
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+    _clients[provider] = client
+    return client
+
+
+async def _close_clients(clients: Dict[str, Any]) -> None:
+    for provider, client in list(clients.items()):
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning("Failed to close LLM client", provider=provider, error=str(e))
+    clients.clear()
+
+
+async def _clients_lifetime(clients: Dict[str, Any]):
+    """
+    Stays suspended for the life of the event loop the clients were created on.
+    asyncio.run() finalizes pending async generators before closing its loop, so
+    the clients' connections are closed on their own loop while it still runs.
+    """
+    global _clients_loop
+    try:
+        yield
+    finally:
+        await _close_clients(clients)
+        if _clients is clients:
+            _clients_loop = None
+
+
+def _retire_clients(old_loop: Optional[asyncio.AbstractEventLoop], clients: Dict[str, Any]) -> None:
+    """Close clients left behind by a previous event loop instead of dropping them."""
+    if not clients:
+        return
+    if old_loop is not None and old_loop.is_running():
+        # Still serving in another thread: close them there
+        asyncio.run_coroutine_threadsafe(_close_clients(clients), old_loop)
+    else:
+        # Stopped without finalizing its async generators (not asyncio.run): best effort here
+        asyncio.get_running_loop().create_task(_close_clients(clients))
+
+
+async def aclose_clients() -> None:
+    """
+    Close pooled provider connections (call on application shutdown).
+    """
+    global _clients, _clients_loop
+    clients, _clients, _clients_loop = _clients, {}, None
+    await _close_clients(clients)
+
+
+@asynccontextmanager
+async def _pool_slot(provider: str):
+    """
+    Track in-flight requests per provider so pool saturation is observable.
+    """
+    stats = _pool_stats[provider]
+    stats["in_flight"] += 1
+    stats["requests"] += 1
+    stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+    if stats["in_flight"] > settings.llm_max_connections:
+        stats["saturated"] += 1
+        logger.warning(
+            "LLM connection pool saturated; request is waiting for a free connection",
+            provider=provider,
+            in_flight=stats["in_flight"],
+            max_connections=settings.llm_max_connections,
         )
-        parts: List[str] = []
-        for block in getattr(msg, "content", []) or []:
-            if getattr(block, "type", None) == "text":
-                parts.append(getattr(block, "text", ""))
-        return ("\n".join([p for p in parts if p]).strip()) or ""
+    try:
+        yield
+    finally:
+        stats["in_flight"] -= 1
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshot of connection pool usage per provider.
+
+    `saturation` is in-flight requests / max connections; values above 1.0 mean
+    requests are queueing for a connection.
+    """
+    max_conn = max(1, int(settings.llm_max_connections))
+    return {
+        provider: {
+            **stats,
+            "max_connections": max_conn,
+            "saturation": round(stats["in_flight"] / max_conn, 3),
+            "client_open": provider in _clients,
+        }
+        for provider, stats in _pool_stats.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Provider calls
+# ---------------------------------------------------------------------------
+
+def _anthropic_message_text(msg) -> str:
+    parts: List[str] = []
+    for block in getattr(msg, "content", []) or []:
+        if getattr(block, "type", None) == "text":
+            parts.append(getattr(block, "text", ""))
+    return ("\n".join([p for p in parts if p]).strip()) or ""
+
+
+def _estimate_call_tokens(system: str, content: Any, max_tokens: int) -> int:
+    chars = len(system or "")
+    if isinstance(content, str):
+        chars += len(content)
+    elif isinstance(content, list):
+        for part in content:
+            if not isinstance(part, dict):
+                continue
+            if part.get("type") == "text":
+                chars += len(part.get("text") or "")
+            elif part.get("type") in ("image", "image_url"):
+                chars += 1600 * 4  # roughly what providers bill for one image
+    return estimate_tokens(chars, max_tokens)
+
+
+async def _anthropic_complete(*, system: str, content: Any, max_tokens: int, priority: str) -> str:
+    model = getattr(settings, "anthropic_model", settings.model_name)
+    tokens = _estimate_call_tokens(system, content, max_tokens)
+    cassettes = get_cassette_store()
+    request = {"provider": "anthropic", "model": model, "system": system, "content": content, "max_tokens": max_tokens}
+    async with llm_slot("anthropic", priority=priority, tokens=tokens, label="router") as waited:
+        started = time.monotonic()
+        if cassettes.replaying:
+            text, usage = await cassettes.replay(request)
+        else:
+            client = _get_client("anthropic")
+            async with _pool_slot("anthropic"):
+                msg = await client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    system=system,
+                    messages=[{"role": "user", "content": content}],
+                )
+            text, usage = _anthropic_message_text(msg), getattr(msg, "usage", None)
+        latency_s = time.monotonic() - started
+        _note_response(model=model, usage=usage, queue_wait_s=waited, latency_s=latency_s)
+    if cassettes.recording:
+        await cassettes.record(request, text=text, usage=usage, latency_s=latency_s)
+    return text
+
+
+async def _openai_complete(
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    max_tokens: int,
+    temperature: float,
+    priority: str,
+    json_mode: bool = False,
+) -> str:
+    kwargs: Dict[str, Any] = {}
+    if json_mode:
+        kwargs["response_format"] = {"type": "json_object"}
+    system = next((m.get("content") for m in messages if m.get("role") == "system"), "")
+    content = next((m.get("content") for m in messages if m.get("role") == "user"), "")
+    tokens = _estimate_call_tokens(system, content, max_tokens)
+    cassettes = get_cassette_store()
+    request = {
+        "provider": "openai",
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "json_mode": json_mode,
+    }
+    async with llm_slot("openai", priority=priority, tokens=tokens, label="router") as waited:
+        started = time.monotonic()
+        if cassettes.replaying:
+            text, usage = await cassettes.replay(request)
+        else:
+            client = _get_client("openai")
+            async with _pool_slot("openai"):
+                resp = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **kwargs,
+                )
+            text, usage = (resp.choices[0].message.content or "").strip(), getattr(resp, "usage", None)
+        latency_s = time.monotonic() - started
+        _note_response(model=model, usage=usage, queue_wait_s=waited, latency_s=latency_s)
+    if cassettes.recording:
+        await cassettes.record(request, text=text, usage=usage, latency_s=latency_s)
+    return text
+
+
+async def _anthropic_json(*, system: str, user_text: str, max_tokens: int, priority: str) -> Dict[str, Any]:
+    raw = await _anthropic_complete(system=system, content=user_text, max_tokens=max_tokens, priority=priority)
+    return _parse_json_payload(raw)
+
 
-    raw = await asyncio.to_thread(_call)
-    raw = _strip_json_fences(raw)
-    return json.loads(raw)
+async def _anthropic_text(*, system: str, user_text: str, max_tokens: int, priority: str) -> str:
+    return await _anthropic_complete(system=system, content=user_text, max_tokens=max_tokens, priority=priority)
 
 
-async def _anthropic_text(*, system: str, user_text: str, max_tokens: int) -> str:
-    from anthropic import Anthropic
+async def _stream_with_cassette(
+    provider: str, request: Dict[str, Any], call: LLMCall, *, priority: str, tokens: int, live
+) -> AsyncIterator[str]:
+    """
+    Hold a scheduler slot for a whole stream; replay it from cassettes, or run
+    `live()` (the network stream) and record it when recording.
+
+    `call.latency_s` is the time spent waiting on the provider for deltas; the
+    time the consumer holds each delta (e.g. sending it to a client) is excluded.
+    """
+    cassettes = get_cassette_store()
+    parts: List[str] = []
+    async with llm_slot(provider, priority=priority, tokens=tokens, label="router:stream") as waited:
+        call.queue_wait_s = waited
+        provider_s = 0.0
+        mark: Optional[float] = None
+        usage: Dict[str, int] = {}
+        stream = cassettes.replay_stream(request, usage) if cassettes.replaying else live()
+        try:
+            async with contextlib.AsyncExitStack() as stack:
+                if not cassettes.replaying:
+                    await stack.enter_async_context(_pool_slot(provider))
+                mark = time.monotonic()
+                async for text in stream:
+                    provider_s += time.monotonic() - mark  # type: ignore[operator]
+                    mark = None
+                    parts.append(text)
+                    yield text
+                    mark = time.monotonic()
+            if cassettes.replaying:
+                call.add_usage(SimpleNamespace(**usage))
+        finally:
+            if mark is not None:
+                provider_s += time.monotonic() - mark
+            await stream.aclose()
+            call.latency_s = provider_s
+            report_usage(call.input_tokens + call.cache_read_tokens + call.cache_write_tokens + call.output_tokens)
+    if cassettes.recording:
+        usage = {
+            "input_tokens": call.input_tokens,
+            "output_tokens": call.output_tokens,
+            "cache_read_input_tokens": call.cache_read_tokens,
+            "cache_creation_input_tokens": call.cache_write_tokens,
+        }
+        await cassettes.record(request, text="".join(parts).strip(), usage=usage, latency_s=call.latency_s)
 
-    def _call() -> str:
-        client = Anthropic(api_key=settings.anthropic_api_key)
-        msg = client.messages.create(
-            model=getattr(settings, "anthropic_model", settings.model_name),
+
+def _anthropic_text_stream(
+    *, system: str, user_text: str, max_tokens: int, priority: str, call: LLMCall
+) -> AsyncIterator[str]:
+    call.model = getattr(settings, "anthropic_model", settings.model_name)
+    request = {"provider": "anthropic", "model": call.model, "system": system, "content": user_text, "max_tokens": max_tokens}
+
+    async def live() -> AsyncIterator[str]:
+        # Raw event stream (stream=True) works across SDK versions, unlike the
+        # `messages.stream()` helper.
+        events = await _get_client("anthropic").messages.create(
+            model=call.model,
             max_tokens=max_tokens,
             system=system,
             messages=[{"role": "user", "content": user_text}],
+            stream=True,
         )
-        parts: List[str] = []
-        for block in getattr(msg, "content", []) or []:
-            if getattr(block, "type", None) == "text":
-                parts.append(getattr(block, "text", ""))
-        return ("\n".join([p for p in parts if p]).strip()) or ""
+        try:
+            async for event in events:
+                kind = getattr(event, "type", None)
+                if kind == "message_start":
+                    counts = usage_counts(getattr(getattr(event, "message", None), "usage", None))
+                    call.input_tokens = counts["input_tokens"]
+                    call.cache_read_tokens = counts["cache_read_input_tokens"]
+                    call.cache_write_tokens = counts["cache_creation_input_tokens"]
+                elif kind == "message_delta":
+                    usage = getattr(event, "usage", None)
+                    call.output_tokens = int(getattr(usage, "output_tokens", 0) or 0)
+                elif kind == "content_block_delta":
+                    text = getattr(getattr(event, "delta", None), "text", None)
+                    if text:
+                        yield text
+        finally:
+            await events.close()  # drop the HTTP response if the consumer stopped early
 
-    return await asyncio.to_thread(_call)
+    return _stream_with_cassette(
+        "anthropic",
+        request,
+        call,
+        priority=priority,
+        tokens=_estimate_call_tokens(system, user_text, max_tokens),
+        live=live,
+    )
 
 
-async def _anthropic_vision_json(*, system: str, image_bytes: bytes, max_tokens: int, media_type: str) -> Dict[str, Any]:
+async def _anthropic_vision_json(
+    *, system: str, image_bytes: bytes, max_tokens: int, media_type: str, priority: str
+) -> Dict[str, Any]:
     import base64
-    from anthropic import Anthropic
 
-    def _call() -> str:
-        client = Anthropic(api_key=settings.anthropic_api_key)
-        b64 = base64.b64encode(image_bytes).decode("ascii")
-        msg = client.messages.create(
-            model=getattr(settings, "anthropic_model", settings.model_name),
-            max_tokens=max_tokens,
-            system=system,
-            messages=[{
-                "role": "user",
-                "content": [
-                    {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": b64}},
-                    {"type": "text", "text": "Extract the text and travel entities/relations from this screenshot."},
-                ],
-            }],
-        )
-        parts: List[str] = []
-        for block in getattr(msg, "content", []) or []:
-            if getattr(block, "type", None) == "text":
-                parts.append(getattr(block, "text", ""))
-        return ("\n".join([p for p in parts if p]).strip()) or ""
-
-    raw = await asyncio.to_thread(_call)
-    raw = _strip_json_fences(raw)
-    return json.loads(raw)
-
-
-async def _openai_json(*, system: str, user_text: str, max_tokens: int) -> Dict[str, Any]:
-    from openai import OpenAI
-
-    def _call() -> str:
-        client = OpenAI(api_key=settings.openai_api_key)
-        resp = client.chat.completions.create(
-            model=getattr(settings, "openai_text_model", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user_text},
-            ],
-            max_tokens=max_tokens,
-            temperature=0.2,
-            response_format={"type": "json_object"},
-        )
-        return (resp.choices[0].message.content or "").strip()
+    b64 = base64.b64encode(image_bytes).decode("ascii")
+    raw = await _anthropic_complete(
+        system=system,
+        content=[
+            {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": b64}},
+            {"type": "text", "text": "Extract the text and travel entities/relations from this screenshot."},
+        ],
+        max_tokens=max_tokens,
+        priority=priority,
+    )
+    return _parse_json_payload(raw)
 
-    raw = await asyncio.to_thread(_call)
-    raw = _strip_json_fences(raw)
-    return json.loads(raw)
 
+async def _openai_json(*, system: str, user_text: str, max_tokens: int, priority: str) -> Dict[str, Any]:
+    raw = await _openai_complete(
+        model=getattr(settings, "openai_text_model", "gpt-4o-mini"),
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": user_text},
+        ],
+        max_tokens=max_tokens,
+        temperature=_JSON_TEMPERATURE,
+        priority=priority,
+        json_mode=True,
+    )
+    return _parse_json_payload(raw)
 
-async def _openai_text(*, system: str, user_text: str, max_tokens: int) -> str:
-    from openai import OpenAI
 
-    def _call() -> str:
-        client = OpenAI(api_key=settings.openai_api_key)
-        resp = client.chat.completions.create(
-            model=getattr(settings, "openai_text_model", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user_text},
-            ],
-            max_tokens=max_tokens,
-            temperature=0.7,
-        )
-        return (resp.choices[0].message.content or "").strip()
+async def _openai_text(*, system: str, user_text: str, max_tokens: int, priority: str) -> str:
+    return await _openai_complete(
+        model=getattr(settings, "openai_text_model", "gpt-4o-mini"),
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": user_text},
+        ],
+        max_tokens=max_tokens,
+        temperature=_TEXT_TEMPERATURE,
+        priority=priority,
+    )
 
-    return await asyncio.to_thread(_call)
 
+def _openai_text_stream(
+    *, system: str, user_text: str, max_tokens: int, priority: str, call: LLMCall
+) -> AsyncIterator[str]:
+    call.model = getattr(settings, "openai_text_model", "gpt-4o-mini")
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_text},
+    ]
+    # Same request shape as `_openai_complete`, so text recordings are shared.
+    request = {
+        "provider": "openai",
+        "model": call.model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": _TEXT_TEMPERATURE,
+        "json_mode": False,
+    }
 
-async def _openai_vision_json(*, system: str, image_bytes: bytes, max_tokens: int, media_type: str) -> Dict[str, Any]:
-    import base64
-    from openai import OpenAI
-
-    def _call() -> str:
-        client = OpenAI(api_key=settings.openai_api_key)
-        b64 = base64.b64encode(image_bytes).decode("ascii")
-        data_url = f"data:{media_type};base64,{b64}"
-        resp = client.chat.completions.create(
-            model=getattr(settings, "openai_vision_model", getattr(settings, "openai_text_model", "gpt-4o-mini")),
-            messages=[
-                {"role": "system", "content": system},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "Extract the text and travel entities/relations from this screenshot."},
-                        {"type": "image_url", "image_url": {"url": data_url}},
-                    ],
-                },
-            ],
+    async def live() -> AsyncIterator[str]:
+        chunks = await _get_client("openai").chat.completions.create(
+            model=call.model,
+            messages=messages,
             max_tokens=max_tokens,
-            temperature=0.2,
-            response_format={"type": "json_object"},
+            temperature=_TEXT_TEMPERATURE,
+            stream=True,
+            stream_options={"include_usage": True},
         )
-        return (resp.choices[0].message.content or "").strip()
+        try:
+            async for chunk in chunks:
+                if getattr(chunk, "usage", None) is not None:
+                    call.add_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    yield text
+        finally:
+            await chunks.close()  # drop the HTTP response if the consumer stopped early
+
+    return _stream_with_cassette(
+        "openai",
+        request,
+        call,
+        priority=priority,
+        tokens=_estimate_call_tokens(system, user_text, max_tokens),
+        live=live,
+    )
 
-    raw = await asyncio.to_thread(_call)
-    raw = _strip_json_fences(raw)
-    return json.loads(raw)
 
+async def _openai_vision_json(
+    *, system: str, image_bytes: bytes, max_tokens: int, media_type: str, priority: str
+) -> Dict[str, Any]:
+    import base64
 
+    b64 = base64.b64encode(image_bytes).decode("ascii")
+    data_url = f"data:{media_type};base64,{b64}"
+    raw = await _openai_complete(
+        model=getattr(settings, "openai_vision_model", getattr(settings, "openai_text_model", "gpt-4o-mini")),
+        messages=[
+            {"role": "system", "content": system},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Extract the text and travel entities/relations from this screenshot."},
+                    {"type": "image_url", "image_url": {"url": data_url}},
+                ],
+            },
+        ],
+        max_tokens=max_tokens,
+        temperature=_JSON_TEMPERATURE,
+        priority=priority,
+        json_mode=True,
+    )
+    return _parse_json_payload(raw)
@@ -0,0 +1,344 @@
+"""
+LLM Scheduler
+-------------
+
+Interactive traffic (LEXA conversations) shares provider quota with bulk work
+(captain uploads, company-brain synthesis, intake drafts). Without coordination a
+batch of uploads can starve live chats.
+
+Every provider call acquires a slot from the provider's scheduler first:
+- priority classes: interactive > extraction > batch (strict, FIFO within a class)
+- concurrency cap per provider, with a few slots reserved for interactive calls
+- token-per-minute and request-per-minute budgets (token buckets); a call is
+  charged its estimate on admission and settled against the usage the provider
+  reported (`report_usage`) when its slot is released
+
+Used by the LLM router and by the captain-portal agents that call Anthropic
+directly, so configuration comes from environment variables (0 = unlimited):
+
+    LLM_MAX_CONCURRENT            concurrent calls per provider (default 16)
+    LLM_INTERACTIVE_RESERVED      slots only interactive calls may use (default 2)
+    LLM_BACKGROUND_MAX_CONCURRENT cap on concurrent extraction/batch calls per
+                                  provider, e.g. captain uploads (default: all
+                                  non-reserved slots)
+    LLM_RPM_ANTHROPIC / LLM_TPM_ANTHROPIC
+    LLM_RPM_OPENAI    / LLM_TPM_OPENAI
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+PRIORITIES: Dict[str, int] = {"interactive": 0, "extraction": 1, "batch": 2}
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def estimate_tokens(text_chars: int, max_tokens: int) -> int:
+    """
+    Rough token cost of a call: ~4 characters per input token plus the output budget.
+    """
+    return max(1, int(text_chars) // 4) + max(0, int(max_tokens))
+
+
+class _TokenBucket:
+    """Refills `per_minute` units evenly over 60 seconds. per_minute <= 0 means unlimited."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float) -> float:
+        """Charge `amount` (capped at capacity); returns what was charged."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        charged = min(amount, self.capacity)
+        self.level -= charged
+        return charged
+
+    def adjust(self, amount: float) -> None:
+        """Give back (positive) or charge extra (negative) units after the fact."""
+        if self.unlimited:
+            return
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    label: str = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: "asyncio.Future[None]" = field(compare=False)
+    charged: float = field(default=0.0, compare=False)
+    admitted_at: float = field(default=0.0, compare=False)
+
+
+class ProviderScheduler:
+    def __init__(
+        self,
+        provider: str,
+        *,
+        max_concurrent: int,
+        interactive_reserved: int,
+        rpm: float,
+        tpm: float,
+        background_max: int = 0,
+    ):
+        self.provider = provider
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.interactive_reserved = max(0, min(int(interactive_reserved), self.max_concurrent - 1))
+        shared = self.max_concurrent - self.interactive_reserved
+        self.background_max = min(shared, int(background_max)) if int(background_max) > 0 else shared
+        self._requests = _TokenBucket(rpm)
+        self._tokens = _TokenBucket(tpm)
+        self._heap: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.in_flight = 0
+        self.in_flight_by_priority: Dict[str, int] = {p: 0 for p in PRIORITIES}
+        self.stats: Dict[str, Dict[str, float]] = {
+            p: {"admitted": 0, "queued": 0, "wait_s_total": 0.0, "wait_s_max": 0.0} for p in PRIORITIES
+        }
+
+    def _slot_free(self, priority: int) -> bool:
+        if priority == PRIORITIES["interactive"]:
+            return self.in_flight < self.max_concurrent
+        background = self.in_flight - self.in_flight_by_priority["interactive"]
+        return self.in_flight < self.max_concurrent - self.interactive_reserved and background < self.background_max
+
+    def _budget_wait(self, tokens: int) -> float:
+        return max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+
+    def _admit(self, waiter: _Waiter) -> None:
+        name = _priority_name(waiter.priority)
+        self._requests.take(1)
+        waiter.charged = self._tokens.take(waiter.tokens)
+        self.in_flight += 1
+        self.in_flight_by_priority[name] += 1
+        waiter.admitted_at = time.monotonic()
+        waited = waiter.admitted_at - waiter.enqueued_at
+        stats = self.stats[name]
+        stats["admitted"] += 1
+        stats["wait_s_total"] += waited
+        stats["wait_s_max"] = max(stats["wait_s_max"], waited)
+        if not waiter.future.done():
+            waiter.future.set_result(None)
+
+    def _dispatch(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._heap:
+            head = self._heap[0]
+            if head.future.done():  # cancelled while queued
+                heapq.heappop(self._heap)
+                continue
+            if not self._slot_free(head.priority):
+                return  # a release() will dispatch again
+            wait_s = self._budget_wait(head.tokens)
+            if wait_s > 0:
+                loop = asyncio.get_running_loop()
+                self._wakeup = loop.call_later(wait_s, self._dispatch)
+                return
+            heapq.heappop(self._heap)
+            self._admit(head)
+
+    async def acquire(self, *, priority: str, tokens: int, label: str = "") -> _Waiter:
+        """
+        Wait for a slot; returns the admitted waiter (queue times, tokens `charged`).
+        """
+        prio = PRIORITIES.get(priority, PRIORITIES["batch"])
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=prio,
+            seq=next(self._seq),
+            tokens=max(1, int(tokens)),
+            label=label,
+            enqueued_at=time.monotonic(),
+            future=loop.create_future(),
+        )
+        # Fast path: nothing queued ahead and capacity available.
+        if not self._heap and self._slot_free(prio) and self._budget_wait(waiter.tokens) == 0:
+            self._admit(waiter)
+            return waiter
+
+        self.stats[_priority_name(prio)]["queued"] += 1
+        heapq.heappush(self._heap, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just before cancellation: give the slot back.
+                self.release(priority)
+            raise
+        return waiter
+
+    def release(self, priority: str) -> None:
+        name = priority if priority in PRIORITIES else "batch"
+        self.in_flight = max(0, self.in_flight - 1)
+        self.in_flight_by_priority[name] = max(0, self.in_flight_by_priority[name] - 1)
+        self._dispatch()
+
+    def settle(self, charged: float, used_tokens: int) -> None:
+        """
+        Correct the token bucket once a call's real usage is known: the estimate
+        reserves the whole output budget (up to 9000 tokens for extraction), which
+        is rarely used.
+        """
+        if charged <= 0 or used_tokens <= 0:
+            return
+        self._tokens.adjust(charged - used_tokens)
+        self._dispatch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        queued = [w for w in sorted(self._heap) if not w.future.done()]
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_by_priority": dict(self.in_flight_by_priority),
+            "max_concurrent": self.max_concurrent,
+            "interactive_reserved": self.interactive_reserved,
+            "background_max": self.background_max,
+            "rpm_limit": self._requests.capacity or None,
+            "tpm_limit": self._tokens.capacity or None,
+            "queue_depth": len(queued),
+            "queue": [
+                {
+                    "priority": _priority_name(w.priority),
+                    "label": w.label,
+                    "tokens": w.tokens,
+                    "waiting_s": round(now - w.enqueued_at, 3),
+                }
+                for w in queued[:50]
+            ],
+            "by_priority": {
+                name: {
+                    "admitted": int(s["admitted"]),
+                    "queued": int(s["queued"]),
+                    "avg_wait_s": round(s["wait_s_total"] / s["admitted"], 3) if s["admitted"] else 0.0,
+                    "max_wait_s": round(s["wait_s_max"], 3),
+                }
+                for name, s in self.stats.items()
+            },
+        }
+
+
+def _priority_name(prio: int) -> str:
+    for name, value in PRIORITIES.items():
+        if value == prio:
+            return name
+    return "batch"
+
+
+_schedulers: Dict[str, ProviderScheduler] = {}
+_schedulers_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Usage reported for the slot held in this context: [input + output tokens] (see report_usage)
+_slot_usage: "contextvars.ContextVar[Optional[List[int]]]" = contextvars.ContextVar("llm_slot_usage", default=None)
+
+
+def get_scheduler(provider: str) -> ProviderScheduler:
+    global _schedulers_loop
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None and _schedulers_loop is not loop:
+        # Queued futures and wake-up timers belong to one event loop (e.g. scripts calling asyncio.run twice).
+        _schedulers.clear()
+        _schedulers_loop = loop
+    scheduler = _schedulers.get(provider)
+    if scheduler is None:
+        key = provider.upper()
+        scheduler = ProviderScheduler(
+            provider,
+            max_concurrent=int(_env_number("LLM_MAX_CONCURRENT", 16)),
+            interactive_reserved=int(_env_number("LLM_INTERACTIVE_RESERVED", 2)),
+            background_max=int(_env_number("LLM_BACKGROUND_MAX_CONCURRENT", 0)),
+            rpm=_env_number(f"LLM_RPM_{key}", 0),
+            tpm=_env_number(f"LLM_TPM_{key}", 0),
+        )
+        _schedulers[provider] = scheduler
+    return scheduler
+
+
+@asynccontextmanager
+async def llm_slot(provider: str, *, priority: str, tokens: int, label: str = ""):
+    """
+    Hold a scheduler slot for the duration of one provider call.
+
+    Yields the seconds spent waiting in the queue. Usage reported inside the
+    block (`report_usage`) settles the token estimate when the slot is released.
+    """
+    scheduler = get_scheduler(provider)
+    waiter = await scheduler.acquire(priority=priority, tokens=tokens, label=label)
+    usage: List[int] = []
+    token = _slot_usage.set(usage)
+    try:
+        yield waiter.admitted_at - waiter.enqueued_at
+    finally:
+        _slot_usage.reset(token)
+        scheduler.release(priority)
+        if usage:
+            scheduler.settle(waiter.charged, usage[0])
+
+
+def report_usage(tokens: int) -> None:
+    """
+    Report the tokens a provider call actually used (input incl. cached + output),
+    from inside its `llm_slot`. The last report wins; no-op outside a slot.
+    """
+    usage = _slot_usage.get()
+    if usage is not None:
+        usage[:] = [max(0, int(tokens))]
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """
+    Queue depth, in-flight calls and wait times per provider and priority class.
+    """
+    return {provider: s.snapshot() for provider, s in _schedulers.items()}
@@ -0,0 +1,294 @@
+"""
+LLM Call Telemetry
+------------------
+
+One record per provider call, tagged with the calling pipeline stage:
+- caller, provider, model
+- input/output tokens (from the provider's usage block); prompt-cache reads and
+  writes are counted separately from uncached input tokens
+- queue wait (scheduler) and network latency
+- retries, whether a fallback provider answered, parse failures
+
+Records are aggregated into Prometheus-style counters and histograms and rendered
+in the text exposition format by `render_prometheus()` (served at /api/metrics by
+both apps). Other subsystems (e.g. the document parser pool) add their own
+metrics to the same output with `register_counter` / `register_gauge` /
+`register_histogram`. Like the scheduler, this module has no settings
+dependency so the captain-portal agents can use it directly.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+import bisect
+import threading
+import time
+
+from core.llm.scheduler import report_usage
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds (seconds)
+_LATENCY_BUCKETS: Tuple[float, ...] = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300)
+_QUEUE_WAIT_BUCKETS: Tuple[float, ...] = (0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60)
+
+
+def usage_counts(usage: Any) -> Dict[str, int]:
+    """
+    Normalize an Anthropic or OpenAI usage block (object or dict).
+
+    `input_tokens` is always the uncached part of the prompt: Anthropic reports
+    cache reads/writes next to it, OpenAI includes cached tokens in `prompt_tokens`.
+    """
+    counts = {"input_tokens": 0, "output_tokens": 0, "cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+    if usage is None:
+        return counts
+    get = usage.get if isinstance(usage, dict) else lambda key, default=None: getattr(usage, key, default)
+    prompt_tokens = get("prompt_tokens")
+    if prompt_tokens is not None:
+        details = get("prompt_tokens_details")
+        if isinstance(details, dict):
+            cached = details.get("cached_tokens")
+        else:
+            cached = getattr(details, "cached_tokens", None)
+        cached = int(cached or 0)
+        counts["input_tokens"] = int(prompt_tokens or 0) - cached
+        counts["cache_read_input_tokens"] = cached
+        counts["output_tokens"] = int(get("completion_tokens") or 0)
+    else:
+        counts["input_tokens"] = int(get("input_tokens") or 0)
+        counts["output_tokens"] = int(get("output_tokens") or 0)
+        counts["cache_read_input_tokens"] = int(get("cache_read_input_tokens") or 0)
+        counts["cache_creation_input_tokens"] = int(get("cache_creation_input_tokens") or 0)
+    return counts
+
+
+@dataclass
+class LLMCall:
+    caller: str
+    provider: str
+    model: str = ""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    queue_wait_s: float = 0.0
+    latency_s: float = 0.0
+    retries: int = 0
+    fallback: bool = False
+    parse_failure: bool = False
+    outcome: str = "ok"  # ok | error | parse_error | cancelled
+    started: float = field(default_factory=time.monotonic, repr=False)
+
+    def add_usage(self, usage: Any) -> None:
+        """
+        Add token counts from an Anthropic or OpenAI usage block (see `usage_counts`).
+        """
+        if usage is None:
+            return
+        counts = usage_counts(usage)
+        # Inside an llm_slot: settle the scheduler's token estimate with the real usage
+        report_usage(sum(counts.values()))
+        self.input_tokens += counts["input_tokens"]
+        self.output_tokens += counts["output_tokens"]
+        self.cache_read_tokens += counts["cache_read_input_tokens"]
+        self.cache_write_tokens += counts["cache_creation_input_tokens"]
+
+
+class _Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1.0) -> None:
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class _Histogram:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        counts, total = self.values.get(label_values, ([0] * (len(self.buckets) + 1), 0.0))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.values[label_values] = (counts, total + value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), key + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class _Gauge:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, label_values: Tuple[str, ...], value: float) -> None:
+        self.values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_lock = threading.Lock()
+
+_calls = _Counter("llm_calls_total", "LLM provider calls by outcome.", ("caller", "provider", "model", "outcome"))
+_tokens = _Counter(
+    "llm_tokens_total",
+    "Tokens billed by LLM providers (direction: input = uncached prompt, cache_read, cache_write, output).",
+    ("caller", "provider", "model", "direction"),
+)
+_retries = _Counter("llm_retries_total", "Retried LLM provider requests.", ("caller", "provider"))
+_fallbacks = _Counter("llm_fallbacks_total", "LLM calls answered by a fallback provider.", ("caller", "provider"))
+_parse_failures = _Counter("llm_parse_failures_total", "LLM responses that could not be parsed.", ("caller", "provider"))
+_latency = _Histogram(
+    "llm_request_latency_seconds", "Network latency of LLM provider calls.", ("caller", "provider"), _LATENCY_BUCKETS
+)
+_queue_wait = _Histogram(
+    "llm_queue_wait_seconds", "Time LLM calls spent queued in the scheduler.", ("caller", "provider"), _QUEUE_WAIT_BUCKETS
+)
+
+_METRICS = (_calls, _tokens, _retries, _fallbacks, _parse_failures, _latency, _queue_wait)
+
+# Metrics of other subsystems (e.g. the document parser pool), rendered after the LLM metrics.
+# Update them from the event loop; rendering happens there too.
+_extra_metrics: List[Any] = []
+
+
+def register_counter(name: str, help_text: str, labels: Sequence[str] = ()) -> _Counter:
+    metric = _Counter(name, help_text, labels)
+    _extra_metrics.append(metric)
+    return metric
+
+
+def register_gauge(name: str, help_text: str, labels: Sequence[str] = ()) -> _Gauge:
+    metric = _Gauge(name, help_text, labels)
+    _extra_metrics.append(metric)
+    return metric
+
+
+def register_histogram(name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]) -> _Histogram:
+    metric = _Histogram(name, help_text, labels, buckets)
+    _extra_metrics.append(metric)
+    return metric
+
+
+def record_llm_call(call: LLMCall) -> None:
+    if call.parse_failure and call.outcome == "ok":
+        call.outcome = "parse_error"
+    model = call.model or "unknown"
+    caller = (call.caller, call.provider)
+    with _lock:
+        _calls.inc((call.caller, call.provider, model, call.outcome))
+        if call.input_tokens:
+            _tokens.inc((call.caller, call.provider, model, "input"), call.input_tokens)
+        if call.output_tokens:
+            _tokens.inc((call.caller, call.provider, model, "output"), call.output_tokens)
+        if call.cache_read_tokens:
+            _tokens.inc((call.caller, call.provider, model, "cache_read"), call.cache_read_tokens)
+        if call.cache_write_tokens:
+            _tokens.inc((call.caller, call.provider, model, "cache_write"), call.cache_write_tokens)
+        if call.retries:
+            _retries.inc(caller, call.retries)
+        if call.fallback:
+            _fallbacks.inc(caller)
+        if call.parse_failure:
+            _parse_failures.inc(caller)
+        if call.outcome != "cancelled":
+            _latency.observe(caller, call.latency_s)
+        _queue_wait.observe(caller, call.queue_wait_s)
+
+
+@contextmanager
+def track_llm_call(caller: str, provider: str, model: str, *, queue_wait_s: float = 0.0) -> Iterator[LLMCall]:
+    """
+    Record one direct provider call (for code that does not go through the router).
+
+    Call `call.add_usage(response.usage)` when the response arrives; latency is
+    the time spent inside the block, so parse the payload after it and report
+    failures with `record_parse_failure`. Exceptions mark the call as failed
+    and propagate.
+    """
+    call = LLMCall(caller=caller, provider=provider, model=model, queue_wait_s=queue_wait_s)
+    try:
+        yield call
+    except BaseException:
+        call.outcome = "error"
+        raise
+    finally:
+        call.latency_s = time.monotonic() - call.started
+        record_llm_call(call)
+
+
+def record_parse_failure(caller: str, provider: str) -> None:
+    """Count a response that arrived but could not be parsed (outside `track_llm_call`)."""
+    with _lock:
+        _parse_failures.inc((caller, provider))
+
+
+def render_prometheus() -> str:
+    """
+    All LLM call metrics (and registered extra metrics) in the Prometheus text exposition format.
+    """
+    with _lock:
+        lines: List[str] = []
+        for metric in _METRICS + tuple(_extra_metrics):
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def get_llm_call_totals() -> Dict[str, Any]:
+    """
+    Compact JSON summary (calls per caller/provider/outcome and token totals).
+    """
+    with _lock:
+        calls: Dict[str, Dict[str, int]] = {}
+        for (caller, provider, _model, outcome), value in _calls.values.items():
+            bucket = calls.setdefault(f"{caller}|{provider}", {})
+            bucket[outcome] = bucket.get(outcome, 0) + int(value)
+        tokens: Dict[str, int] = {"input": 0, "output": 0}
+        for (_c, _p, _m, direction), value in _tokens.values.items():
+            tokens[direction] = tokens.get(direction, 0) + int(value)
+    return {"calls": calls, "tokens": tokens}
@@ -0,0 +1,90 @@
+"""
+Provider circuit breaker (core/llm/breaker.py)
+==============================================
+Error rate and per-class slow-call rate trip the breaker; after the cool-down
+one probe call decides between closed and open again.
+
+Run from rag_system/:  python -m pytest -q tests/test_llm_breaker.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm.breaker import CircuitBreaker  # noqa: E402
+
+
+def make_breaker(**options):
+    return CircuitBreaker("test", **{"min_requests": 4, "error_rate": 0.5, "open_s": 0.05, **options})
+
+
+def cool_down(breaker):
+    time.sleep(breaker.open_s + 0.02)
+    assert breaker.state == "half_open" and breaker.allow()
+
+
+def test_error_rate_trips_the_breaker():
+    breaker = make_breaker(open_s=30)
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == "closed"  # below min_requests
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    assert breaker.trips == 1
+
+
+def test_half_open_probe_success_closes_the_circuit():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    cool_down(breaker)
+    breaker.record_success(0.2)
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["window_requests"] == 1
+
+
+def test_half_open_probe_failure_reopens_the_circuit():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    cool_down(breaker)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+
+
+def test_slow_calls_trip_only_against_their_own_class_threshold():
+    breaker = make_breaker(open_s=30, slow_call_s={"interactive": 5, "extraction": 60})
+    for _ in range(4):
+        breaker.record_success(20, "extraction")
+    assert breaker.state == "closed"  # 20s is normal for an extraction
+    for _ in range(3):
+        breaker.record_success(20, "interactive")
+    assert breaker.state == "closed"
+    breaker.record_success(20, "interactive")
+    assert breaker.state == "open"
+
+
+def test_slow_half_open_probe_reopens_the_circuit():
+    breaker = make_breaker(slow_call_s={"interactive": 5})
+    for _ in range(4):
+        breaker.record_failure("interactive")
+    cool_down(breaker)
+    breaker.record_success(9, "interactive")
+    assert breaker.state == "open"
+
+
+def test_latency_percentiles_are_kept_per_class():
+    breaker = make_breaker()
+    for latency in (1, 2, 3, 4):
+        breaker.record_success(latency, "interactive")
+    breaker.record_success(40, "extraction")
+    assert breaker.latency_percentile(0.95, "interactive") == 4
+    assert breaker.latency_percentile(0.95, "extraction") == 40
+    assert breaker.latency_percentile(0.95, "batch") is None
+    latency = breaker.snapshot()["latency"]
+    assert latency["interactive"]["samples"] == 4
+    assert latency["extraction"]["samples"] == 1
@@ -0,0 +1,63 @@
+"""
+Chunked extraction helpers (core/llm/chunking.py)
+=================================================
+Long documents are split on natural boundaries with overlap, and per-chunk
+results are merged back deterministically with duplicates collapsed.
+
+Run from rag_system/:  python -m pytest -q tests/test_llm_chunking.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm.chunking import merge_results, split_text  # noqa: E402
+
+
+def pages(count, size=300):
+    return "".join(f"\n--- Page {n} ---\n" + ("word " * (size // 5)) for n in range(1, count + 1))
+
+
+def test_short_text_is_one_chunk():
+    assert split_text("short text", 100) == ["short text"]
+    assert split_text("", 100) == []
+
+
+def test_chunks_respect_the_limit_and_cover_the_text():
+    text = pages(6)
+    chunks = split_text(text, 700)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 700 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_chunks_cut_on_page_markers():
+    chunks = split_text(pages(6), 700)
+    assert all(chunk.startswith("\n--- Page ") for chunk in chunks)
+
+
+def test_overlap_repeats_the_tail_of_the_previous_chunk():
+    text = "\n".join(f"line {n:03d} of the document" for n in range(60))
+    chunks = split_text(text, 400, overlap=100)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        first_line = chunk.strip("\n").split("\n")[0]
+        assert first_line in previous
+
+
+def test_merge_keeps_first_scalar_and_fills_empty_fields():
+    merged = merge_results([
+        {"destination": "Monaco", "summary": ""},
+        None,
+        {"destination": "Nice", "summary": "Harbour town"},
+    ])
+    assert merged == {"destination": "Monaco", "summary": "Harbour town"}
+
+
+def test_merge_collapses_duplicate_items_across_chunks():
+    merged = merge_results([
+        {"venues": [{"name": "Le Louis XV", "city": "Monaco"}, {"name": "Buddha Bar"}]},
+        {"venues": [{"name": "le louis xv ", "cuisine": "French"}, {"name": "Nobu"}]},
+    ])
+    assert [venue["name"] for venue in merged["venues"]] == ["Le Louis XV", "Buddha Bar", "Nobu"]
+    assert merged["venues"][0] == {"name": "Le Louis XV", "city": "Monaco", "cuisine": "French"}
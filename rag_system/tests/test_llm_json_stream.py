@@ -0,0 +1,51 @@
+"""
+Streaming JSON parser (core/llm/json_stream.py)
+===============================================
+Watched array items are emitted as soon as they close, and a truncated reply
+is repaired to its last complete value instead of being lost.
+
+Run from rag_system/:  python -m pytest -q tests/test_llm_json_stream.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm.json_stream import StreamingJSONParser, parse_json_tolerant  # noqa: E402
+
+
+def feed_in_pieces(parser, text, size=7):
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return items
+
+
+def test_watched_items_are_emitted_as_they_close():
+    text = '```json\n{"destination": "Monaco", "venues": [{"name": "A", "tags": ["x"]}, {"name": "B"}]}\n```'
+    parser = StreamingJSONParser()
+    items = feed_in_pieces(parser, text)
+    assert items == [("venues", {"name": "A", "tags": ["x"]}), ("venues", {"name": "B"})]
+    assert parser.complete
+    assert parser.finish() == {"destination": "Monaco", "venues": [{"name": "A", "tags": ["x"]}, {"name": "B"}]}
+    assert parser.truncated is False
+
+
+def test_truncated_reply_keeps_complete_items_and_drops_the_half_one():
+    parser = StreamingJSONParser()
+    items = feed_in_pieces(parser, '{"destination": "Monaco", "venues": [{"name": "A"}, {"name": "B", "descr')
+    assert items == [("venues", {"name": "A"})]
+    assert not parser.complete
+    assert parser.finish() == {"destination": "Monaco", "venues": [{"name": "A"}]}
+    assert parser.truncated is True
+
+
+def test_truncated_scalar_field_is_cut_back_to_the_last_complete_value():
+    value, truncated = parse_json_tolerant('{"title": "Riviera", "summary": "A long desc')
+    assert value == {"title": "Riviera"}
+    assert truncated is True
+
+
+def test_nothing_recoverable_returns_none():
+    assert parse_json_tolerant("Sorry, I cannot help with that.") == (None, False)
@@ -0,0 +1,91 @@
+"""
+LLM scheduler (core/llm/scheduler.py)
+=====================================
+Priority classes, reserved interactive slots and token budgets decide which
+provider call runs next; token estimates are settled with the reported usage.
+
+Run from rag_system/:  python -m pytest -q tests/test_llm_scheduler.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm import scheduler as llm_scheduler  # noqa: E402
+from core.llm.scheduler import ProviderScheduler, llm_slot, report_usage  # noqa: E402
+
+
+def make_scheduler(**options):
+    return ProviderScheduler("test", **{"max_concurrent": 1, "interactive_reserved": 0, "rpm": 0, "tpm": 0, **options})
+
+
+def test_queued_calls_run_by_priority_then_fifo():
+    async def main():
+        scheduler = make_scheduler()
+        await scheduler.acquire(priority="batch", tokens=1)
+        order = []
+
+        async def call(priority, name):
+            await scheduler.acquire(priority=priority, tokens=1)
+            order.append(name)
+            scheduler.release(priority)
+
+        tasks = [
+            asyncio.ensure_future(call(priority, name))
+            for priority, name in [("batch", "batch-1"), ("extraction", "extract"), ("interactive", "chat"), ("batch", "batch-2")]
+        ]
+        await asyncio.sleep(0)
+        scheduler.release("batch")
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["chat", "extract", "batch-1", "batch-2"]
+
+
+def test_reserved_slots_are_only_for_interactive_calls():
+    async def main():
+        scheduler = make_scheduler(max_concurrent=2, interactive_reserved=1)
+        await scheduler.acquire(priority="extraction", tokens=1)
+        background = asyncio.ensure_future(scheduler.acquire(priority="extraction", tokens=1))
+        await asyncio.sleep(0.05)
+        blocked = not background.done()
+        await asyncio.wait_for(scheduler.acquire(priority="interactive", tokens=1), timeout=1)
+        background.cancel()
+        return blocked
+
+    assert asyncio.run(main()) is True
+
+
+def test_token_budget_delays_calls_until_refilled():
+    async def main():
+        scheduler = make_scheduler(max_concurrent=4, tpm=6000)  # refills 100 tokens/s
+        await scheduler.acquire(priority="batch", tokens=6000)
+        started = time.monotonic()
+        await scheduler.acquire(priority="batch", tokens=50)
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.4
+
+
+def test_reported_usage_gives_back_unused_estimate(monkeypatch):
+    monkeypatch.setenv("LLM_TPM_SETTLETEST", "6000")
+
+    async def main():
+        async with llm_slot("settletest", priority="extraction", tokens=6000):
+            report_usage(1000)
+        started = time.monotonic()
+        async with llm_slot("settletest", priority="extraction", tokens=4000):
+            pass
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) < 0.2
+
+
+def test_schedulers_are_rebuilt_for_a_new_event_loop():
+    async def current():
+        return llm_scheduler.get_scheduler("looptest")
+
+    assert asyncio.run(current()) is not asyncio.run(current())
@@ -0,0 +1,60 @@
+"""
+Local validate/report passes (app/services/multipass_postprocess.py)
+====================================================================
+validate_package runs unguarded after the expand pass, so malformed model
+output must produce warnings, never exceptions.
+
+Run from rag_system/:  python -m pytest -q tests/test_multipass_postprocess.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.multipass_postprocess import report_package, validate_package  # noqa: E402
+
+
+VENUE = {"name": "Le Louis XV", "citations": ["p.3"], "confidence": 0.9}
+
+
+@pytest.mark.parametrize("confidence", [0.8, "high", ["venues", 0.5], None])
+def test_validate_ignores_malformed_confidence(confidence):
+    result = validate_package({"venues": [VENUE], "confidence": confidence})
+
+    assert result["package"]["confidence"] == {"venues": 0.9}
+    if confidence is not None:
+        assert any("confidence" in w for w in result["warnings"])
+
+
+@pytest.mark.parametrize("counts", [3, "many", ["venues"], {"estimated_potential": 7}, {"estimated_potential": ["x"]}])
+def test_validate_ignores_malformed_counts(counts):
+    result = validate_package({"venues": [VENUE], "counts": counts})
+
+    assert result["package"]["counts"]["real_extracted"]["venues"] == 1
+    assert result["package"]["counts"]["estimated_potential"]["venues"] == 1
+
+
+def test_validate_keeps_model_estimates_and_confidence():
+    result = validate_package({
+        "venues": [VENUE, dict(VENUE)],
+        "counts": {"estimated_potential": {"venues": 12}},
+        "confidence": {"venues": 0.4},
+    })
+
+    pkg = result["package"]
+    assert len(pkg["venues"]) == 1
+    assert pkg["counts"]["estimated_potential"]["venues"] == 12
+    assert pkg["confidence"]["venues"] == 0.4
+    assert "venues: merged 1 duplicate(s)." in result["findings"]
+
+
+@pytest.mark.parametrize("package", [None, [], "not a package"])
+def test_validate_and_report_non_dict_package(package):
+    validate = validate_package(package)
+    report = report_package(validate)
+
+    assert validate["status"] == "needs_review"
+    assert report["pass_name"] == "report"
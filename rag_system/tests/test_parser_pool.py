@@ -0,0 +1,83 @@
+"""
+Document parser pool (app/services/parser_pool.py)
+==================================================
+Jobs run in spawned worker processes; a timeout or crash must only take down
+the worker of the job that caused it, never a job running next to it.
+
+Run from rag_system/:  python -m pytest -q tests/test_parser_pool.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.parser_pool import ParserCrashed, ParserPool, ParserTimeout  # noqa: E402
+
+
+def run_with_pool(scenario, **options):
+    async def main():
+        pool = ParserPool(**{"workers": 2, "max_memory_mb": 0, **options})
+        try:
+            return await scenario(pool)
+        finally:
+            pool.shutdown()
+
+    return asyncio.run(main())
+
+
+def test_runs_jobs_and_propagates_parser_errors():
+    async def scenario(pool):
+        assert await pool.run("test", len, "abc") == 3
+        with pytest.raises(ValueError):
+            await pool.run("test", int, "not a number")
+        return pool.snapshot()
+
+    snapshot = run_with_pool(scenario)
+    assert snapshot["queued"] == 0 and snapshot["running"] == 0
+    assert snapshot["restarts"] == {}
+
+
+def test_timeout_kills_only_its_own_worker():
+    async def scenario(pool):
+        slow = pool.run("slow", time.sleep, 30, timeout=1)
+        neighbour = pool.run("neighbour", time.sleep, 2, timeout=30)
+        results = await asyncio.gather(slow, neighbour, return_exceptions=True)
+        after = await pool.run("test", len, "ab")
+        return results, after, pool.snapshot()
+
+    (slow, neighbour), after, snapshot = run_with_pool(scenario)
+    assert isinstance(slow, ParserTimeout)
+    assert neighbour is None
+    assert after == 2
+    assert snapshot["restarts"] == {"timeout": 1}
+
+
+def test_crash_fails_only_the_crashing_job():
+    async def scenario(pool):
+        crash = pool.run("crash", os._exit, 3)
+        neighbour = pool.run("neighbour", time.sleep, 1)
+        results = await asyncio.gather(crash, neighbour, return_exceptions=True)
+        after = await pool.run("test", len, "abcd")
+        return results, after, pool.snapshot()
+
+    (crash, neighbour), after, snapshot = run_with_pool(scenario)
+    assert isinstance(crash, ParserCrashed)
+    assert neighbour is None
+    assert after == 4
+    assert snapshot["restarts"] == {"crashed": 1}
+
+
+def test_jobs_beyond_the_worker_count_wait_for_a_free_worker():
+    async def scenario(pool):
+        started = time.monotonic()
+        await asyncio.gather(*[pool.run("test", time.sleep, 0.5) for _ in range(3)])
+        return time.monotonic() - started, pool.snapshot()
+
+    elapsed, snapshot = run_with_pool(scenario, workers=1)
+    assert elapsed >= 1.5
+    assert snapshot["queued"] == 0 and snapshot["running"] == 0
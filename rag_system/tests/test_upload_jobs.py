@@ -0,0 +1,140 @@
+"""
+Upload job queue (app/services/upload_jobs.py)
+==============================================
+Uploads move queued -> parsing -> extracting -> saving -> completed | failed;
+failed attempts are retried with backoff unless the error is permanent, and
+SQLite-backed jobs interrupted by a restart are picked up again.
+
+Run from rag_system/:  python -m pytest -q tests/test_upload_jobs.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.upload_jobs import PermanentJobError, SQLiteJobStore, UploadJob, UploadJobManager  # noqa: E402
+
+
+def run_with_manager(scenario, handler, **options):
+    async def main():
+        manager = UploadJobManager(**{"workers": 1, "max_attempts": 3, "retry_delay_s": 0.05, **options})
+        manager.register("file", handler)
+        seen = []
+
+        async def on_stage(job):
+            seen.append(job.stage)
+
+        manager.on_stage = on_stage
+        try:
+            return await scenario(manager), seen
+        finally:
+            await manager.stop()
+
+    return asyncio.run(main())
+
+
+async def pipeline(job, progress):
+    for stage in ("parsing", "extracting", "saving"):
+        await progress(stage)
+    return {"pois": job.payload["pois"]}
+
+
+def test_job_runs_through_every_stage():
+    async def scenario(manager):
+        await manager.enqueue("u1", "file", {"pois": 3})
+        return await manager.wait_until_finished("u1")
+
+    job, seen = run_with_manager(scenario, pipeline)
+    assert seen == ["queued", "parsing", "extracting", "saving", "completed"]
+    assert job.status()["result"] == {"pois": 3}
+    assert job.attempts == 1
+    assert set(job.stages) == {"queued", "parsing", "extracting", "saving", "completed"}
+
+
+def test_failed_attempt_is_retried_after_backoff():
+    calls = []
+
+    async def flaky(job, progress):
+        calls.append(asyncio.get_running_loop().time())
+        await progress("parsing")
+        if len(calls) == 1:
+            raise RuntimeError("provider timeout")
+        return await pipeline(job, progress)
+
+    async def scenario(manager):
+        await manager.enqueue("u2", "file", {"pois": 1})
+        return await manager.wait_until_finished("u2")
+
+    job, seen = run_with_manager(scenario, flaky)
+    assert job.stage == "completed" and job.attempts == 2
+    assert job.error is None
+    assert seen[:3] == ["queued", "parsing", "queued"]
+    assert calls[1] - calls[0] >= 0.05
+
+
+def test_permanent_error_fails_without_retry():
+    async def bad_input(job, progress):
+        await progress("parsing")
+        raise PermanentJobError("No text could be extracted", status_code=422)
+
+    async def scenario(manager):
+        await manager.enqueue("u3", "file", {})
+        return await manager.wait_until_finished("u3")
+
+    job, seen = run_with_manager(scenario, bad_input)
+    assert seen == ["queued", "parsing", "failed"]
+    assert job.attempts == 1
+    assert job.status()["error"] == "No text could be extracted"
+    assert job.error_status == 422
+
+
+def test_job_fails_after_max_attempts():
+    async def broken(job, progress):
+        raise RuntimeError("boom")
+
+    async def scenario(manager):
+        await manager.enqueue("u4", "file", {})
+        return await manager.wait_until_finished("u4")
+
+    job, seen = run_with_manager(scenario, broken, max_attempts=2)
+    assert seen == ["queued", "queued", "failed"]
+    assert job.attempts == 2 and job.error_status == 500
+
+
+def test_long_poll_returns_on_the_next_stage():
+    release = None
+
+    async def gated(job, progress):
+        await progress("parsing")
+        await release.wait()
+        return await pipeline(job, progress)
+
+    async def scenario(manager):
+        nonlocal release
+        release = asyncio.Event()
+        await manager.enqueue("u5", "file", {"pois": 0})
+        changed = (await manager.wait("u5", since="queued", timeout=5)).stage
+        unchanged = (await manager.wait("u5", since="parsing", timeout=0.1)).stage
+        release.set()
+        await manager.wait_until_finished("u5")
+        return changed, unchanged
+
+    (changed, unchanged), _ = run_with_manager(scenario, gated)
+    assert changed == "parsing"
+    assert unchanged == "parsing"  # timed out: still parsing
+
+
+def test_sqlite_jobs_resume_after_restart(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    interrupted = UploadJob(upload_id="u6", kind="file", payload={"pois": 2}, stage="extracting", attempts=1)
+    asyncio.run(store.save(interrupted))
+
+    async def scenario(manager):
+        await manager.start()
+        return await manager.wait_until_finished("u6")
+
+    job, seen = run_with_manager(scenario, pipeline, store=store)
+    assert job.stage == "completed" and job.attempts == 2
+    assert asyncio.run(store.get("u6")).stage == "completed"
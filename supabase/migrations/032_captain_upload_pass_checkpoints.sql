@@ -0,0 +1,24 @@
+-- 032_captain_upload_pass_checkpoints.sql
+--
+-- Purpose: Pass-level checkpoints for multipass extraction
+--
+-- Why:
+-- - Multipass runs outline -> expand -> validate -> report; a timeout in a late
+--   pass used to lose the whole contract (and the expensive expand pass)
+-- - Each completed PassResult is stored here, keyed by upload + pass name
+-- - A retry resumes from the last good pass (same source text only: text_hash)
+
+CREATE TABLE IF NOT EXISTS captain_upload_passes (
+  upload_id UUID NOT NULL REFERENCES captain_uploads(id) ON DELETE CASCADE,
+  pass_name TEXT NOT NULL CHECK (pass_name IN ('outline', 'expand', 'validate', 'report')),
+  text_hash TEXT NOT NULL, -- sha256 of the source text the pass ran on
+  result JSONB NOT NULL,   -- PassResult (package, findings, warnings, status)
+
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (upload_id, pass_name)
+);
+
+COMMENT ON TABLE captain_upload_passes IS 'Completed multipass extraction passes per upload (resume checkpoints)';
+
+-- Backend-only (service role bypasses RLS)
+ALTER TABLE captain_upload_passes ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,26 @@
+-- 033_captain_upload_jobs.sql
+--
+-- Purpose: Background processing for captain uploads
+--
+-- Why:
+-- - Uploads are now enqueued and processed by a worker pool; the HTTP request
+--   returns the upload_id immediately
+-- - processing_status follows the job stages:
+--   queued -> parsing -> extracting -> saving -> completed | failed
+-- - processing_stages records when each stage was entered
+-- - error_message was written by the backend but never existed as a column
+
+ALTER TABLE captain_uploads
+  DROP CONSTRAINT IF EXISTS captain_uploads_processing_status_check;
+
+ALTER TABLE captain_uploads
+  ADD CONSTRAINT captain_uploads_processing_status_check
+  CHECK (processing_status IN ('queued', 'parsing', 'extracting', 'saving', 'processing', 'completed', 'failed'));
+
+ALTER TABLE captain_uploads
+  ADD COLUMN IF NOT EXISTS processing_stages JSONB DEFAULT '{}'::jsonb,
+  ADD COLUMN IF NOT EXISTS error_message TEXT;
+
+COMMENT ON COLUMN captain_uploads.processing_status IS 'Job stage: queued, parsing, extracting, saving, completed, failed (processing = legacy synchronous uploads)';
+COMMENT ON COLUMN captain_uploads.processing_stages IS 'Stage name -> ISO timestamp when the upload job entered it';
+COMMENT ON COLUMN captain_uploads.error_message IS 'Why processing failed (last attempt)';
@@ -0,0 +1,28 @@
+-- 034_content_fingerprints.sql
+--
+-- Purpose: Content-hash deduplication for captain uploads and scraped URLs
+--
+-- Why:
+-- - The same PDFs are re-uploaded by different captains and the same pages are
+--   re-scraped; each time the full LLM extraction ran again
+-- - content_sha256 = SHA-256 of the uploaded bytes (files) or of the
+--   whitespace/case-normalized text (pastes, scraped page content)
+-- - A new upload whose fingerprint matches a completed one reuses its
+--   extraction_contract unless re-extraction is forced
+
+ALTER TABLE captain_uploads
+  ADD COLUMN IF NOT EXISTS content_sha256 TEXT;
+
+ALTER TABLE scraped_urls
+  ADD COLUMN IF NOT EXISTS content_sha256 TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_captain_uploads_content_sha256
+  ON captain_uploads (content_sha256)
+  WHERE content_sha256 IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_scraped_urls_content_sha256
+  ON scraped_urls (content_sha256)
+  WHERE content_sha256 IS NOT NULL;
+
+COMMENT ON COLUMN captain_uploads.content_sha256 IS 'SHA-256 of the uploaded bytes (files) or normalized text (pastes); used to reuse previous extractions';
+COMMENT ON COLUMN scraped_urls.content_sha256 IS 'SHA-256 of the normalized scraped page text; used to reuse previous extractions';